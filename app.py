@@ -11,8 +11,13 @@ def main():
     app.state.clipboard = []
 
     @app.expose
-    def search_items(query: str):
-        return bite.get_results(query)
+    def search_items(query: str, session_id: str = None, generation: int = None):
+        # With a generation id, slow providers are streamed as 'search_results' events
+        return bite.get_results(query, session_id, generation)
+
+    @app.expose
+    def get_search_stats():
+        return bite.searcher.get_stats()
 
     @app.expose
     def run_item(item: dict, query: str = ""):
@@ -39,7 +44,13 @@ def main():
         return bite.update_scratchpad(content)
 
     @app.expose
-    def copy_to_clipboard(text: str):
+    def copy_to_clipboard(text: str, blob: str = None):
+        # Large clipboard entries only carry a preview; copy the stored original
+        if blob:
+            text = bite.store.load_clip({"hash": blob, "blob": True})
+            if text is None:
+                app.system_notification(title="Copy Failed", message="The stored clipboard entry is missing.")
+                return False
         pyperclip.copy(text)
         return True
 
@@ -138,6 +149,7 @@ def main():
     @app.on_exit
     def shutdown():
         print("Bite Shutting Down...")
+        bite.shutdown()
 
     @app.expose
     def set_window_size(w, h):
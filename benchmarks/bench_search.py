@@ -0,0 +1,153 @@
+"""
+Searcher microbenchmarks on synthetic corpora.
+
+    python -m benchmarks.bench_search --out bench.json
+    python -m benchmarks.bench_search --files 100000 --repeat 3
+    python -m benchmarks.bench_search --compare before.json after.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.fixture import SIZES, make_bite
+from src.core.providers import SearchRequest
+
+# Representative mix: short prefixes, words, acronyms, paths, triggers and misses
+QUERIES = [
+    "v", "vi", "vis", "visual", "visual studio", "vsc", "code", "fox", "note", "rep",
+    "budget invoice", "gh", "g hello", "yt cats", "trash", "volume", "2+2", "10km to miles",
+    "clip", "clip budget", "kill zzz", "port", "t: /", "wf:", "wf: dra", "env:", "uuid",
+    "xyzq", "photo", "green", "draft_backup", "",
+]
+# Keystroke sequences for the typing-session scenario
+TYPED = ["visual studio", "budget", "docker deploy", "note pad"]
+
+
+def _stats(samples):
+    ordered = sorted(samples)
+    n = len(ordered)
+    return {
+        "n": n,
+        "min": round(ordered[0], 3),
+        "p50": round(ordered[n // 2], 3),
+        "p95": round(ordered[min(n - 1, int(n * 0.95))], 3),
+        "mean": round(statistics.fmean(ordered), 3),
+    }
+
+
+def _time(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_providers(bite, repeat):
+    """Each provider on its own, for every query it would be routed for."""
+    samples = {}
+    for query in QUERIES:
+        q = bite.resolve_aliases(query.lower().strip())
+        bite.searcher._sync_index()
+        for provider in bite.searcher.providers.route(q):
+            for _ in range(repeat):
+                request = SearchRequest(q, bite.snapshot.pins)
+                samples.setdefault(f"provider:{provider.name}", []).append(_time(lambda: provider.func(request)))
+    return samples
+
+
+def bench_end_to_end(bite, repeat):
+    searcher = bite.searcher
+    samples = {"get_results:cold": [], "get_results:cached": [], "get_results:typing": []}
+    for _ in range(repeat):
+        for query in QUERIES:
+            searcher.cache.clear()
+            samples["get_results:cold"].append(_time(lambda: bite.get_results(query)))
+            samples["get_results:cached"].append(_time(lambda: bite.get_results(query)))
+
+        # Keystroke by keystroke inside one typing session
+        for i, phrase in enumerate(TYPED):
+            searcher.cache.clear()
+            session = f"bench-{i}"
+            for end in range(1, len(phrase) + 1):
+                samples["get_results:typing"].append(_time(lambda: bite.get_results(phrase[:end], session)))
+    return samples
+
+
+def run(args):
+    sizes = dict(SIZES)
+    if args.files is not None:
+        sizes["files"] = args.files
+    t0 = time.perf_counter()
+    bite = make_bite(args.data_dir, sizes)
+    setup_s = time.perf_counter() - t0
+
+    samples = {}
+    samples.update(bench_providers(bite, args.repeat))
+    samples.update(bench_end_to_end(bite, args.repeat))
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except Exception:
+        commit = None
+    report = {
+        "meta": {
+            "commit": commit,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "repeat": args.repeat,
+            "setup_s": round(setup_s, 2),
+        },
+        "results": {name: _stats(v) for name, v in sorted(samples.items()) if v},
+    }
+    return report
+
+
+def print_report(report):
+    print(f"commit {report['meta']['commit']}  sizes {report['meta']['sizes']}")
+    print(f"{'benchmark':32} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+    for name, s in report["results"].items():
+        print(f"{name:32} {s['n']:5} {s['p50']:9.3f} {s['p95']:9.3f} {s['mean']:9.3f}")
+
+
+def compare(old_path, new_path):
+    old = json.load(open(old_path))["results"]
+    new = json.load(open(new_path))["results"]
+    print(f"{'benchmark':32} {'old p50':>9} {'new p50':>9} {'change':>8}")
+    for name in sorted(set(old) | set(new)):
+        a = old.get(name, {}).get("p50")
+        b = new.get(name, {}).get("p50")
+        if a is None or b is None:
+            print(f"{name:32} {a if a is not None else '-':>9} {b if b is not None else '-':>9} {'':>8}")
+            continue
+        change = f"{(b - a) / a * 100:+.1f}%" if a else ""
+        print(f"{name:32} {a:9.3f} {b:9.3f} {change:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bite Searcher benchmarks")
+    parser.add_argument("--data-dir", help="Where the file tree and index.db are cached (default: <tmp>/bite-bench)")
+    parser.add_argument("--files", type=int, help=f"Rows in the synthetic index.db (default {SIZES['files']})")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two JSON reports")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    report = run(args)
+    print_report(report)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Headless Bite for benchmarks: the real Searcher/Indexer/Brain/PluginManager on
+synthetic corpora, without a pytron window, background monitors or the crawler.
+"""
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:
+    import pytron  # noqa: F401
+except ImportError:
+    # bite.py only needs the name for a type hint; nothing below opens a window
+    _shim = types.ModuleType("pytron")
+    _shim.App = object
+    sys.modules["pytron"] = _shim
+
+from src.core.bite import Bite  # noqa: E402
+from src.core.brain import Brain  # noqa: E402
+
+SIZES = {
+    "apps": 10_000,
+    "snippets": 5_000,
+    "workflows": 1_000,
+    "clipboard": 500,
+    "brain": 10_000,
+    "files": 1_000_000,
+}
+
+WORDS = [
+    "visual", "studio", "code", "fire", "fox", "chrome", "terminal", "note", "pad", "report",
+    "final", "alpha", "beta", "git", "hub", "python", "lab", "music", "video", "player",
+    "photo", "edit", "google", "docs", "sheet", "zoom", "slack", "team", "budget", "invoice",
+    "draft", "backup", "server", "client", "config", "deploy", "design", "sketch", "paint", "studio",
+    "mail", "calendar", "notes", "todo", "vault", "key", "docker", "node", "rust", "java",
+]
+EXTS = [".txt", ".md", ".py", ".js", ".pdf", ".docx", ".xlsx", ".png", ".jpg", ".mp3", ".zip", ""]
+TAGS = ["", "", "", "green", "red", "blue", "photo,green", "invoice", "work", "screenshot"]
+PROCESSES = ["code.exe", "chrome.exe", "explorer.exe", "slack.exe", "unknown"]
+PERIODS = ["morning", "afternoon", "evening", "night"]
+
+
+class HeadlessApp:
+    """The slice of pytron.App the core touches: state, emit and notifications."""
+
+    def __init__(self):
+        self.state = types.SimpleNamespace()
+        self.emitted = 0
+
+    def emit(self, event, payload=None):
+        self.emitted += 1
+
+    def system_notification(self, *args, **kwargs):
+        pass
+
+    def serve_file(self, *args, **kwargs):
+        return None
+
+    def hide(self):
+        pass
+
+
+def _phrase(rng, n):
+    return " ".join(rng.sample(WORDS, n))
+
+
+def write_corpus(config_dir: Path, sizes=SIZES, seed=7):
+    """
+    Writes a legacy config.json (snippets, clipboard, pins, mnemonics) and brain_weights.json;
+    Bite imports them into user_data.db / brain.db on load, exactly like an upgrade.
+    """
+    rng = random.Random(seed)
+    config_dir.mkdir(parents=True, exist_ok=True)
+
+    snippets = [
+        {"id": f"snip_{i}", "name": _phrase(rng, 2), "content": _phrase(rng, 8)}
+        for i in range(sizes["snippets"])
+    ]
+    clipboard = [
+        {"content": _phrase(rng, rng.randint(3, 30)), "time": "12:00:00", "date": "2026-01-01"}
+        for i in range(sizes["clipboard"])
+    ]
+    config = {
+        "pins": ["app_3", "app_77", "google"],
+        "shortcuts": [{"id": "gg", "name": "Go Google", "url": "https://google.com/?q=", "cat": "Custom", "type": "shortcut"}],
+        "snippets": snippets,
+        "mnemonics": {"vis": {"app_5": 4}, "code": {"app_9": 2}},
+        "clipboard_history": clipboard,
+    }
+    (config_dir / "config.json").write_text(json.dumps(config))
+
+    weights = {}
+    for i in range(sizes["brain"]):
+        feats = {"bias:global": rng.random()}
+        feats[f"ctx:{rng.choice(PROCESSES)}"] = rng.random()
+        feats[f"time:{rng.choice(PERIODS)}"] = rng.random()
+        weights[f"app_{i}" if i < sizes["apps"] else f"item_{i}"] = feats
+    (config_dir / "brain_weights.json").write_text(json.dumps(weights))
+
+
+def make_apps(n, seed=11):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"app_{i}", "name": _phrase(rng, rng.randint(1, 3)).title(), "path": f"/apps/{i}",
+            "desc": "Application", "cat": "Apps", "icon": "app", "type": "desktop",
+        }
+        for i in range(n)
+    ]
+
+
+def make_workflows(n, seed=13):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"wf_{i}", "name": _phrase(rng, 2).title(), "path": f"/workflows/{i}.py",
+            "desc": "Workflow", "cat": "Workflows", "icon": "terminal", "type": "workflow",
+        }
+        for i in range(n)
+    ]
+
+
+def build_files(files_root: Path, index_dir: Path, n: int, seed=17):
+    """
+    Creates `n` empty files (so the index life-check keeps them) and a matching
+    index.db through the real Indexer schema. Both are reused while `n` matches.
+    """
+    db_path = index_dir / "index.db"
+    marker = index_dir / ".complete"
+    if marker.exists() and db_path.exists():
+        return db_path
+    rng = random.Random(seed)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    for stale in index_dir.glob("index.db*"):
+        stale.unlink()
+
+    holder = types.SimpleNamespace(config_dir=index_dir, bump_version=lambda d: None)
+    Indexer(holder)  # Schema, FTS table and triggers
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous=OFF")
+    now = time.time()
+    batch = []
+    for i in range(n):
+        shard = files_root / f"{i // 1000:04d}"
+        if i % 1000 == 0:
+            shard.mkdir(parents=True, exist_ok=True)
+        name = "_".join(rng.sample(WORDS, rng.randint(1, 3))) + f"_{i}" + rng.choice(EXTS)
+        path = shard / name
+        os.close(os.open(path, os.O_CREAT | os.O_WRONLY))
+        batch.append((str(path), name, now, 0, now, rng.choice(TAGS) or None))
+        if len(batch) >= 10_000:
+            conn.executemany("INSERT OR REPLACE INTO files (path, name, mtime, is_dir, last_seen, tags) VALUES (?, ?, ?, ?, ?, ?)", batch)
+            batch = []
+    if batch:
+        conn.executemany("INSERT OR REPLACE INTO files (path, name, mtime, is_dir, last_seen, tags) VALUES (?, ?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+    marker.write_text(str(n))
+    return db_path
+
+
+class BenchBrain(Brain):
+    """The product Brain with its item cap raised so the benchmark corpus loads unpruned."""
+
+    MAX_ITEMS = 2 * SIZES["brain"]
+
+
+class HeadlessBite(Bite):
+    """Bite without the window, app scan, monitors or crawler: Bite._setup on `config_dir`."""
+
+    brain_class = BenchBrain
+
+    def __init__(self, config_dir: Path, apps, workflows):
+        self._setup(HeadlessApp(), config_dir, "Benchmark")
+        self.recent_ids = ["app_1", "google", "app_2"]
+        self.active_context = {"process": "code.exe", "title": "bench"}
+        self.installed_apps = apps
+        self.workflows = workflows
+
+
+def make_bite(data_dir=None, sizes=SIZES) -> HeadlessBite:
+    """
+    Builds the corpora under `data_dir` (the file tree and index.db are cached
+    there between runs) and returns a HeadlessBite over a fresh config dir.
+    """
+    data_dir = Path(data_dir or Path(tempfile.gettempdir()) / "bite-bench")
+    data_dir.mkdir(parents=True, exist_ok=True)
+    config_dir = Path(tempfile.mkdtemp(prefix="config-", dir=data_dir))
+
+    db_cache = build_files(data_dir / "files", data_dir / f"index-{sizes['files']}", sizes["files"])
+    # Searches prune dead rows, so every run starts from a pristine copy
+    with sqlite3.connect(db_cache) as src, sqlite3.connect(config_dir / "index.db") as dst:
+        src.backup(dst)
+
+    write_corpus(config_dir, sizes)
+    return HeadlessBite(config_dir, make_apps(sizes["apps"]), make_workflows(sizes["workflows"]))
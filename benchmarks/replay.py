@@ -0,0 +1,175 @@
+"""
+Replays a selection log (Settings -> "Log Selections for Replay") through the
+real Searcher and Brain and reports ranking quality and latency.
+
+Each event is searched with the context and clock it was logged under, scored
+against the item that was actually picked, and only then learned (mnemonics,
+recents, brain), so the numbers measure online prediction, not recall.
+
+    python -m benchmarks.replay --out before.json
+    # ...change ranking / mnemonics / brain scoring...
+    python -m benchmarks.replay --out after.json
+    python -m benchmarks.replay --compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_search import _stats, _time
+from benchmarks.fixture import HeadlessBite
+
+
+def default_config_dir() -> Path:
+    # Same location Bite itself uses
+    if platform.system() == "Windows":
+        return Path(os.environ.get("APPDATA", "")) / "Bite"
+    return Path.home() / ".config" / "Bite"
+
+
+def make_replay_bite(config_dir: Path, warm: bool = False) -> HeadlessBite:
+    """
+    A HeadlessBite over a scratch copy of the user's config (user_data.db, or a
+    pre-store config.json) and index.db, with the learned mnemonics and brain
+    dropped unless `warm`. The real data is never written.
+    """
+    scratch = Path(tempfile.mkdtemp(prefix="bite-replay-"))
+    dbs = ["user_data.db", "index.db"] + (["brain.db"] if warm else [])
+    for name in dbs:
+        if (config_dir / name).exists():
+            with sqlite3.connect(config_dir / name) as src, sqlite3.connect(scratch / name) as dst:
+                src.backup(dst)
+    if not (config_dir / "user_data.db").exists() and (config_dir / "config.json").exists():
+        shutil.copy(config_dir / "config.json", scratch / "config.json")
+
+    bite = HeadlessBite(scratch, [], [])
+    if not warm:
+        bite.user_data["mnemonics"] = {}
+    bite.user_data["settings"]["log_events"] = False  # Never log the replay itself
+    bite._publish("mnemonics", "settings")
+    bite.recent_ids = []
+    bite.installed_apps = bite.scanner.scan_applications()
+    if (config_dir / "workflows").exists():
+        bite.workflows = bite.scanner.scan_workflows(config_dir / "workflows")
+    return bite
+
+
+def _learn(bite, query, item_id):
+    """What Executor.execute does after a pick, minus actually launching it."""
+    if item_id in bite.recent_ids:
+        bite.recent_ids.remove(item_id)
+    bite.recent_ids.insert(0, item_id)
+    bite.recent_ids = bite.recent_ids[:10]
+    bite.bump_version("recents")
+    if query:
+        bite.record_selection(query, item_id)
+
+
+def replay(bite, events):
+    ranks = []
+    latency = {"replay:latency": [], "replay:latency:empty": [], "replay:latency:typed": []}
+    for event in events:
+        query = event.get("query") or ""
+        bite.active_context = event.get("context") or None
+        bite.brain.clock = lambda ts=event.get("ts", time.time()): ts
+
+        bite.searcher.cache.clear()
+        results = []
+        ms = _time(lambda: results.extend(bite.get_results(query)))
+        latency["replay:latency"].append(ms)
+        latency["replay:latency:typed" if query else "replay:latency:empty"].append(ms)
+
+        ids = [r.get("id") for r in results]
+        ranks.append(ids.index(event["id"]) + 1 if event["id"] in ids else None)
+        _learn(bite, query, event["id"])
+
+    n = len(ranks)
+    found = [r for r in ranks if r is not None]
+    quality = {
+        "events": n,
+        "hit@1": round(sum(1 for r in found if r <= 1) / n, 4) if n else 0.0,
+        "hit@5": round(sum(1 for r in found if r <= 5) / n, 4) if n else 0.0,
+        "mrr": round(sum(1.0 / r for r in found) / n, 4) if n else 0.0,
+        "missing": n - len(found),
+    }
+    return quality, {name: _stats(v) for name, v in latency.items() if v}
+
+
+def print_report(report):
+    q = report["quality"]
+    print(f"commit {report['meta']['commit']}  events {q['events']}")
+    print(f"hit@1 {q['hit@1']:.3f}  hit@5 {q['hit@5']:.3f}  mrr {q['mrr']:.3f}  not in results {q['missing']}")
+    print(f"{'latency':24} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+    for name, s in report["results"].items():
+        print(f"{name:24} {s['n']:5} {s['p50']:9.3f} {s['p95']:9.3f} {s['mean']:9.3f}")
+
+
+def compare(old_path, new_path):
+    old = json.load(open(old_path))
+    new = json.load(open(new_path))
+    print(f"{'metric':24} {'old':>9} {'new':>9}")
+    for key in ("hit@1", "hit@5", "mrr", "missing"):
+        print(f"{key:24} {old['quality'][key]:9} {new['quality'][key]:9}")
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        a = old["results"].get(name, {}).get("p95")
+        b = new["results"].get(name, {}).get("p95")
+        print(f"{name + ' p95':24} {a if a is not None else '-':>9} {b if b is not None else '-':>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a Bite selection log")
+    parser.add_argument("--config-dir", type=Path, default=default_config_dir(), help="Bite config dir (default: the real one)")
+    parser.add_argument("--log", type=Path, help="events.jsonl to replay (default: <config-dir>/events.jsonl)")
+    parser.add_argument("--limit", type=int, help="Replay only the first N events")
+    parser.add_argument("--warm", action="store_true", help="Start from the current mnemonics and brain instead of empty")
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two JSON reports")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    bite = make_replay_bite(args.config_dir, args.warm)
+    events = list(bite.events.read(args.log or args.config_dir / "events.jsonl"))
+    if args.limit:
+        events = events[:args.limit]
+    if not events:
+        print("No events to replay. Enable 'Log Selections for Replay' in Settings first.")
+        return 1
+
+    quality, results = replay(bite, events)
+    bite.shutdown()
+    shutil.rmtree(bite.config_dir, ignore_errors=True)
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except Exception:
+        commit = None
+    report = {
+        "meta": {
+            "commit": commit,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "log": str(args.log or args.config_dir / "events.jsonl"),
+            "warm": args.warm,
+        },
+        "quality": quality,
+        "results": results,
+    }
+    print_report(report)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
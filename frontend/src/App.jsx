@@ -44,6 +44,11 @@ function App() {
   const execLock = useRef(false)
   const resolving = useRef(new Set())
   const lastPos = useRef({ x: 0, y: 0 })
+  // Typing session id: lets the backend narrow the previous keystroke's candidates
+  const searchSession = useRef(Date.now().toString(36))
+  // Query generation: tags streamed result batches so stale ones are discarded
+  const searchGen = useRef(0)
+  const lastBatch = useRef({ gen: 0, batch: 0 })
 
   // Persistent Theme Sync
   // Persistent Theme & Settings Sync
@@ -234,6 +239,28 @@ function App() {
     };
   }, []);
 
+  // Slow tiers (file index, plugins, processes) arrive after the first paint
+  useEffect(() => {
+    let active = true;
+    const onResults = (payload) => {
+      if (!active || !payload || payload.generation !== searchGen.current) return;
+      const prev = lastBatch.current;
+      if (prev.gen === payload.generation && prev.batch >= payload.batch) return;
+      lastBatch.current = { gen: payload.generation, batch: payload.batch };
+      setResults(payload.results);
+      setSelectedIndex(prevIdx => {
+        if (prevIdx >= 0 && prevIdx < payload.results.length) return prevIdx;
+        return payload.results.length > 0 ? 0 : -1;
+      });
+    };
+    const unsubscribe = pytron.on('search_results', onResults);
+    return () => {
+      active = false;
+      if (typeof unsubscribe === 'function') unsubscribe();
+      else pytron.off?.('search_results', onResults);
+    };
+  }, []);
+
   useEffect(() => {
     if (view !== 'search') return;
     let ignored = false;
@@ -243,10 +270,15 @@ function App() {
       return c.startsWith('t:') || c.startsWith('@') || (c.length >= 2 && c[1] === ':') || c.startsWith('/') || c.startsWith('\\');
     };
 
+    // An emptied query starts a fresh typing session
+    if (query.trim() === '') searchSession.current = Date.now().toString(36);
+
     const fetchResults = async () => {
       try {
-        const data = await pytron.search_items(query)
-        if (!ignored) {
+        const gen = ++searchGen.current;
+        const data = await pytron.search_items(query, searchSession.current, gen)
+        // A streamed batch for this generation may already have landed; it is never older
+        if (!ignored && lastBatch.current.gen !== gen) {
           setResults(data)
           if (query.trim() === '') {
             setSelectedIndex(-1);
@@ -331,7 +363,11 @@ function App() {
 
   const togglePin = (id) => {
     pytron.toggle_pin(id).then(() => {
-      pytron.search_items(stateRef.current.query).then(setResults)
+      const gen = ++searchGen.current;
+      pytron.search_items(stateRef.current.query, searchSession.current, gen).then(data => {
+        // A newer keystroke cancels this call in the backend; never paint its empty answer
+        if (searchGen.current === gen && lastBatch.current.gen !== gen) setResults(data)
+      })
     })
   }
 
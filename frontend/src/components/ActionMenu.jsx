@@ -28,7 +28,7 @@ export default function ActionMenu({ item, query, onClose, setView, setQuery, ex
   if (item.path || item.content) {
     actions.push({
       label: 'Copy Path/Content', kbd: 'CTRL C',
-      action: () => { pytron.copy_to_clipboard(item.content || item.path); onClose(); }
+      action: () => { pytron.copy_to_clipboard(item.content || item.path, item.blob); onClose(); }
     });
   }
 
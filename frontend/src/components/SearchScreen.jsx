@@ -31,6 +31,25 @@ function SysStats() {
   );
 }
 
+// Bolds the characters the fuzzy scorer matched (item.match_positions)
+function HighlightedName({ name, positions }) {
+  if (!positions || !positions.length) return name;
+  const hit = new Set(positions);
+  const parts = [];
+  let run = '';
+  let runHit = hit.has(0);
+  for (let i = 0; i < name.length; i++) {
+    if (hit.has(i) !== runHit) {
+      parts.push(runHit ? <span key={i} className="match-char">{run}</span> : run);
+      run = '';
+      runHit = hit.has(i);
+    }
+    run += name[i];
+  }
+  parts.push(runHit ? <span key="end" className="match-char">{run}</span> : run);
+  return <span>{parts}</span>;
+}
+
 export default function SearchScreen({
   query, setQuery, results, selectedIndex, setSelectedIndex,
   executeItem, setShowActionMenu, togglePin, zenMode, openSettings, isResizing
@@ -116,7 +135,7 @@ export default function SearchScreen({
       if (selectedIndex >= 0 && results[selectedIndex]) {
         const item = results[selectedIndex];
         if (item.path || item.content) {
-          pytron.copy_to_clipboard(item.content || item.path);
+          pytron.copy_to_clipboard(item.content || item.path, item.blob);
           pytron.send_notification("Copied", "Item copied to clipboard");
         }
       }
@@ -188,7 +207,7 @@ export default function SearchScreen({
                       </div>
                       <div className="ray-item-info">
                         <span className="ray-item-name">
-                          {item.name}
+                          <HighlightedName name={item.name} positions={item.match_positions} />
                           {item.pinned && <Star size={12} fill="#FFD700" stroke="#FFD700" className="pin-star" />}
                           {index === 0 && query && !item.learned && <span className="top-hit-badge">Top Hit</span>}
                         </span>
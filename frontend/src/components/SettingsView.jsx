@@ -71,10 +71,67 @@ function UpdaterSection() {
   )
 }
 
+function DiagnosticsSection() {
+  const [metrics, setMetrics] = useState({ stages: {}, slow: [] });
+
+  useEffect(() => {
+    pytron.waitForBackend().then(() => {
+      if (pytron.state.search_metrics) setMetrics(pytron.state.search_metrics);
+    });
+    const handleState = (e) => {
+      if (e.detail.search_metrics) setMetrics(e.detail.search_metrics);
+    };
+    window.addEventListener('pytron:state', handleState);
+    return () => window.removeEventListener('pytron:state', handleState);
+  }, []);
+
+  // Slowest stages first
+  const stages = Object.entries(metrics.stages || {}).sort((a, b) => b[1].p95 - a[1].p95);
+
+  return (
+    <div className="settings-section" style={{ borderTop: '1px solid var(--border)', paddingTop: '16px' }}>
+      <div className="section-title">Search Diagnostics</div>
+      {stages.length === 0 ? (
+        <p className="dim" style={{ fontSize: '12px' }}>No searches recorded yet.</p>
+      ) : (
+        <table className="diag-table">
+          <thead>
+            <tr><th>Stage</th><th>Runs</th><th>p50</th><th>p95</th><th>p99</th></tr>
+          </thead>
+          <tbody>
+            {stages.map(([name, s]) => (
+              <tr key={name}>
+                <td>{name}</td>
+                <td>{s.count}</td>
+                <td>{s.p50}ms</td>
+                <td>{s.p95}ms</td>
+                <td>{s.p99}ms</td>
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      )}
+      {metrics.slow && metrics.slow.length > 0 && (
+        <div style={{ marginTop: '12px' }}>
+          <p className="dim" style={{ fontSize: '12px', marginBottom: '6px' }}>Slowest recent queries</p>
+          {metrics.slow.map((q, i) => (
+            <div key={i} className="diag-slow">
+              <span className="sc-key">{q.query || '(empty)'}</span>
+              <span className="sc-url">
+                {q.ms}ms{q.stage === 'streamed' ? ' (streamed)' : ''} — {Object.entries(q.stages).sort((a, b) => b[1] - a[1]).slice(0, 3).map(([k, v]) => `${k} ${v}ms`).join(', ')}
+              </span>
+            </div>
+          ))}
+        </div>
+      )}
+    </div>
+  )
+}
+
 export default function SettingsView({ onClose, isResizing }) {
   const [shortcuts, setShortcuts] = useState([])
   const [snippets, setSnippets] = useState([])
-  const [settings, setSettings] = useState({ theme_color: '#5e5ce6', start_on_boot: false, excluded_folders: [], hide_footer: false })
+  const [settings, setSettings] = useState({ theme_color: '#5e5ce6', start_on_boot: false, excluded_folders: [], hide_footer: false, log_events: false, clipboard_retention: 20000 })
 
   const [form, setForm] = useState({ keyword: '', name: '', url: '' })
   const [editingId, setEditingId] = useState(null)
@@ -261,6 +318,26 @@ export default function SettingsView({ onClose, isResizing }) {
                     style={{ width: '18px', height: '18px', accentColor: 'var(--accent)' }}
                   />
                 </label>
+                <label className="st-row" style={{ display: 'flex', alignItems: 'center', justifyContent: 'space-between', cursor: 'pointer' }} title="Keeps a local events.jsonl of what you pick, for benchmarks/replay.py">
+                  <span style={{ fontSize: '13px' }}>Log Selections for Replay</span>
+                  <input
+                    type="checkbox"
+                    checked={!!settings.log_events}
+                    onChange={e => updateSetting('log_events', e.target.checked)}
+                    style={{ width: '18px', height: '18px', accentColor: 'var(--accent)' }}
+                  />
+                </label>
+                <label className="st-row" style={{ display: 'flex', alignItems: 'center', justifyContent: 'space-between' }}>
+                  <span style={{ fontSize: '13px' }}>Clipboard History Size</span>
+                  <input
+                    type="number"
+                    min="50"
+                    step="1000"
+                    value={settings.clipboard_retention}
+                    onChange={e => updateSetting('clipboard_retention', Math.max(50, parseInt(e.target.value, 10) || 50))}
+                    style={{ width: '90px' }}
+                  />
+                </label>
               </div>
             </div>
 
@@ -497,6 +574,8 @@ export default function SettingsView({ onClose, isResizing }) {
               </div>
             </div>
 
+            <DiagnosticsSection />
+
             <UpdaterSection />
           </>
         )}
@@ -1,6 +1,5 @@
 import os
 import sys
-import json
 import time
 import platform
 import shutil
@@ -17,52 +16,80 @@ from src.core.executor import Executor
 from src.core.indexer import Indexer
 from src.core.plugins import PluginManager
 from src.core.brain import Brain
+from src.core.metrics import LatencyTracker
+from src.core.eventlog import EventLog
+from src.core.store import UserStore
+from src.core.blobs import BlobStore
+from src.core.snapshot import UserSnapshot
 from src.utils.theme_engine import get_wallpaper_path, get_adaptive_color
 
 
 class Bite:
-    def __init__(self, app: App):
-        self.app = app
-        self.platform = platform.system()
-        self.recent_ids = []
-        self.resolved_icons = {}
-        self.active_context = None
+    # Brain implementation (the headless benchmark Bite raises its item cap)
+    brain_class = Brain
 
+    def __init__(self, app: App):
+        system = platform.system()
         # Paths
         config_home = (
             Path(os.environ.get("APPDATA"))
-            if self.platform == "Windows"
+            if system == "Windows"
             else Path.home() / ".config"
         )
-        self.config_dir = config_home / "Bite"
+        self._setup(app, config_home / "Bite", system)
+
+        # Initial Data
+        self.installed_apps = self.scanner.scan_applications()
+        self.workflows = self.scanner.scan_workflows(self.workflow_dir)
+
+        # Background Tasks
+        threading.Thread(target=self.scanner.clipboard_monitor, daemon=True).start()
+        threading.Thread(target=self.scanner.system_monitor, daemon=True).start()
+        self.indexer.start_indexing()
+
+    def _setup(self, app, config_dir: Path, system: str):
+        """
+        Data, stores and modules, without the app scan, monitors or crawler.
+        Shared with the headless Bite (benchmarks, tests) so both wire up the same way.
+        """
+        self.app = app
+        self.platform = system
+        self.recent_ids = []
+        self.resolved_icons = {}
+        self.active_context = None
+        # Data version stamps per domain; the search result cache keys on these
+        self.versions = {}
+        # Per-stage search latency (published to app.state by the system monitor)
+        self.metrics = LatencyTracker()
+
+        self.config_dir = Path(config_dir)
         self.config_dir.mkdir(parents=True, exist_ok=True)
         self.workflow_dir = self.config_dir / "workflows"
         self.workflow_dir.mkdir(parents=True, exist_ok=True)
         self.config_path = self.config_dir / "config.json"
 
         # Initialize data and clipboard
+        self.blobs = BlobStore(self)
+        self.store = UserStore(self)
         self.user_data = self._load_config()
         self.clipboard_history = self.user_data.get("clipboard_history", [])
-        self._last_clipboard = self.clipboard_history[0]["content"] if self.clipboard_history else ""
+        # Full content (not the preview of a large entry), or the newest clip is re-recorded on every start
+        self._last_clipboard = (self.store.load_clip(self.clipboard_history[0]) or "") if self.clipboard_history else ""
+        # Readers (the search path) use the published snapshot, never user_data
+        self._publish_lock = threading.RLock()
+        self.snapshot = UserSnapshot.build(self.user_data)
 
         # Modules
         self.scanner = Scanner(self)
         self.searcher = Searcher(self)
         self.executor = Executor(self)
         self.indexer = Indexer(self)
-        self.brain = Brain(self)
+        self.brain = self.brain_class(self)
         self.plugins = PluginManager(self)
         self.plugins.load_plugins()
+        self.events = EventLog(self)
 
-        # Initial Data
         self.base_registry = self._get_base_registry()
-        self.installed_apps = self.scanner.scan_applications()
-        self.workflows = self.scanner.scan_workflows(self.workflow_dir)
-
-        # Background Tasks
-        threading.Thread(target=self.scanner.clipboard_monitor, daemon=True).start()
-        threading.Thread(target=self.scanner.system_monitor, daemon=True).start()
-        self.indexer.start_indexing()
 
     def _get_base_registry(self):
         reg = [
@@ -389,30 +416,29 @@ class Bite:
                 "theme_color": "#5e5ce6",
                 "start_on_boot": False,
                 "hide_footer": False,
+                "log_events": False,
+                "clipboard_retention": 20000,
                 "excluded_folders": [
                     "node_modules", ".git", ".vscode", "venv", "env", "__pycache__", "dist", "build"
                 ]
             }
         }
-        if self.config_path.exists():
-            try:
-                data = json.loads(self.config_path.read_text())
-                # Deep merge defaults for settings
-                for k, v in defaults.items():
-                    if k not in data:
-                        data[k] = v
-                    elif k == "settings" and isinstance(data[k], dict):
-                        for sk, sv in v.items():
-                            if sk not in data[k]:
-                                data[k][sk] = sv
-                return data
-            except:
-                pass
-        return defaults
+        data = self.store.load()
+        if not data:
+            return defaults
+        # Deep merge defaults for settings
+        for k, v in defaults.items():
+            if k not in data:
+                data[k] = v
+            elif k == "settings" and isinstance(data[k], dict):
+                for sk, sv in v.items():
+                    if sk not in data[k]:
+                        data[k][sk] = sv
+        return data
 
     def update_settings(self, new_settings):
         self.user_data["settings"].update(new_settings)
-        self._save_config()
+        self._save_config("settings", domain=None)
         # Apply startup setting if it was changed
         if "start_on_boot" in new_settings:
             try:
@@ -433,49 +459,81 @@ class Bite:
         if len(q) < 1:
             return
             
-        mnemonics = self.user_data.get("mnemonics", {})
-        # Store as { query: { item_id: count } }
-        if q not in mnemonics:
-            mnemonics[q] = {}
-        
-        if item_id not in mnemonics[q]:
-            mnemonics[q][item_id] = 0
+        with self._publish_lock:
+            mnemonics = self.user_data.get("mnemonics", {})
+            # Store as { query: { item_id: count } }
+            if q not in mnemonics:
+                mnemonics[q] = {}
             
-        mnemonics[q][item_id] += 1
-        
-        # Clean up: only keep top 3 per query to save space
-        if len(mnemonics[q]) > 3:
-            sorted_items = sorted(mnemonics[q].items(), key=lambda x: x[1], reverse=True)
-            mnemonics[q] = dict(sorted_items[:3])
+            if item_id not in mnemonics[q]:
+                mnemonics[q][item_id] = 0
+                
+            mnemonics[q][item_id] += 1
             
-        self.user_data["mnemonics"] = mnemonics
-        self._save_config()
+            # Clean up: only keep top 3 per query to save space
+            if len(mnemonics[q]) > 3:
+                sorted_items = sorted(mnemonics[q].items(), key=lambda x: x[1], reverse=True)
+                mnemonics[q] = dict(sorted_items[:3])
+                
+            self.user_data["mnemonics"] = mnemonics
+            self._publish("mnemonics")
+        # Only this query's rows are rewritten
+        self.store.put_mnemonic(q, mnemonics[q])
+        self.bump_version("user_data")
         
+        # Replay log first: it captures the features the ranking saw, before learning
+        self.events.record(q, item_id)
+
         # Neural Learning: Link this action to the current context
-        self.brain.record_event(item_id)
+        self.brain.record_event(item_id, q)
 
     def record_clipboard(self, content: str):
         if not content or content == self._last_clipboard:
             return
         
         self._last_clipboard = content
-        entry = {"content": content, "time": time.strftime("%H:%M:%S"), "date": time.strftime("%Y-%m-%d")}
+        # Large captures go to the blob store once; the entry carries a preview
+        entry = self.store.make_clip(content, time.strftime("%H:%M:%S"), time.strftime("%Y-%m-%d"))
         
         # Avoid duplicates in history
-        self.clipboard_history = [c for c in self.clipboard_history if c["content"] != content]
-        self.clipboard_history.insert(0, entry)
-        self.clipboard_history = self.clipboard_history[:50] # Keep more history
-        
-        self.user_data["clipboard_history"] = self.clipboard_history
+        with self._publish_lock:
+            self.clipboard_history = [c for c in self.clipboard_history if c.get("hash") != entry["hash"]]
+            self.clipboard_history.insert(0, entry)
+            # Only the recent window lives in memory; the full history is in the store
+            self.clipboard_history = self.clipboard_history[:self.store.RECENT_CLIPS]
+            
+            self.user_data["clipboard_history"] = self.clipboard_history
+            self._publish("clipboard_history")
         self.app.state.clipboard = self.clipboard_history
-        self._save_config()
-
-    def _save_config(self):
-        self.config_path.write_text(json.dumps(self.user_data))
+        self.store.add_clip(entry, keep=self.snapshot.settings.get("clipboard_retention", 20000))
+        self.bump_version("clipboard")
+
+    def bump_version(self, domain: str):
+        self.versions[domain] = self.versions.get(domain, 0) + 1
+
+    def shutdown(self):
+        """Flushes write-behind state before the process exits."""
+        self.indexer.stop()
+        self.brain.close()
+        self.store.close()
+
+    def _publish(self, *keys):
+        """Swaps in a new user_data snapshot with `keys` re-read (the rest is shared)."""
+        with self._publish_lock:
+            self.snapshot = UserSnapshot.build(self.user_data, self.snapshot, keys)
+
+    def _save_config(self, *keys, domain="user_data"):
+        """Stages the changed top-level keys; the store writes them shortly after, in one transaction."""
+        self._publish(*keys)
+        for key in keys:
+            self.store.put(key, self.user_data.get(key))
+        # Scratchpad/settings writes pass None: they never affect search results
+        if domain:
+            self.bump_version(domain)
 
     def update_scratchpad(self, content):
         self.user_data["scratchpad"] = content
-        self._save_config()
+        self._save_config("scratchpad", domain=None)
         return True
 
     def get_python_scratch(self):
@@ -483,7 +541,7 @@ class Bite:
 
     def save_python_scratch(self, code):
         self.user_data["python_scratch"] = code
-        self._save_config()
+        self._save_config("python_scratch", domain=None)
         return True
 
     def promote_lab_to_workflow(self, name, code):
@@ -541,7 +599,7 @@ class Bite:
             self.user_data["pins"].remove(item_id)
         else:
             self.user_data["pins"].append(item_id)
-        self._save_config()
+        self._save_config("pins")
         return True
 
     def create_workflow(self, name):
@@ -615,8 +673,8 @@ class Bite:
             
         return {"path": str(folder_path)}
 
-    def get_results(self, query):
-        return self.searcher.get_results(query)
+    def get_results(self, query, session_id=None, generation=None):
+        return self.searcher.get_results(query, session_id, generation)
 
     def execute(self, item, query=""):
         return self.executor.execute(item, query)
@@ -638,13 +696,11 @@ class Bite:
         if not text or "@" not in text:
             return text
             
-        # Combine both alias stores
-        all_aliases = self.user_data.get("aliases", {}).copy()
-        path_aliases = self.user_data.get("path_aliases", {})
-        all_aliases.update(path_aliases)
-        
-        # Sort by key length descending to prevent partial matches of shorter aliases
-        sorted_keys = sorted(all_aliases.keys(), key=len, reverse=True)
+        # Both alias stores, merged and sorted longest first when the snapshot was published
+        # (prevents partial matches of shorter aliases)
+        snap = self.snapshot
+        all_aliases = snap.aliases
+        sorted_keys = snap.alias_order
         
         expanded = text
         for k in sorted_keys:
@@ -711,14 +767,14 @@ class Bite:
                     "shell": True
                 })
             
-        self._save_config()
+        self._save_config("shortcuts")
         return self.user_data["shortcuts"]
 
     def remove_shortcut(self, k):
         self.user_data["shortcuts"] = [
             s for s in self.user_data["shortcuts"] if s["id"] != k
         ]
-        self._save_config()
+        self._save_config("shortcuts")
         return self.user_data["shortcuts"]
 
     def get_user_shortcuts(self):
@@ -732,14 +788,14 @@ class Bite:
                 "content": c,
             }
         )
-        self._save_config()
+        self._save_config("snippets")
         return self.user_data["snippets"]
 
     def remove_snippet(self, sid):
         self.user_data["snippets"] = [
             s for s in self.user_data["snippets"] if s["id"] != sid
         ]
-        self._save_config()
+        self._save_config("snippets")
         return self.user_data["snippets"]
 
     def get_user_snippets(self):
@@ -748,19 +804,21 @@ class Bite:
     def add_path_alias(self, k, p):
         if "path_aliases" not in self.user_data: self.user_data["path_aliases"] = {}
         self.user_data["path_aliases"][k] = p
-        self._save_config()
+        self._save_config("path_aliases")
         return self.user_data["path_aliases"]
 
     def remove_path_alias(self, k):
         if "path_aliases" in self.user_data:
             if k in self.user_data["path_aliases"]:
                 del self.user_data["path_aliases"][k]
-                self._save_config()
+                self._save_config("path_aliases")
         return self.user_data.get("path_aliases", {})
 
     def _create_file_result(self, entry, desc, tags=None):
         # ALWAYS force a real icon for file/search results to ensure OS logos show up
+        start = time.perf_counter()
         icon_url = get_icon_url(self, entry.path, force=True)
+        self.metrics.record("icons", (time.perf_counter() - start) * 1000)
         display_desc = f"{desc} {entry.path}" if desc else entry.path
         return {
             "id": f"file_{entry.path}",
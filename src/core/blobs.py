@@ -0,0 +1,47 @@
+import os
+import zlib
+from typing import Iterable, Optional
+
+
+class BlobStore:
+    """
+    Content-addressed, zlib-compressed payloads (large clipboard entries).
+    A blob is written once under its SHA-1 (blobs/ab/cdef...) and never rewritten;
+    the clipboard history only carries the hash, a preview and the size.
+    """
+
+    def __init__(self, bite_instance):
+        self.bite = bite_instance
+        self.root = self.bite.config_dir / "blobs"
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: str):
+        return self.root / digest[:2] / digest[2:]
+
+    def put(self, digest: str, content: str) -> bool:
+        """Stores `content` under `digest` unless it is already there."""
+        path = self._path(digest)
+        if path.exists():
+            return True
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(zlib.compress(content.encode("utf-8", "surrogatepass"), 6))
+            os.replace(tmp, path)  # Readers never see a half-written blob
+            return True
+        except Exception as e:
+            print(f"Bite: Failed to store clipboard blob: {e}")
+            return False
+
+    def get(self, digest: str) -> Optional[str]:
+        try:
+            return zlib.decompress(self._path(digest).read_bytes()).decode("utf-8", "surrogatepass")
+        except Exception:
+            return None
+
+    def delete(self, digests: Iterable[str]):
+        for digest in digests:
+            try:
+                self._path(digest).unlink()
+            except OSError:
+                pass
@@ -1,96 +1,429 @@
+import heapq
 import json
+import math
+import re
+import sqlite3
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Optional
 
+try:
+    import numpy as np
+except ImportError:  # Optional: predict() falls back to the per-feature postings
+    np = None
+
 class Brain:
     """
     The 'Stream Perceptron' Brain.
     Treats user life as a series of feature signals.
     Raw data is discarded; only the 'Mathematical Entropy' (weights) is kept.
+
+    Habits fade with exponential time decay (HALF_LIFE_DAYS), applied lazily:
+    a weight w learned at time t is stored as w * e^(λ(t - epoch)). Every stored
+    weight then decays by the same factor e^(-λ(now - epoch)), so rankings and
+    postings never need rewriting as time passes; only reported scores and the
+    significance threshold are scaled at read time.
     """
+    HALF_LIFE_DAYS = 14
+    # Items whose total decayed weight falls below this are forgotten
+    PRUNE_BELOW = 0.01
+    # Upper bound on learned items; the weakest (least frecent) are evicted
+    MAX_ITEMS = 5000
+    PRUNE_EVERY = 100  # events
+    # Stored weights are rescaled before e^(λ(now - epoch)) gets this large
+    REBASE_AT = 30.0
+    # Seconds between write-behind flushes to brain.db
+    FLUSH_INTERVAL = 10
+    # Recent predictions kept (empty query + a few typed prefixes per context)
+    PREDICT_CACHE_SIZE = 32
+    MAX_TITLE_TOKENS = 6
+
     def __init__(self, bite_instance):
         self.bite = bite_instance
-        self.state_path = self.bite.config_dir / "brain_weights.json"
+        self.db_path = self.bite.config_dir / "brain.db"
+        self.state_path = self.bite.config_dir / "brain_weights.json"  # Legacy, migrated once
+        self.decay_rate = math.log(2) / (self.HALF_LIFE_DAYS * 86400)
+        # Wall clock for decay and time features (benchmarks/replay.py replays logged timestamps)
+        self.clock = time.time
+        self.epoch = time.time()
+        self._events = 0
+
+        # Write-behind: items changed since the last flush (None = rewrite everything)
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._stop = threading.Event()
         
-        # State: { item_id: { feature_key: weight_value } }
+        # State: { item_id: { feature_key: scaled_weight } }
+        self._init_db()
         self.weights = self._load_state()
         self.learning_rate = 0.2
-        self.decay_factor = 0.999 # Habit fading (Entropy)
+
+        # feature -> [(weight, item_id)] sorted by weight desc, built lazily per feature
+        self._postings: Dict[str, List] = {}
+        # (version, epoch, features tuple) -> (k, top-k); LRU, stale versions age out
+        self._predict_cache = OrderedDict()
+        self._version = 0  # Bumped whenever any weight changes
+        # item_id -> learning order, breaks score ties like the original full scan
+        self._order = None
+        # NumPy scorer: one sparse column (row indices, weights) per feature, rows in
+        # learning order. Exact (no hashing), so it ranks exactly like _top_k.
+        self._matrix = None  # feature -> {row: weight}; None until first used
+        self._columns: Dict[str, tuple] = {}
+        self._row_ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        # Histories from before decay/eviction may be far over the cap
+        self.prune()
+        self.flush()
+
+        threading.Thread(target=self._flush_loop, daemon=True).start()
         
+    def _init_db(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS weights (
+                item_id TEXT,
+                feature TEXT,
+                weight REAL,
+                PRIMARY KEY (item_id, feature)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.commit()
+        conn.close()
+
     def _load_state(self) -> Dict:
-        if self.state_path.exists():
-            try:
-                return json.loads(self.state_path.read_text())
-            except:
-                return {}
-        return {}
-        
-    def _save_state(self):
+        weights = {}
+        try:
+            conn = sqlite3.connect(self.db_path)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()
+            if row:
+                self.epoch = float(row[0])
+            for item_id, feature, weight in conn.execute("SELECT item_id, feature, weight FROM weights"):
+                weights.setdefault(item_id, {})[feature] = weight
+            conn.close()
+        except Exception as e:
+            print(f"Bite Brain: Failed to load brain.db: {e}")
+        if not weights and self.state_path.exists():
+            weights = self._migrate_json()
+        return weights
+
+    def _migrate_json(self) -> Dict:
+        """One-time import of brain_weights.json (flat or versioned) into brain.db."""
+        try:
+            data = json.loads(self.state_path.read_text())
+        except:
+            return {}
+        if data.get("version") == 2:
+            self.epoch = data["epoch"]
+            weights = data["weights"]
+        else:
+            # Legacy flat weights are the current values: epoch = now keeps them as-is
+            weights = data
+        self._dirty = None
         try:
-            self.state_path.write_text(json.dumps(self.weights))
+            self.state_path.rename(self.state_path.with_suffix(".json.migrated"))
         except:
             pass
+        print(f"Bite Brain: Migrated {len(weights)} items from brain_weights.json")
+        return weights
 
-    def _get_active_features(self) -> List[str]:
-        """Converts current environment into a set of 'Signals'."""
+    def flush(self):
+        """Writes the dirty items to brain.db in one transaction (all or nothing on a crash)."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            if dirty is None:
+                rows = {item_id: dict(w) for item_id, w in self.weights.items()}
+            elif dirty:
+                rows = {item_id: dict(self.weights[item_id]) if item_id in self.weights else None for item_id in dirty}
+            else:
+                return
+            epoch = self.epoch
+
+        try:
+            conn = sqlite3.connect(self.db_path)
+            with conn:
+                if dirty is None:
+                    conn.execute("DELETE FROM weights")
+                else:
+                    conn.executemany("DELETE FROM weights WHERE item_id = ?", [(i,) for i in rows])
+                conn.executemany(
+                    "INSERT INTO weights (item_id, feature, weight) VALUES (?, ?, ?)",
+                    [(i, f, w) for i, feats in rows.items() if feats for f, w in feats.items()],
+                )
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('epoch', ?)", (repr(epoch),))
+            conn.close()
+        except Exception as e:
+            print(f"Bite Brain: Flush failed: {e}")
+            # Keep the changes for the next attempt
+            with self._lock:
+                if dirty is None or self._dirty is None:
+                    self._dirty = None
+                else:
+                    self._dirty.update(dirty)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.FLUSH_INTERVAL):
+            self.flush()
+
+    def close(self):
+        """Stops the background flusher and writes what is left (app exit)."""
+        self._stop.set()
+        self.flush()
+
+    def _growth(self, now: float) -> float:
+        """e^(λ(now - epoch)): scaled weight per unit of real weight at `now`."""
+        return math.exp(self.decay_rate * (now - self.epoch))
+
+    def _invalidate(self):
+        self._postings.clear()
+        self._version += 1
+        self._order = None
+        self._matrix = None
+
+    def _rebase(self, now: float):
+        """Folds the elapsed decay into the stored weights so the scale stays bounded."""
+        factor = 1.0 / self._growth(now)
+        with self._lock:
+            for item_weights in self.weights.values():
+                for f in item_weights:
+                    item_weights[f] *= factor
+            self.epoch = now
+            self._dirty = None
+        self._invalidate()
+
+    def prune(self, now: Optional[float] = None):
+        """Forgets faded items and evicts the weakest ones above MAX_ITEMS."""
+        now = now or self.clock()
+        floor = self.PRUNE_BELOW * self._growth(now)
+        totals = {item_id: sum(w.values()) for item_id, w in self.weights.items()}
+        doomed = {item_id for item_id, total in totals.items() if total < floor}
+        alive = len(totals) - len(doomed)
+        if alive > self.MAX_ITEMS:
+            # Evict down to 90% of the cap so pruning does not run on every event
+            keep = int(self.MAX_ITEMS * 0.9)
+            ranked = sorted((t, item_id) for item_id, t in totals.items() if item_id not in doomed)
+            doomed.update(item_id for _, item_id in ranked[:alive - keep])
+        if doomed:
+            with self._lock:
+                for item_id in doomed:
+                    del self.weights[item_id]
+                if self._dirty is not None:
+                    self._dirty.update(doomed)
+            self._invalidate()
+            self.bite.bump_version("brain")
+        return len(doomed)
+
+    def _get_active_features(self, query: str = "") -> Dict[str, float]:
+        """Converts current environment into a set of 'Signals' (feature -> input strength)."""
         ctx = self.bite.active_context
         proc = ctx.get("process", "unknown") if ctx else "unknown"
         
-        hour = time.localtime().tm_hour
+        now = time.localtime(self.clock())
+        hour = now.tm_hour
         period = "night"
         if 5 <= hour < 12: period = "morning"
         elif 12 <= hour < 17: period = "afternoon"
         elif 17 <= hour < 21: period = "evening"
         
-        return [f"ctx:{proc}", f"time:{period}", "bias:global"]
+        features = {
+            f"ctx:{proc}": 1.0,
+            f"time:{period}": 1.0,
+            "bias:global": 1.0,
+            f"hour:{hour}": 1.0,
+            f"dow:{now.tm_wday}": 1.0,
+        }
+        # Window title words share one unit of input, so long titles do not dominate
+        title = (ctx.get("title") or "") if ctx else ""
+        tokens = list(dict.fromkeys(re.findall(r"[a-z0-9]{3,}", title.lower())))[:self.MAX_TITLE_TOKENS]
+        for token in tokens:
+            features[f"title:{token}"] = 1.0 / len(tokens)
+        if query:
+            features[f"q:{query[:3]}"] = 1.0
+        return features
 
-    def record_event(self, item_id: str):
+    def record_event(self, item_id: str, query: str = ""):
         """Imbibes the event into the internal weights and discards raw data."""
-        features = self._get_active_features()
-        now = time.time()
-        
-        if item_id not in self.weights:
-            self.weights[item_id] = {}
-            
-        target_weights = self.weights[item_id]
+        features = self._get_active_features(query)
+        now = self.clock()
         
+        if self.decay_rate * (now - self.epoch) > self.REBASE_AT:
+            self._rebase(now)
+
         # 1. Update Weights (The 'Learning' pulse)
-        for f in features:
-            current = target_weights.get(f, 0.0)
-            # We add the learning rate to strengthen the connection
-            target_weights[f] = current + self.learning_rate
-            
-        # 2. Competitive Normalization & Entropy ( Habit Fading)
-        # We apply a global decay to ALL weights for this item to keep it stable
-        for f in target_weights:
-            target_weights[f] *= self.decay_factor
+        # We add the learning rate (in today's scale) to strengthen the connection;
+        # 2. Habit fading is the shared time decay, nothing to rewrite here
+        pulse = self.learning_rate * self._growth(now)
+        with self._lock:
+            if item_id not in self.weights:
+                self.weights[item_id] = {}
+                self._order = None
+            target_weights = self.weights[item_id]
+            for f, x in features.items():
+                target_weights[f] = target_weights.get(f, 0.0) + pulse * x
+            if self._dirty is not None:
+                self._dirty.add(item_id)
+            if self._matrix is not None:
+                self._matrix_add(item_id, features, pulse)
             
         # 3. Discard raw data immediately. 
         # The 'event' is now just a shift in the float values.
-        
-        # Periodic save
-        if int(now) % 5 == 0:
-            self._save_state()
+        # Only this item's postings are stale; they are rebuilt on the next predict
+        for f in target_weights:
+            self._postings.pop(f, None)
+        self._version += 1
+        self.bite.bump_version("brain")
 
-    def predict(self) -> List[Dict]:
+        self._events += 1
+        if self._events % self.PRUNE_EVERY == 0 or len(self.weights) > self.MAX_ITEMS:
+            self.prune(now)
+        # Persisted by the write-behind flusher (see flush)
+
+    def _posting(self, feature: str) -> List:
+        posting = self._postings.get(feature)
+        if posting is None:
+            posting = sorted(
+                ((w[feature], item_id) for item_id, w in self.weights.items() if w.get(feature, 0.0) > 0),
+                reverse=True,
+            )
+            self._postings[feature] = posting
+        return posting
+
+    def predict(self, query: str = "", k: int = 8) -> List[Dict]:
         """
-        Calculates the activation energy for all known items 
+        Calculates the activation energy for the known items 
         based on the current signal stream.
+        Cached per feature vector: keystrokes in the same context/time period are a hit.
         """
-        features = self._get_active_features()
-        predictions = []
-        
-        for item_id, item_weights in self.weights.items():
-            # In a Perceptron, score = Sum(weight * input)
-            # Since inputs are binary signals (1 or 0), it's just a sum of present weights.
-            score = 0.0
-            for f in features:
-                score += item_weights.get(f, 0.0)
-                
-            if score > 0.01: # Significance threshold
-                predictions.append({"id": item_id, "score": score})
-                
+        features = self._get_active_features(query)
+        key = (self._version, self.epoch, tuple(sorted(features.items())))
+        decay = 1.0 / self._growth(self.clock())
+        with self._lock:
+            cached = self._predict_cache.get(key)
+            if cached is not None:
+                self._predict_cache.move_to_end(key)
+        if cached is None or cached[0] < k:
+            # Decay is shared by every item, so the cached order stays valid over time
+            scorer = self._top_k_matrix if np is not None else self._top_k
+            cached = (k, scorer(features, k, 0.01 / decay))
+            with self._lock:
+                self._predict_cache[key] = cached
+                while len(self._predict_cache) > self.PREDICT_CACHE_SIZE:
+                    self._predict_cache.popitem(last=False)
+        preds = []
+        for p in cached[1][:k]:
+            score = p["score"] * decay
+            if score > 0.01: # Significance threshold (faded since the cache was built)
+                preds.append({"id": p["id"], "score": score})
+        return preds
+
+    # --- NumPy scorer ---
+
+    def _build_matrix(self):
+        self._row_ids = list(self.weights)
+        self._rows = {item_id: i for i, item_id in enumerate(self._row_ids)}
+        matrix = {}
+        for i, item_id in enumerate(self._row_ids):
+            for f, w in self.weights[item_id].items():
+                matrix.setdefault(f, {})[i] = w
+        self._matrix = matrix
+        self._columns = {}
+
+    def _matrix_add(self, item_id: str, features: Dict[str, float], pulse: float):
+        """Mirrors one record_event into the matrix (called under the lock)."""
+        row = self._rows.get(item_id)
+        if row is None:
+            row = len(self._row_ids)
+            self._row_ids.append(item_id)
+            self._rows[item_id] = row
+        item_weights = self.weights[item_id]
+        for f in features:
+            self._matrix.setdefault(f, {})[row] = item_weights[f]
+            self._columns.pop(f, None)
+
+    def _column(self, feature: str):
+        column = self._columns.get(feature)
+        if column is None:
+            entries = self._matrix.get(feature, {})
+            column = (
+                np.fromiter(entries.keys(), dtype=np.intp, count=len(entries)),
+                np.fromiter(entries.values(), dtype=np.float64, count=len(entries)),
+            )
+            self._columns[feature] = column
+        return column
+
+    def _top_k_matrix(self, features, k, floor=0.01) -> List[Dict]:
+        """
+        Sparse input x sparse columns: scores accumulate feature by feature in the
+        same order as _top_k's sum, so both scorers produce the same floats.
+        """
+        with self._lock:
+            if self._matrix is None:
+                self._build_matrix()
+            n = len(self._row_ids)
+            if not n:
+                return []
+            scores = np.zeros(n, dtype=np.float64)
+            for f, x in features.items():
+                rows, weights = self._column(f)
+                scores[rows] += weights * x
+            row_ids = self._row_ids
+
+        if n > k:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+            # Keep everything tied with the k-th score so ties resolve by learning order
+            candidates = np.flatnonzero(scores >= scores[candidates].min())
+        else:
+            candidates = np.arange(n)
+        ranked = sorted(candidates.tolist(), key=lambda r: (-scores[r], r))
+        return [
+            {"id": row_ids[r], "score": float(scores[r])}
+            for r in ranked[:k] if scores[r] > floor # Significance threshold (in stored scale)
+        ]
+
+    # --- Pure-Python scorer ---
+
+    def _top_k(self, features, k, floor=0.01) -> List[Dict]:
+        """
+        Threshold algorithm over the per-feature postings: walk every posting in
+        weight order, score each newly seen item exactly, and stop once the k-th
+        best score beats the weighted sum of the weights still ahead of the cursors.
+        """
+        inputs = [features[f] for f in features]
+        postings = [self._posting(f) for f in features]
+        if self._order is None:
+            self._order = {item_id: i for i, item_id in enumerate(self.weights)}
+        order = self._order
+        seen = set()
+        top = []  # min-heap of (score, -order, item_id): the weakest / latest-learned on top
+        depth = 0
+        while True:
+            threshold = 0.0
+            advanced = False
+            for x, posting in zip(inputs, postings):
+                if depth >= len(posting):
+                    continue
+                advanced = True
+                weight, item_id = posting[depth]
+                threshold += x * weight
+                if item_id in seen:
+                    continue
+                seen.add(item_id)
+                item_weights = self.weights[item_id]
+                # In a Perceptron, score = Sum(weight * input)
+                score = sum(item_weights.get(f, 0.0) * x for f, x in features.items())
+                if score > floor: # Significance threshold (in stored scale)
+                    entry = (score, -order[item_id], item_id)
+                    if len(top) < k:
+                        heapq.heappush(top, entry)
+                    elif entry > top[0]:
+                        heapq.heapreplace(top, entry)
+            depth += 1
+            # Strict: an unseen item tying the k-th score could still win on order
+            if not advanced or (len(top) == k and top[0][0] > threshold):
+                break
+
         # Sort by 'Activation Energy'
-        predictions.sort(key=lambda x: -x["score"])
-        return predictions[:8]
+        return [{"id": item_id, "score": score} for score, _, item_id in sorted(top, reverse=True)]
@@ -0,0 +1,61 @@
+import json
+import threading
+import time
+from typing import Dict, Iterator
+
+
+class EventLog:
+    """
+    Opt-in local log of selections (Settings -> "Log Selections for Replay").
+    One JSON line per pick: the query, the context and brain features at the time,
+    and the chosen id. Never leaves the machine; `benchmarks/replay.py` reads it
+    back to score ranking changes on real usage.
+    """
+
+    MAX_BYTES = 5 * 1024 * 1024  # Rotated to events.jsonl.1 past this size
+
+    def __init__(self, bite_instance):
+        self.bite = bite_instance
+        self.path = self.bite.config_dir / "events.jsonl"
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.bite.snapshot.settings.get("log_events"))
+
+    def record(self, query: str, item_id: str):
+        if not item_id or not self.enabled:
+            return
+        ctx = self.bite.active_context or {}
+        event = {
+            "ts": time.time(),
+            "query": query,
+            "id": item_id,
+            "context": {"process": ctx.get("process"), "title": ctx.get("title")},
+            "features": self.bite.brain._get_active_features(query),
+        }
+        line = json.dumps(event) + "\n"
+        try:
+            with self._lock:
+                if self.path.exists() and self.path.stat().st_size > self.MAX_BYTES:
+                    self.path.replace(self.path.with_name(self.path.name + ".1"))
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except Exception as e:
+            print(f"Bite: Failed to log event: {e}")
+
+    def read(self, path=None) -> Iterator[Dict]:
+        """Yields logged events oldest first (skips torn or foreign lines)."""
+        path = path or self.path
+        rotated = path.with_name(path.name + ".1")
+        for p in (rotated, path):
+            if not p.exists():
+                continue
+            with open(p, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(event, dict) and event.get("id"):
+                        yield event
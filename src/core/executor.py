@@ -67,10 +67,14 @@ class Executor:
                     self.bite.recent_ids.remove(iid)
                 self.bite.recent_ids.insert(0, iid)
                 self.bite.recent_ids = self.bite.recent_ids[:10]
+                self.bite.bump_version("recents")
                 
                 # Mnemonic Learning (Quicksilver style)
                 if query and len(query.strip()) > 0:
                     self.bite.record_selection(query, iid)
+                else:
+                    # Picked from the empty-query suggestions; only the replay log sees it
+                    self.bite.events.record("", iid)
 
             if item.get("action") == "help":
                 self.cross_platform_open("https://pytron-kit.github.io/bite")
@@ -181,7 +185,15 @@ class Executor:
             elif self.platform == "Linux":
                 subprocess.run(["systemctl", "suspend"])
         elif act == "paste":
-            pyperclip.copy(item["content"])
+            if item.get("blob"):
+                content = self.bite.store.load_clip({"hash": item["blob"], "blob": True})
+                if content is None:
+                    # Never paste the truncated preview in place of the original
+                    self.bite.app.system_notification("Paste Failed", "The stored clipboard entry is missing.")
+                    raise FileNotFoundError("Clipboard entry is missing")
+                pyperclip.copy(content)
+            else:
+                pyperclip.copy(item["content"])
         elif act == "kill_py":
             for proc in psutil.process_iter():
                 try:
@@ -0,0 +1,210 @@
+from typing import List, Optional, Tuple
+
+# fzf-style scoring constants
+SCORE_MATCH = 16
+SCORE_GAP_START = -3
+SCORE_GAP_EXTENSION = -1
+BONUS_BOUNDARY = SCORE_MATCH // 2          # After a non-word char
+BONUS_BOUNDARY_WHITE = BONUS_BOUNDARY + 2  # After whitespace / start of text
+BONUS_BOUNDARY_DELIMITER = BONUS_BOUNDARY + 1  # After a path separator or '-', '_', '.'
+BONUS_NON_WORD = BONUS_BOUNDARY
+BONUS_CAMEL123 = BONUS_BOUNDARY + SCORE_GAP_EXTENSION  # fooBar, foo123
+BONUS_CONSECUTIVE = -(SCORE_GAP_START + SCORE_GAP_EXTENSION)
+BONUS_FIRST_CHAR_MULTIPLIER = 2
+
+_WHITE, _DELIMITER, _NON_WORD, _LOWER, _UPPER, _NUMBER = range(6)
+_DELIMITERS = set("/\\-_.:,;|")
+
+Match = Tuple[int, List[int]]  # (score 0-100, matched character positions)
+
+
+def _char_class(ch: str) -> int:
+    if ch.isspace():
+        return _WHITE
+    if ch in _DELIMITERS:
+        return _DELIMITER
+    if ch.isdigit():
+        return _NUMBER
+    if ch.isupper():
+        return _UPPER
+    if ch.isalpha():
+        return _LOWER
+    return _NON_WORD
+
+
+def _bonus(prev: int, cls: int) -> int:
+    if cls > _NON_WORD:
+        if prev == _WHITE:
+            return BONUS_BOUNDARY_WHITE
+        if prev == _DELIMITER:
+            return BONUS_BOUNDARY_DELIMITER
+        if prev == _NON_WORD:
+            return BONUS_BOUNDARY
+    if (prev == _LOWER and cls == _UPPER) or (prev != _NUMBER and cls == _NUMBER):
+        return BONUS_CAMEL123
+    if cls == _WHITE:
+        return BONUS_BOUNDARY_WHITE
+    if cls in (_DELIMITER, _NON_WORD):
+        return BONUS_NON_WORD
+    return 0
+
+
+def fold(text: str) -> str:
+    """
+    Lowercase with exactly one character per input character ('İ'.lower() is two),
+    so match positions and the bonus table index the original text.
+    """
+    lower = text.lower()
+    if len(lower) == len(text):
+        return lower
+    return "".join(ch.lower()[0] for ch in text)
+
+
+class FuzzyText:
+    """A match target with its lowercase form and per-character boundary bonuses precomputed."""
+
+    __slots__ = ("text", "lower", "bonus")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = fold(text)
+        bonus = []
+        prev = _WHITE  # Start of text counts as a word boundary
+        for ch in text:
+            cls = _char_class(ch)
+            bonus.append(_bonus(prev, cls))
+            prev = cls
+        self.bonus = bonus
+
+
+def _ideal(m: int) -> int:
+    """Raw score of an m-char query matched as a run at the very start of a word."""
+    first = SCORE_MATCH + BONUS_BOUNDARY_WHITE * BONUS_FIRST_CHAR_MULTIPLIER
+    return first + (m - 1) * (SCORE_MATCH + BONUS_BOUNDARY_WHITE)
+
+
+def _score_positions(bonus: List[int], positions: List[int]) -> int:
+    score = 0
+    consecutive = 0
+    first_bonus = 0
+    prev = -1
+    for k, p in enumerate(positions):
+        if k and p != prev + 1:
+            gap = p - prev - 1
+            score += SCORE_GAP_START + SCORE_GAP_EXTENSION * (gap - 1)
+            consecutive = 0
+        b = bonus[p]
+        if consecutive == 0:
+            first_bonus = b
+        else:
+            # A consecutive run keeps the bonus of the boundary that started it
+            if b >= BONUS_BOUNDARY and b > first_bonus:
+                first_bonus = b
+            b = max(b, first_bonus, BONUS_CONSECUTIVE)
+        score += SCORE_MATCH + (b * BONUS_FIRST_CHAR_MULTIPLIER if k == 0 else b)
+        consecutive += 1
+        prev = p
+    return score
+
+
+def _normalize(raw: int, m: int, positions: List[int]) -> int:
+    score = 95 * min(raw, _ideal(m)) / _ideal(m)
+    if positions[0]:
+        score *= 0.9  # Prefix of the whole text beats a later word start
+    runs = 1 + sum(1 for a, b in zip(positions, positions[1:]) if b != a + 1)
+    score *= 0.95 ** (runs - 1)  # One contiguous run beats scattered fragments
+    return max(1, int(round(score)))
+
+
+def match(query: str, target: FuzzyText) -> Optional[Match]:
+    """
+    Scores `query` (lowercase, see fold) against `target`.
+    Returns (score, positions) or None when the query is not a subsequence.
+    100 = exact, ~95 = prefix, ~85 = word start, ~70 = acronym, lower = scattered.
+    """
+    text = target.lower
+    m = len(query)
+    if not m or m > len(text):
+        return None
+    if text == query:
+        return 100, list(range(m))
+
+    bonus = target.bonus
+    best = None
+
+    # Substring hits: try each occurrence and keep the best aligned one
+    pos = text.find(query)
+    while pos >= 0:
+        positions = list(range(pos, pos + m))
+        raw = _score_positions(bonus, positions)
+        if best is None or raw > best[0]:
+            best = (raw, positions)
+        pos = text.find(query, pos + 1)
+
+    if best is None:
+        # Forward scan for the first complete subsequence...
+        end = -1
+        for ch in query:
+            end = text.find(ch, end + 1)
+            if end < 0:
+                return None
+        # ...then backward from its end for the shortest window
+        start = end + 1
+        for ch in reversed(query):
+            start = text.rfind(ch, 0, start)
+
+        # The shortest window can miss word starts ('gc' in 'Google Chrome'),
+        # so every boundary occurrence of the first char is tried as well
+        starts = [start]
+        p = text.find(query[0])
+        while p >= 0 and len(starts) < 8:
+            if p != start and bonus[p] >= BONUS_BOUNDARY:
+                starts.append(p)
+            p = text.find(query[0], p + 1)
+        for first in starts:
+            limit = end + 1 if first == start else len(text)
+            positions = _fill(text, bonus, query, first, limit)
+            if positions is None:
+                continue
+            raw = _score_positions(bonus, positions)
+            if best is None or raw > best[0]:
+                best = (raw, positions)
+
+    raw, positions = best
+    return _normalize(raw, m, positions), positions
+
+
+def _fill(text: str, bonus: List[int], query: str, first: int, end: int) -> Optional[List[int]]:
+    """Greedy left-to-right placement from `first`, preferring word-boundary characters."""
+    positions = [first]
+    p = first
+    for i in range(1, len(query)):
+        ch = query[i]
+        nxt = text.find(ch, p + 1, end)
+        if nxt < 0:
+            return None
+        # Jump to a later boundary occurrence if the rest of the query still fits after it
+        cand = nxt
+        while cand >= 0 and bonus[cand] < BONUS_BOUNDARY:
+            cand = text.find(ch, cand + 1, end)
+        if cand >= 0 and cand != nxt and _fits(text, query, i + 1, cand + 1, end):
+            nxt = cand
+        positions.append(nxt)
+        p = nxt
+    return positions
+
+
+def _fits(text: str, query: str, qi: int, start: int, end: int) -> bool:
+    """True if query[qi:] is still a subsequence of text[start:end]."""
+    p = start - 1
+    for ch in query[qi:]:
+        p = text.find(ch, p + 1, end)
+        if p < 0:
+            return False
+    return True
+
+
+def match_batch(query: str, targets: List[FuzzyText]) -> List[Optional[Match]]:
+    """Scores a whole candidate list in one call; results are aligned with `targets`."""
+    query = fold(query)
+    return [match(query, t) for t in targets]
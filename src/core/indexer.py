@@ -3,18 +3,75 @@ import sqlite3
 import threading
 import time
 import platform
+import stat
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, List, Tuple
 from PIL import Image
 import colorsys
 
+from .watcher import FileWatcher
+
 
 class Indexer:
+    # Crawl interval for everything the watcher does not fully cover (system roots,
+    # drives, trees past its watch limit); watched roots are only reconciled weekly
+    CRAWL_INTERVAL = 24 * 60 * 60
+    RECONCILE_INTERVAL = 7 * 24 * 60 * 60
+    # Directory listings run in parallel (I/O bound, the GIL is released in scandir/stat)
+    CRAWL_WORKERS = min(8, (os.cpu_count() or 2) + 2)
+    CRAWL_INFLIGHT = CRAWL_WORKERS * 4
+
+    UPSERT_SQL = """
+        INSERT INTO files (path, name, mtime, is_dir, last_seen, tags, parent)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            last_seen = excluded.last_seen,
+            parent = excluded.parent,
+            name = CASE WHEN mtime != excluded.mtime THEN excluded.name ELSE name END,
+            is_dir = CASE WHEN mtime != excluded.mtime THEN excluded.is_dir ELSE is_dir END,
+            tags = CASE WHEN mtime != excluded.mtime THEN excluded.tags ELSE tags END,
+            mtime = excluded.mtime
+    """
+
+    # Crawl merge: only staged rows that are new or differ reach `files`
+    MERGE_SQL = """
+        INSERT INTO files (path, name, mtime, is_dir, last_seen, tags, parent)
+        SELECT s.path, s.name, s.mtime, s.is_dir, s.last_seen, s.tags, s.parent
+        FROM temp.scan s LEFT JOIN files f ON f.path = s.path
+        WHERE s.rowid > ? AND (f.path IS NULL OR f.mtime IS NOT s.mtime OR f.parent IS NOT s.parent)
+        ON CONFLICT(path) DO UPDATE SET
+            name = excluded.name,
+            mtime = excluded.mtime,
+            is_dir = excluded.is_dir,
+            last_seen = excluded.last_seen,
+            tags = excluded.tags,
+            parent = excluded.parent
+    """
+
+    # VACUUM only once this share of the file is free pages
+    VACUUM_FREE_RATIO = 0.25
+
+    DIRS_UPSERT_SQL = """
+        INSERT INTO dirs (path, mtime, entries, last_seen, listed)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            mtime = excluded.mtime,
+            entries = excluded.entries,
+            last_seen = excluded.last_seen,
+            listed = excluded.listed
+    """
+
     def __init__(self, bite_instance):
         self.bite = bite_instance
         self.db_path = bite_instance.config_dir / "index.db"
         self.stop_event = threading.Event()
-        self._conn = None
+        self.watcher = FileWatcher(bite_instance)
+        # One read connection per thread: searches run on the provider pool
+        self._local = threading.local()
+        self.trigram = True
+        # files_trgm still to be populated (by the indexing thread; LIKE until then)
+        self.trigram_pending = False
         self._init_db()
 
         self.exclude_dirs = {
@@ -53,7 +110,8 @@ class Indexer:
                 mtime REAL,
                 is_dir INTEGER,
                 last_seen REAL,
-                tags TEXT
+                tags TEXT,
+                parent TEXT
             )
         """)
 
@@ -68,8 +126,23 @@ class Indexer:
                 conn.execute("ALTER TABLE files ADD COLUMN tags TEXT")
                 conn.commit()
                 print("Bite Indexer: Migrated database to include 'tags'")
+            if "parent" not in columns:
+                conn.execute("ALTER TABLE files ADD COLUMN parent TEXT")
+                conn.commit()
+                print("Bite Indexer: Migrated database to include 'parent'")
         except: pass
 
+        # Directories the crawl listed: an unchanged mtime means an unchanged listing
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY,
+                mtime REAL,
+                entries INTEGER,
+                last_seen REAL,
+                listed REAL
+            )
+        """)
+
         conn.execute("""
             CREATE TABLE IF NOT EXISTS metadata (
                 key TEXT PRIMARY KEY,
@@ -120,25 +193,102 @@ class Indexer:
                 INSERT INTO files_fts(files_fts, rowid, name) VALUES('delete', old.rowid, old.name);
             END;
         """)
+        # Only renames touch the FTS index (mtime / last_seen / tags updates don't)
+        conn.execute("DROP TRIGGER IF EXISTS files_au")
         conn.execute("""
-            CREATE TRIGGER IF NOT EXISTS files_au AFTER UPDATE ON files BEGIN
+            CREATE TRIGGER files_au AFTER UPDATE OF name ON files WHEN old.name IS NOT new.name BEGIN
                 INSERT INTO files_fts(files_fts, rowid, name) VALUES('delete', old.rowid, old.name);
                 INSERT INTO files_fts(rowid, name) VALUES (new.rowid, new.name);
             END;
         """)
 
+        # Trigram FTS over name + tags: substring / infix search without scanning `files`
+        try:
+            built = conn.execute("SELECT 1 FROM metadata WHERE key = 'trgm_built'").fetchone()
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS files_trgm USING fts5(
+                    name,
+                    tags,
+                    content='files',
+                    content_rowid='rowid',
+                    tokenize='trigram'
+                )
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS files_trgm_ai AFTER INSERT ON files BEGIN
+                    INSERT INTO files_trgm(rowid, name, tags) VALUES (new.rowid, new.name, new.tags);
+                END;
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS files_trgm_ad AFTER DELETE ON files BEGIN
+                    INSERT INTO files_trgm(files_trgm, rowid, name, tags) VALUES ('delete', old.rowid, old.name, old.tags);
+                END;
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS files_trgm_au AFTER UPDATE OF name, tags ON files
+                WHEN old.name IS NOT new.name OR old.tags IS NOT new.tags BEGIN
+                    INSERT INTO files_trgm(files_trgm, rowid, name, tags) VALUES ('delete', old.rowid, old.name, old.tags);
+                    INSERT INTO files_trgm(rowid, name, tags) VALUES (new.rowid, new.name, new.tags);
+                END;
+            """)
+            if not built:
+                if conn.execute("SELECT 1 FROM files LIMIT 1").fetchone():
+                    # Indexing an existing database takes seconds: not on the startup path
+                    self.trigram = False
+                    self.trigram_pending = True
+                else:
+                    conn.execute("INSERT INTO metadata (key, value) VALUES ('trgm_built', '1')")
+        except sqlite3.OperationalError:
+            # SQLite without FTS5/trigram (< 3.34): substring search falls back to LIKE
+            self.trigram = False
+
         conn.commit()
         conn.close()
 
     def get_connection(self):
-        if self._conn is None:
-            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            self._conn.row_factory = sqlite3.Row
-        return self._conn
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
 
     def start_indexing(self):
         self.is_indexing = False
         threading.Thread(target=self._index_loop, daemon=True).start()
+        # Watches are added on a thread too: walking the user folders takes a moment
+        threading.Thread(target=self.watcher.start, args=(self.priority_roots(),), daemon=True).start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.watcher.stop()
+
+    def priority_roots(self) -> List[str]:
+        """User folders: crawled first and watched for changes."""
+        home = Path.home()
+        return [str(home / d) for d in ("Desktop", "Documents", "Downloads", "Videos", "Pictures")]
+
+    def active_excludes(self) -> set:
+        """Built-in + user directory exclusions (lower-case names)."""
+        user_excludes = self.bite.snapshot.settings.get("excluded_folders", [])
+        active = self.exclude_dirs.union(set(user_excludes))
+        active.update({
+            ".git", ".svn", ".vs", ".vscode", "__pycache__",
+            "node_modules", "dist", "build", "env", "venv", "appdata"
+        })
+        return active
+
+    def is_excluded(self, name: str, is_dir: bool, excludes: set) -> bool:
+        if name.startswith("."):
+            return True
+        if is_dir:
+            return name.lower() in excludes
+        return os.path.splitext(name)[1].lower() in self.exclude_exts
+
+    def _file_row(self, path: str, name: str, mtime: float, is_dir: bool, seen: float) -> tuple:
+        # Minimal Analysis for now to avoid huge perf hits
+        tags = self._analyze_file(path) if not is_dir and name.lower().endswith(('.jpg', '.png')) else ""
+        return (path, name, mtime, 1 if is_dir else 0, seen, tags, os.path.dirname(path))
 
     def _analyze_file(self, path: str) -> str:
         """Extract semantic tags from a file (e.g. colors from images)"""
@@ -177,25 +327,41 @@ class Indexer:
             except: pass
         return ""
 
+    def _build_trigram(self):
+        """Populates files_trgm for a database that predates it, then switches searches over from LIKE."""
+        if not self.trigram_pending:
+            return
+        print("Bite Indexer: Building trigram index...")
+        start_time = time.time()
+        try:
+            conn = sqlite3.connect(self.db_path)
+            with conn:
+                conn.execute("INSERT INTO files_trgm(files_trgm) VALUES ('rebuild')")
+                conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('trgm_built', '1')")
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"Bite Indexer: Trigram build failed (substring search stays on LIKE): {e}")
+            return
+        self.trigram_pending = False
+        self.trigram = True
+        print(f"Bite Indexer: Trigram index built in {time.time() - start_time:.2f}s")
+
     def _index_loop(self):
+        self._build_trigram()
         # Initial wait for app to stabilize
         time.sleep(5)
 
         while not self.stop_event.is_set():
             try:
-                # Conservative Check: Only index if last scan was > 24 hours ago
-                conn = sqlite3.connect(self.db_path)
-                res = conn.execute("SELECT value FROM metadata WHERE key='last_full_scan'").fetchone()
-                last_scan = float(res[0]) if res else 0
-                conn.close()
-                
-                if time.time() - last_scan > (24 * 60 * 60):
+                # Conservative Check: Only crawl if the last scan is older than the interval
+                keys, skip = self._crawl_plan(time.time())
+                if keys:
                      self.is_indexing = True
-                     self._run_indexing()
+                     self._run_indexing(skip)
                      
                      # Update last scan time
                      conn = sqlite3.connect(self.db_path)
-                     conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('last_full_scan', ?)", (str(time.time()),))
+                     conn.executemany("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", [(k, str(time.time())) for k in keys])
                      conn.commit()
                      conn.close()
             except Exception as e:
@@ -209,19 +375,31 @@ class Indexer:
                     break
                 time.sleep(1)
 
-    def _run_indexing(self):
-        print("Bite Indexer: Starting background crawl...")
+    def _crawl_plan(self, now: float) -> Tuple[List[str], List[str]]:
+        """(metadata keys to stamp, roots to skip) for the crawl due at `now`; no keys = none due."""
+        conn = sqlite3.connect(self.db_path)
+        meta = dict(conn.execute("SELECT key, value FROM metadata WHERE key IN ('last_full_scan', 'last_crawl')"))
+        conn.close()
+        last_full = float(meta.get("last_full_scan", 0))
+        last_crawl = max(last_full, float(meta.get("last_crawl", 0)))
+
+        # Fully watched roots are kept current by events; only the rest needs the daily crawl
+        watched = self.watcher.watched_roots()
+        if now - last_full > (self.RECONCILE_INTERVAL if watched else self.CRAWL_INTERVAL):
+            return ["last_full_scan", "last_crawl"], []
+        if now - last_crawl > self.CRAWL_INTERVAL:
+            return ["last_crawl"], watched
+        return [], []
+
+    def _run_indexing(self, skip: List[str] = ()):
+        """Crawls every root; subtrees in `skip` (fully watched) are neither listed nor cleaned up."""
+        skip = set(skip)
+        print(f"Bite Indexer: Starting background crawl{f' (skipping {len(skip)} watched roots)' if skip else ''}...")
         start_time = time.time()
 
         # Priority Roots: User folders first
-        priority_roots = [
-            str(Path.home() / "Desktop"),
-            str(Path.home() / "Documents"),
-            str(Path.home() / "Downloads"),
-            str(Path.home() / "Videos"),
-            str(Path.home() / "Pictures"),
-        ]
-        
+        priority_roots = self.priority_roots()
+
         system_roots = []
         if platform.system() == "Windows":
             system_roots = self.bite._get_drives()
@@ -231,11 +409,11 @@ class Indexer:
         # Deduplicate and prioritize
         all_roots = []
         for r in priority_roots:
-            if os.path.exists(r) and r not in all_roots:
+            if os.path.exists(r) and r not in all_roots and r not in skip:
                 all_roots.append(r)
         
         for r in system_roots:
-            if os.path.exists(r) and r not in all_roots:
+            if os.path.exists(r) and r not in all_roots and r not in skip:
                 all_roots.append(r)
 
         conn = sqlite3.connect(self.db_path)
@@ -246,99 +424,185 @@ class Indexer:
 
         batch = []
         count = 0
+        changed = 0
         current_scan_time = time.time()
 
-        # Merged exclusions
-        user_excludes = self.bite.user_data.get("settings", {}).get("excluded_folders", [])
-        active_excludes = self.exclude_dirs.union(set(user_excludes))
-        
-        active_excludes.update({
-            ".git", ".svn", ".vs", ".vscode", "__pycache__", 
-            "node_modules", "dist", "build", "env", "venv", "AppData"
-        })
-
-        for root in all_roots:
-            if self.stop_event.is_set():
-                break
-            
-            for base, dirs, files in os.walk(root):
-                if self.stop_event.is_set():
-                    break
-                
-                # Filter directories (Case-Insensitive)
-                dirs[:] = [d for d in dirs if d.lower() not in active_excludes and not d.startswith('.')]
+        # Listings are staged here and merged set-wise; unchanged rows are never rewritten
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS scan (
+                path TEXT PRIMARY KEY, name TEXT, mtime REAL, is_dir INTEGER,
+                last_seen REAL, tags TEXT, parent TEXT
+            )
+        """)
+        cursor.execute("DELETE FROM temp.scan")
+        merged = 0  # Highest temp.scan rowid already merged into files
 
-                # Batch entries - only update FTS if modified
-                for d in dirs:
-                    full_path = os.path.join(base, d)
-                    try:
-                        mtime = os.path.getmtime(full_path)
-                        batch.append((full_path, d, mtime, 1, current_scan_time, ""))
-                        count += 1
-                    except: continue
-                
-                for f in files:
-                    if f.startswith(".") or os.path.splitext(f)[1].lower() in self.exclude_exts:
-                        continue
-                        
-                    full_path = os.path.join(base, f)
-                    try:
-                        mtime = os.path.getmtime(full_path)
-                        # Minimal Analysis for now to avoid huge perf hits
-                        tags = self._analyze_file(full_path) if f.lower().endswith(('.jpg', '.png')) else ""
-                        batch.append((full_path, f, mtime, 0, current_scan_time, tags))
-                        count += 1
-                    except: continue
-
-                if len(batch) >= 1000:
-                    cursor.executemany("""
-                        INSERT INTO files (path, name, mtime, is_dir, last_seen, tags) 
-                        VALUES (?, ?, ?, ?, ?, ?)
-                        ON CONFLICT(path) DO UPDATE SET
-                            last_seen = excluded.last_seen,
-                            name = CASE WHEN mtime != excluded.mtime THEN excluded.name ELSE name END,
-                            is_dir = CASE WHEN mtime != excluded.mtime THEN excluded.is_dir ELSE is_dir END,
-                            tags = CASE WHEN mtime != excluded.mtime THEN excluded.tags ELSE tags END,
-                            mtime = excluded.mtime
-                    """, batch)
+        # Merged exclusions
+        active_excludes = self.active_excludes()
+
+        # Directories whose mtime is unchanged since they were last listed are not re-listed
+        cache = self._load_dir_cache(conn)
+        dir_batch = []
+        unchanged = 0
+
+        # Directories are listed on a small pool; this thread is the only SQLite writer.
+        # Depth-first frontier (roots reversed so user folders come off it first),
+        # at most CRAWL_INFLIGHT listings outstanding so memory stays bounded.
+        frontier = []
+        for r in reversed(all_roots):
+            try:
+                frontier.append((r, os.stat(r).st_mtime))
+            except OSError:
+                continue
+        inflight = set()
+        with ThreadPoolExecutor(max_workers=self.CRAWL_WORKERS, thread_name_prefix="bite-crawl") as pool:
+            while (frontier or inflight) and not self.stop_event.is_set():
+                while frontier and len(inflight) < self.CRAWL_INFLIGHT:
+                    path, mtime = frontier.pop()
+                    inflight.add(pool.submit(self._scan_dir, path, mtime, active_excludes, current_scan_time, cache))
+                done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rows, subdirs, dir_row = future.result()
+                    batch.extend(rows)
+                    frontier.extend(d for d in subdirs if d[0] not in skip)
+                    if dir_row:
+                        dir_batch.append(dir_row)
+                        if dir_row[4] != current_scan_time:
+                            unchanged += 1
+
+                if len(batch) >= 1000 or len(dir_batch) >= 1000:
+                    merged, n = self._merge_scan(cursor, batch, dir_batch, merged)
                     conn.commit()
-                    batch = []
-                    time.sleep(0.15)
-
-        if batch:
-            cursor.executemany("""
-                INSERT INTO files (path, name, mtime, is_dir, last_seen, tags) 
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(path) DO UPDATE SET
-                    last_seen = excluded.last_seen,
-                    name = CASE WHEN mtime != excluded.mtime THEN excluded.name ELSE name END,
-                    is_dir = CASE WHEN mtime != excluded.mtime THEN excluded.is_dir ELSE is_dir END,
-                    tags = CASE WHEN mtime != excluded.mtime THEN excluded.tags ELSE tags END,
-                    mtime = excluded.mtime
-            """, batch)
+                    if n:
+                        self.bite.bump_version("files")
+                    count += len(batch)
+                    changed += n
+                    batch, dir_batch = [], []
+            for future in inflight:
+                future.cancel()
+
+        if batch or dir_batch:
+            merged, n = self._merge_scan(cursor, batch, dir_batch, merged)
             conn.commit()
+            if n:
+                self.bite.bump_version("files")
+            count += len(batch)
+            changed += n
 
         # Cleanup stale entries (no longer seen in this scan)
         if not self.stop_event.is_set():
-            cursor.execute(
-                "DELETE FROM files WHERE last_seen < ?", (current_scan_time - 10,)
-            )
+            # Rows not staged in this scan, except the entries of directories that were
+            # seen but skipped as unchanged, and recent writes (watcher, index_path)
+            params = {"stale": current_scan_time - 10, "scan": current_scan_time}
+            outside = ""  # ... and anything inside the skipped (watched) subtrees
+            for i, root in enumerate(sorted(skip)):
+                prefix = os.path.join(root, "")
+                outside += f" AND path != :r{i} AND substr(path, 1, {len(prefix)}) != :p{i}"
+                params.update({f"r{i}": root, f"p{i}": prefix})
+            cursor.execute(f"""
+                DELETE FROM files WHERE last_seen < :stale
+                AND path NOT IN (SELECT path FROM temp.scan)
+                AND (parent IS NULL OR parent NOT IN (
+                    SELECT path FROM dirs WHERE last_seen = :scan AND listed < :scan
+                )){outside}
+            """, params)
+            changed += cursor.rowcount
+            cursor.execute(f"DELETE FROM dirs WHERE last_seen < :scan{outside}", params)
             conn.commit()
+            if changed:
+                self.bite.bump_version("files")
 
             # Optimization Phase (The "Magic" part)
-            print("Bite Indexer: Optimizing database file...")
             cursor.execute("PRAGMA optimize")
-            cursor.execute("VACUUM")
+            pages = cursor.execute("PRAGMA page_count").fetchone()[0]
+            free = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+            if pages and free / pages > self.VACUUM_FREE_RATIO:
+                print("Bite Indexer: Optimizing database file...")
+                cursor.execute("VACUUM")
 
+        cursor.execute("DELETE FROM temp.scan")
         print(
-            f"Bite Indexer: Crawl finished. Indexed {count} items in {time.time() - start_time:.2f}s"
+            f"Bite Indexer: Crawl finished. Indexed {count} items ({changed} changed, {unchanged} directories unchanged) in {time.time() - start_time:.2f}s"
         )
         conn.close()
 
+    def _merge_scan(self, cursor, rows, dir_rows, merged: int):
+        """
+        Stages a crawl batch and merges what it changed into `files` in one
+        statement. Returns (new high-water rowid, rows inserted or updated).
+        """
+        cursor.executemany("INSERT OR IGNORE INTO temp.scan VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        cursor.execute(self.MERGE_SQL, (merged,))
+        n = max(cursor.rowcount, 0)
+        cursor.executemany(self.DIRS_UPSERT_SQL, dir_rows)
+        top = cursor.execute("SELECT MAX(rowid) FROM temp.scan").fetchone()[0]
+        return top or merged, n
+
+    def _load_dir_cache(self, conn):
+        """({dir: (mtime, listed, entries)}, {dir: [subdirectory paths]}) as of the last crawl."""
+        dirs = {path: (mtime, listed, entries) for path, mtime, listed, entries in
+                conn.execute("SELECT path, mtime, listed, entries FROM dirs")}
+        children = {}
+        for parent, path in conn.execute("SELECT parent, path FROM files WHERE is_dir = 1 AND parent IS NOT NULL"):
+            children.setdefault(parent, []).append(path)
+        return dirs, children
+
+    def _scan_dir(self, path: str, mtime: float, excludes: set, seen: float, cache=None):
+        """
+        One directory level: index rows for its entries, the (path, mtime) of the
+        subdirectories to descend into and the directory's own `dirs` row.
+        Uses the DirEntry type/stat (free on Windows, one stat on POSIX).
+
+        With `cache` (_load_dir_cache), a directory whose mtime matches the one it
+        was listed with is not listed again: its entries are unchanged, so only its
+        known subdirectories are stat'ed and descended into.
+        """
+        if cache:
+            dirs, children = cache
+            prev = dirs.get(path)
+            # Changes within the mtime granularity of the last listing can't be seen; list those
+            if prev and prev[0] == mtime and mtime < prev[1] - 2:
+                rows, subdirs = [], []
+                for sub in children.get(path, ()):
+                    name = os.path.basename(sub)
+                    if self.is_excluded(name, True, excludes):
+                        continue
+                    try:
+                        st = os.lstat(sub)
+                    except OSError:
+                        continue
+                    if stat.S_ISDIR(st.st_mode):  # Linked directories are listed, not followed
+                        subdirs.append((sub, st.st_mtime))
+                        known = dirs.get(sub)
+                        if not known or known[0] != st.st_mtime:
+                            # Its entries changed: its own row carries the new mtime
+                            rows.append(self._file_row(sub, name, st.st_mtime, True, seen))
+                return rows, subdirs, (path, mtime, prev[2], seen, prev[1])
+
+        rows, subdirs = [], []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                        if self.is_excluded(entry.name, is_dir, excludes):
+                            continue
+                        entry_mtime = entry.stat().st_mtime
+                    except OSError:
+                        continue
+                    rows.append(self._file_row(entry.path, entry.name, entry_mtime, is_dir, seen))
+                    # Like os.walk: linked directories are listed, not followed
+                    if is_dir and not entry.is_symlink():
+                        subdirs.append((entry.path, entry_mtime))
+        except OSError:
+            return rows, subdirs, None
+        return rows, subdirs, (path, mtime, len(rows), seen, seen)
+
     def force_reindex(self):
         """Manually trigger a full re-index."""
         conn = sqlite3.connect(self.db_path)
         conn.execute("DELETE FROM metadata WHERE key='last_full_scan'")
+        conn.execute("DELETE FROM dirs")  # Re-list everything, not just changed directories
         conn.commit()
         conn.close()
         # The background loop will pick this up in its next check, 
@@ -346,6 +610,51 @@ class Indexer:
         # For now, deleting the key is enough for next check.
         self.bite.app.system_notification("Bite Indexer", "Full re-index queued for the background.")
 
+    def apply_changes(self, changes: Dict[str, str]):
+        """
+        Applies a batch of watcher events ({path: 'upsert' | 'delete' | 'scan'})
+        in one transaction. 'scan' also indexes everything below a new directory.
+        """
+        now = time.time()
+        excludes = self.active_excludes()
+        rows, deletes = [], []
+        for path, op in changes.items():
+            if op == "delete":
+                deletes.append(path)
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                deletes.append(path)  # Gone again before the batch ran
+                continue
+            is_dir = os.path.isdir(path)
+            name = os.path.basename(path)
+            if self.is_excluded(name, is_dir, excludes):
+                continue
+            rows.append(self._file_row(path, name, st.st_mtime, is_dir, now))
+            if op == "scan" and is_dir:
+                pending = [(path, st.st_mtime)]
+                while pending:
+                    sub_rows, subdirs, _ = self._scan_dir(*pending.pop(), excludes, now)
+                    rows.extend(sub_rows)
+                    pending.extend(subdirs)
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if rows:
+                conn.executemany(self.UPSERT_SQL, rows)
+            for path in deletes:
+                # The path itself and, for a directory, everything below it (PK range scan)
+                prefix = path.rstrip(os.sep) + os.sep
+                conn.execute(
+                    "DELETE FROM files WHERE path = ? OR (path >= ? AND path < ?)",
+                    (path, prefix, prefix[:-1] + chr(ord(os.sep) + 1)),
+                )
+            conn.commit()
+        finally:
+            conn.close()
+        self.bite.bump_version("files")
+
     def index_path(self, path: str):
         """Surgically index a specific folder (Neighborhood Pulse)."""
         target = Path(path)
@@ -367,27 +676,41 @@ class Indexer:
                     for entry in entries:
                         if entry.name.startswith(".") or os.path.splitext(entry.name)[1].lower() in self.exclude_exts:
                             continue
-                        batch.append((entry.path, entry.name, entry.stat().st_mtime, 1 if entry.is_dir() else 0, current_time))
+                        batch.append((entry.path, entry.name, entry.stat().st_mtime, 1 if entry.is_dir() else 0, current_time, str(folder)))
                 
                 if batch:
                     cursor.executemany("""
-                        INSERT INTO files (path, name, mtime, is_dir, last_seen) 
-                        VALUES (?, ?, ?, ?, ?)
+                        INSERT INTO files (path, name, mtime, is_dir, last_seen, parent) 
+                        VALUES (?, ?, ?, ?, ?, ?)
                         ON CONFLICT(path) DO UPDATE SET
                             last_seen = excluded.last_seen,
+                            parent = excluded.parent,
                             name = CASE WHEN mtime != excluded.mtime THEN excluded.name ELSE name END,
                             is_dir = CASE WHEN mtime != excluded.mtime THEN excluded.is_dir ELSE is_dir END,
                             mtime = excluded.mtime
                     """, batch)
                     conn.commit()
+                    self.bite.bump_version("files")
                 conn.close()
             except: pass
             
         threading.Thread(target=_run_quick, daemon=True).start()
 
-    def search(self, query: str, limit: int = 40) -> List[Dict]:
+    def search(self, query: str, limit: int = 40, check=None) -> List[Dict]:
+        """
+        `check` is an optional cancellation point (SearchRequest.check); it is
+        called between layers so a superseded query stops hitting the disk.
+        """
+        return self.search_rows(query, limit, check)[0]
+
+    def search_rows(self, query: str, limit: int = 40, check=None) -> Tuple[List[Dict], bool]:
+        """
+        `search` plus whether the hits are every substring match in the index
+        (decided on the raw rows, before the life check prunes dead ones).
+        """
         if not query:
-            return []
+            return [], True
+        check = check or (lambda: None)
 
         conn = self.get_connection()
         query_safe = query.replace("'", "''")
@@ -403,28 +726,52 @@ class Indexer:
                 LIMIT {limit}
             """).fetchall()
             if len(res) >= 10:
-                return [dict(r) for r in res]
+                return [dict(r) for r in res], False
         except sqlite3.OperationalError:
             res = []
+        check()
 
         # Layer 2: Fast Prefix & Substring Match + Tag Matching
         exact_like = f"%{query_safe}%"
 
-        fuzzy_res = conn.execute(
-            """
-            SELECT path, name, is_dir, tags, 2 as rank_group FROM files 
-            WHERE name LIKE ? OR tags LIKE ?
-            ORDER BY 
-                CASE 
-                    WHEN name LIKE ? THEN 0 -- Starts with
-                    WHEN tags LIKE ? THEN 1 -- Tag match
-                    ELSE 2 -- Substring
-                END, 
-                length(name) ASC
-            LIMIT ?
-        """,
-            (exact_like, f"%{query_safe}%", f"{query_safe}%", f"%{query_safe}%", limit),
-        ).fetchall()
+        if self.trigram and len(query) >= 3:
+            # A quoted trigram phrase is a case-insensitive substring match over name and tags.
+            # Every match is ranked (top-N sort), so results equal the LIKE scan's
+            fuzzy_res = conn.execute(
+                """
+                SELECT f.path, f.name, f.is_dir, f.tags, 2 as rank_group FROM files f
+                WHERE f.rowid IN (SELECT rowid FROM files_trgm WHERE files_trgm MATCH ?)
+                ORDER BY
+                    CASE
+                        WHEN f.name LIKE ? THEN 0 -- Starts with
+                        WHEN f.tags LIKE ? THEN 1 -- Tag match
+                        ELSE 2 -- Substring
+                    END,
+                    length(f.name) ASC,
+                    f.path
+                LIMIT ?
+            """,
+                ('"' + query.replace('"', '""') + '"', f"{query_safe}%", f"%{query_safe}%", limit),
+            ).fetchall()
+        else:
+            # Too short for trigrams (or no FTS5): scan
+            fuzzy_res = conn.execute(
+                """
+                SELECT path, name, is_dir, tags, 2 as rank_group FROM files 
+                WHERE name LIKE ? OR tags LIKE ?
+                ORDER BY 
+                    CASE 
+                        WHEN name LIKE ? THEN 0 -- Starts with
+                        WHEN tags LIKE ? THEN 1 -- Tag match
+                        ELSE 2 -- Substring
+                    END, 
+                    length(name) ASC,
+                    path
+                LIMIT ?
+            """,
+                (exact_like, f"%{query_safe}%", f"{query_safe}%", f"%{query_safe}%", limit),
+            ).fetchall()
+        check()
 
         # Combine and deduplicate
         seen = {r["path"] for r in res}
@@ -436,6 +783,7 @@ class Indexer:
         # Life Check: Filter out deleted files
         final_results = []
         for r in combined:
+            check()
             if os.path.exists(r["path"]):
                 final_results.append(r)
             else:
@@ -443,6 +791,11 @@ class Indexer:
                  try:
                      conn.execute("DELETE FROM files WHERE path = ?", (r["path"],))
                      conn.commit()
+                     self.bite.bump_version("files")
                  except: pass
         
-        return final_results[:limit]
+        # Short of the LIMIT the substring layer returned every match; FTS word hits
+        # ("docker de" = docker AND de*) that are not substrings would not survive narrowing
+        needle = query.lower()
+        substring = all(needle in r["name"].lower() or needle in (r["tags"] or "").lower() for r in res)
+        return final_results[:limit], len(fuzzy_res) < limit and substring
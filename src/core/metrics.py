@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+class LatencyTracker:
+    """
+    Rolling latency percentiles per search stage (provider, ranking, icons, total)
+    plus a short list of the slowest recent queries.
+    Recording is a perf_counter delta and a locked deque append, so it stays on in
+    production; percentiles are only computed when a snapshot is taken.
+    """
+
+    def __init__(self, window: int = 512, slow_ms: float = 150.0, max_samples: int = 20):
+        self.window = window
+        self.slow_ms = slow_ms
+        self._stages: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self.slow = deque(maxlen=max_samples)
+        # Providers record from the worker pool while diagnostics take snapshots
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, ms: float):
+        with self._lock:
+            samples = self._stages.get(stage)
+            if samples is None:
+                samples = self._stages[stage] = deque(maxlen=self.window)
+            samples.append(ms)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    def record_query(self, query: str, total_ms: float, timings: Optional[Dict[str, float]] = None, stage: str = "total"):
+        """Records the end-to-end time; queries over `slow_ms` are kept with their per-stage breakdown."""
+        self.record(stage, total_ms)
+        if total_ms >= self.slow_ms:
+            sample = {
+                "query": query,
+                "stage": stage,
+                "ms": round(total_ms, 1),
+                "stages": {k: round(v, 1) for k, v in (timings or {}).items()},
+                "time": time.time(),
+            }
+            with self._lock:
+                self.slow.append(sample)
+
+    def _percentile(self, ordered, pct: float) -> float:
+        idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return round(ordered[idx], 2)
+
+    def snapshot(self) -> Dict:
+        # Copy under the lock, sort outside it: recording never waits on a sort
+        with self._lock:
+            copies = [(stage, list(samples), self._counts.get(stage, 0)) for stage, samples in self._stages.items()]
+            slow = list(self.slow)
+        stages = {}
+        for stage, samples, count in copies:
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+            stages[stage] = {
+                "count": count,
+                "p50": self._percentile(ordered, 50),
+                "p95": self._percentile(ordered, 95),
+                "p99": self._percentile(ordered, 99),
+                "max": round(ordered[-1], 2),
+            }
+        slow = sorted(slow, key=lambda s: -s["ms"])[:10]
+        return {"stages": stages, "slow": slow}
@@ -36,9 +36,11 @@ class PluginManager:
         except Exception as e:
             print(f"Failed to load plugin {name}: {e}")
 
-    def get_plugin_results(self, query: str) -> List[Dict]:
+    def get_plugin_results(self, query: str, check=None) -> List[Dict]:
         all_results = []
         for name, plugin in self.plugins.items():
+            if check:
+                check()  # Stop before the next plugin if the query was superseded
             try:
                 if hasattr(plugin, "search"):
                     res = plugin.search(query)
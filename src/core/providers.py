@@ -0,0 +1,212 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+class SearchCancelled(Exception):
+    """Raised inside a provider when a newer query superseded its request."""
+
+
+class SearchRequest:
+    """Per-keystroke state handed to every provider."""
+
+    def __init__(self, query: str, pinned_ids: Sequence[str], base=None, step=None):
+        self.query = query
+        self.pinned_ids = pinned_ids
+        # Session state: the step to narrow from and the step being recorded
+        self.base = base
+        self.step = step
+        # Brain predictions (id -> score), computed once per request
+        self.predictions = None
+        # Providers that missed their deadline or raised, for this request only
+        self.diagnostics = {"timed_out": [], "failed": []}
+        # Provider name -> wall time in ms (slow-query samples)
+        self.timings = {}
+        self.started = time.perf_counter()
+        # Generation token: set by the Searcher, flipped when a newer query arrives
+        self.generation = 0
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check(self):
+        """Cooperative cancellation point; providers call this between stages."""
+        if self.cancelled:
+            raise SearchCancelled()
+
+    @property
+    def complete(self) -> bool:
+        return not self.diagnostics["timed_out"] and not self.diagnostics["failed"]
+
+
+class Provider:
+    """
+    A single result source for the Searcher.
+    Declares which queries it can answer so the dispatcher can skip it otherwise.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[SearchRequest], List[Dict]],
+        prefixes=(),
+        pattern: Optional[str] = None,
+        exclusive: bool = False,
+        min_length: int = 0,
+        final: bool = False,
+        ttl=None,
+        depends=(),
+        budget: Optional[float] = None,
+    ):
+        self.name = name
+        self.func = func
+        self.prefixes = tuple(prefixes)
+        self.pattern = re.compile(pattern) if pattern else None
+        # Exclusive providers own their trigger: when one matches, nothing else runs
+        self.exclusive = exclusive
+        self.min_length = min_length
+        # Final providers return their results as-is (no ranking pass)
+        self.final = final
+        # Result cache lifetime: None = until the data changes, 0 = never cache;
+        # or a callable(query) returning one of those when it depends on the query
+        self.ttl = ttl
+        # Data version domains (see Bite.versions) this provider reads
+        self.depends = tuple(depends)
+        # Latency budget in seconds: budgeted providers run on the worker pool
+        # and are dropped from the response if they miss it. None = run inline.
+        self.budget = budget
+
+    def ttl_for(self, query: str) -> Optional[float]:
+        return self.ttl(query) if callable(self.ttl) else self.ttl
+
+    def accepts(self, query: str) -> bool:
+        if len(query) < self.min_length:
+            return False
+        if not self.prefixes and not self.pattern:
+            return True
+        if self.prefixes and query.startswith(self.prefixes):
+            return True
+        return bool(self.pattern and self.pattern.search(query))
+
+
+class ProviderRegistry:
+    """Ordered provider table with prefix routing and deadline-bounded fan-out."""
+
+    def __init__(self, max_workers: int = 4, metrics=None):
+        self.providers: List[Provider] = []
+        # Optional LatencyTracker; every provider run is recorded under its name
+        self.metrics = metrics
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bite-provider")
+        # Provider name -> its last pool future. A call that blew its budget keeps its
+        # worker until it returns; it is not submitted again meanwhile, so abandoned
+        # slow calls hold at most one worker each instead of filling the pool
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def register(self, provider: Provider):
+        self.providers.append(provider)
+        return provider
+
+    def route(self, query: str) -> List[Provider]:
+        """Returns the providers that can possibly match, in registration order."""
+        exclusive = [p for p in self.providers if p.exclusive and p.accepts(query)]
+        if exclusive:
+            return exclusive
+        return [p for p in self.providers if not p.exclusive and p.accepts(query)]
+
+    def _run(self, provider: Provider, request: SearchRequest) -> List[Dict]:
+        start = time.perf_counter()
+        try:
+            request.check()
+            return provider.func(request) or []
+        except SearchCancelled:
+            return []
+        except Exception as e:
+            print(f"Bite Engine: Provider '{provider.name}' failed: {e}")
+            request.diagnostics["failed"].append(provider.name)
+            return []
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            request.timings[provider.name] = elapsed
+            if self.metrics is not None:
+                self.metrics.record(provider.name, elapsed)
+
+    def _submit(self, provider: Provider, request: SearchRequest):
+        """Queues `provider` on the pool; None while its previous call is still running."""
+        with self._inflight_lock:
+            previous = self._inflight.get(provider.name)
+            if previous is not None and not previous.done():
+                return None
+            future = self.pool.submit(self._run, provider, request)
+            self._inflight[provider.name] = future
+            return future
+
+    def stream(self, request: SearchRequest, route: List[Provider], on_done: Callable):
+        """
+        Runs budgeted providers in the background and calls on_done(provider, items)
+        exactly once for each: with its results, or with [] (recorded as timed out)
+        once its budget runs out or while an earlier call of it is still running.
+        """
+        lock = threading.Lock()
+        settled = set()
+
+        def settle(provider, items, timed_out=False):
+            with lock:
+                if provider.name in settled:
+                    return
+                settled.add(provider.name)
+                if timed_out:
+                    request.diagnostics["timed_out"].append(provider.name)
+            on_done(provider, items)
+
+        for provider in route:
+            future = self._submit(provider, request)
+            if future is None:
+                settle(provider, [], timed_out=True)
+                continue
+            timer = threading.Timer(provider.budget, settle, args=(provider, [], True))
+            timer.daemon = True
+            timer.start()
+            future.add_done_callback(lambda f, p=provider, t=timer: (t.cancel(), settle(p, f.result())))
+
+    def dispatch(self, request: SearchRequest, route: Optional[List[Provider]] = None) -> Dict[str, List[Dict]]:
+        """
+        Runs the routed providers. Budgeted (slow) ones go to the pool first so
+        they overlap with the inline ones; each is awaited only until its own
+        deadline, so one slow plugin or cold SQLite read cannot stall the list.
+        """
+        route = route if route is not None else self.route(request.query)
+        start = time.perf_counter()
+        pending = {}
+        busy = []
+        for provider in route:
+            if provider.budget is None:
+                continue
+            future = self._submit(provider, request)
+            if future is None:
+                busy.append(provider.name)
+            else:
+                pending[provider.name] = (provider, future)
+
+        results = {}
+        for name in busy:
+            # Still running for an earlier keystroke: this one goes without it
+            request.diagnostics["timed_out"].append(name)
+            results[name] = []
+        for provider in route:
+            if provider.budget is None:
+                results[provider.name] = self._run(provider, request)
+
+        for name, (provider, future) in pending.items():
+            if request.cancelled:
+                break
+            remaining = start + provider.budget - time.perf_counter()
+            try:
+                results[name] = future.result(timeout=max(0.0, remaining))
+            except FutureTimeout:
+                request.diagnostics["timed_out"].append(name)
+                results[name] = []
+        return results
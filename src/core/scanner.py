@@ -223,6 +223,8 @@ class Scanner:
                     "active_win": active_context.get("title") if active_context else None,
                     "indexing": getattr(self.bite.indexer, "is_indexing", False),
                 }
+                # Per-stage search latency for the Settings diagnostics panel
+                self.bite.app.state.search_metrics = self.bite.metrics.snapshot()
             except:
                 pass
             time.sleep(4)
@@ -0,0 +1,200 @@
+from typing import Dict, List, Optional, Sequence
+
+from src.core.fuzzy import FuzzyText
+
+
+class IndexedItem:
+    """An item plus the lowercase text the index was built from."""
+
+    __slots__ = ("item", "source", "order", "id", "name", "desc", "content", "fuzzy")
+
+    def __init__(self, item: Dict, source: str, order: int):
+        self.item = item
+        self.source = source
+        self.order = order
+        self.id = (item.get("id") or "unknown").lower()
+        self.name = (item.get("name") or item.get("id") or "Unknown").lower()
+        self.desc = (item.get("desc") or "").lower()
+        self.content = (item.get("content") or "").lower()
+        # Display name with precomputed boundary bonuses for the fuzzy scorer
+        self.fuzzy = FuzzyText(item.get("name") or item.get("id") or "Unknown")
+
+
+class _Segment:
+    """Postings for one source collection (apps, workflows, ...)."""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.items = None  # The list object this segment was built from
+        self.size = 0
+        self.entries: Dict[int, IndexedItem] = {}  # id(item) -> entry
+        self.by_id: Dict[str, IndexedItem] = {}
+        self.grams: Dict[str, set] = {}  # 1/2/3-gram -> {id(item)}
+        self.id_trie: Dict = {}  # char trie over lowercase item ids
+
+
+class SearchIndex:
+    """
+    In-memory n-gram + prefix trie index over the launcher's static collections.
+    Every 1, 2 and 3-character gram of the indexed fields is posted, so a
+    substring lookup costs one posting read (short queries) or a trigram
+    intersection (long queries) instead of a scan of the whole collection.
+    """
+
+    MAX_GRAM = 3
+
+    def __init__(self):
+        self._segments: Dict[str, _Segment] = {}
+        # Bumped whenever any segment changes (lets callers invalidate derived caches)
+        self.version = 0
+
+    def add_source(self, source: str, fields=("name",)):
+        self._segments[source] = _Segment(tuple(fields))
+
+    # --- Maintenance ---
+
+    def sync(self, source: str, items: Sequence[Dict]):
+        """
+        Brings a segment up to date with its collection.
+        O(1) when nothing changed; otherwise only added/removed items are (re)posted.
+        """
+        seg = self._segments[source]
+        if seg.items is items and seg.size == len(items):
+            return
+
+        current = {id(it): it for it in items}
+        for key in [k for k in seg.entries if k not in current]:
+            self._remove(seg, key)
+
+        for order, it in enumerate(items):
+            key = id(it)
+            entry = seg.entries.get(key)
+            if entry is None:
+                self._add(seg, key, IndexedItem(it, source, order))
+            else:
+                entry.order = order
+
+        seg.items = items
+        seg.size = len(items)
+        self.version += 1
+
+    def _texts(self, seg: _Segment, entry: IndexedItem):
+        return [getattr(entry, f) for f in seg.fields if getattr(entry, f)]
+
+    def _add(self, seg: _Segment, key: int, entry: IndexedItem):
+        seg.entries[key] = entry
+        seg.by_id.setdefault(entry.item.get("id"), entry)
+        for gram in self._grams_of(self._texts(seg, entry)):
+            seg.grams.setdefault(gram, set()).add(key)
+
+        node = seg.id_trie
+        for ch in entry.id:
+            node = node.setdefault(ch, {})
+        node.setdefault("$", set()).add(key)
+
+    def _remove(self, seg: _Segment, key: int):
+        entry = seg.entries.pop(key)
+        if seg.by_id.get(entry.item.get("id")) is entry:
+            del seg.by_id[entry.item.get("id")]
+            # Another item may share the id (e.g. duplicated snippets)
+            for other in seg.entries.values():
+                if other.item.get("id") == entry.item.get("id"):
+                    seg.by_id[other.item.get("id")] = other
+                    break
+        for gram in self._grams_of(self._texts(seg, entry)):
+            posting = seg.grams.get(gram)
+            if posting:
+                posting.discard(key)
+                if not posting:
+                    del seg.grams[gram]
+
+        node = seg.id_trie
+        for ch in entry.id:
+            node = node.get(ch)
+            if node is None:
+                return
+        node.get("$", set()).discard(key)
+
+    def _grams_of(self, texts):
+        grams = set()
+        for text in texts:
+            for n in range(1, self.MAX_GRAM + 1):
+                for i in range(len(text) - n + 1):
+                    grams.add(text[i:i + n])
+        return grams
+
+    # --- Lookups ---
+
+    def all(self, source: str) -> List[IndexedItem]:
+        seg = self._segments[source]
+        return sorted(seg.entries.values(), key=lambda e: e.order)
+
+    def get(self, source: str, item_id: str) -> Optional[IndexedItem]:
+        return self._segments[source].by_id.get(item_id)
+
+    def lookup(self, source: str, query: str) -> List[IndexedItem]:
+        """Entries whose indexed fields contain `query` as a substring, in collection order."""
+        if not query:
+            return self.all(source)
+
+        seg = self._segments[source]
+        if len(query) <= self.MAX_GRAM:
+            keys = seg.grams.get(query, ())
+            return sorted((seg.entries[k] for k in keys), key=lambda e: e.order)
+
+        postings = []
+        for i in range(len(query) - self.MAX_GRAM + 1):
+            posting = seg.grams.get(query[i:i + self.MAX_GRAM])
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        keys = set(postings[0])
+        for posting in postings[1:]:
+            keys &= posting
+            if not keys:
+                return []
+
+        matches = []
+        for k in keys:
+            entry = seg.entries[k]
+            if any(query in getattr(entry, f) for f in seg.fields):
+                matches.append(entry)
+        matches.sort(key=lambda e: e.order)
+        return matches
+
+    def lookup_chars(self, source: str, query: str) -> List[IndexedItem]:
+        """
+        Entries whose indexed fields contain every character of `query`: a cheap
+        superset of its subsequence matches, for the fuzzy scorer to verify.
+        """
+        seg = self._segments[source]
+        postings = []
+        for ch in set(query):
+            posting = seg.grams.get(ch)
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        keys = set(postings[0])
+        for posting in postings[1:]:
+            keys &= posting
+        return sorted((seg.entries[k] for k in keys), key=lambda e: e.order)
+
+    def narrow(self, source: str, entries: List[IndexedItem], query: str) -> List[IndexedItem]:
+        """Filters a previous lookup down to `query` (valid when the old query is a prefix of it)."""
+        fields = self._segments[source].fields
+        return [e for e in entries if any(query in getattr(e, f) for f in fields)]
+
+    def id_prefixes(self, source: str, query: str) -> List[IndexedItem]:
+        """Entries whose id followed by a space is a prefix of `query` (e.g. 'g my search')."""
+        seg = self._segments[source]
+        node = seg.id_trie
+        found = []
+        for i, ch in enumerate(query):
+            if "$" in node and ch == " ":
+                found.extend(seg.entries[k] for k in node["$"])
+            node = node.get(ch)
+            if node is None:
+                break
+        return found
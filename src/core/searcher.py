@@ -1,14 +1,46 @@
 import os
 import re
+import heapq
 import math
+import time
 import threading
 import requests
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Dict
 from src.utils.icon_handler import get_icon_url
+from src.core.providers import Provider, ProviderRegistry, SearchCancelled, SearchRequest
+from src.core.search_index import SearchIndex
+from src.core import fuzzy
+from src.core.session import SearchSession, SessionStep
+from src.core.result_cache import ResultCache
 
 
 class Searcher:
+    # Subsequence-only matches below this (scattered letters) are not listed
+    MIN_FUZZY_SCORE = 60
+    # Unpinned results returned per query
+    MAX_RESULTS = 40
+    # Category order of the ranked list (unknown categories sort at 50)
+    CAT_ORDER = {
+        "Aliases": -100,
+        "Pinned Favorites": -90,
+        "Recents": -80,    # Recents should be high priority
+        "Workflows": -10,
+        "Files": 0,        # Files should be ABOVE generic apps/tools when searching paths
+        "Productivity": 5,
+        "Calc": 6,
+        "Apps": 10,
+        "System": 20,
+        "Custom": 25,
+        "Tools": 30,
+        "Search": 40,
+        "Web": 45,
+        "Fallback": 100,   # Google Fallback always at the bottom
+        "Help": 200,
+        "Clipboard": 210,
+    }
+
     def __init__(self, bite_instance):
         self.bite = bite_instance
         self.platform = bite_instance.platform
@@ -27,6 +59,31 @@ class Searcher:
             "lock": ["secure", "away", "logout"]
         }
         
+        # In-memory n-gram/trie index over the static collections
+        self.index = SearchIndex()
+        self.index.add_source("registry", fields=("name", "id", "desc"))
+        self.index.add_source("shortcuts", fields=("name", "id", "desc"))
+        self.index.add_source("apps", fields=("name",))
+        self.index.add_source("workflows", fields=("name",))
+        self.index.add_source("snippets", fields=("name", "content"))
+
+        # Versioned LRU of final result lists
+        self.cache = ResultCache(maxsize=256)
+        # Providers dropped/failed on the latest query (see get_stats)
+        self.last_diagnostics = {}
+
+        # Keystroke-incremental typing sessions (session id -> SearchSession)
+        self.sessions = OrderedDict()
+
+        # Generation token: each get_results call cancels the request before it
+        self.generation = 0
+        self._inflight = None
+        self._generation_lock = threading.Lock()
+
+        # Provider table (prefix-routed dispatch)
+        self.providers = ProviderRegistry(metrics=self.bite.metrics)
+        self._register_providers()
+
         # Real-time Currency Cache
         self.currency_rates = {"usd": 1.0, "eur": 1.05, "gbp": 1.25} 
         threading.Thread(target=self._update_currency_rates, daemon=True).start()
@@ -44,54 +101,215 @@ class Searcher:
                     # Normalize to lowercase and update our cache
                     new_rates = {k.lower(): v for k, v in rates.items()}
                     self.currency_rates.update(new_rates)
+                    self.bite.bump_version("rates")
                     print(f"Bite Engine: Refreshed {len(new_rates)} live currency rates.")
         except Exception as e:
             print(f"Bite Engine: Currency update failed (Offline fallback active): {e}")
 
-    def _fuzzy_match(self, query: str, target: str) -> int:
-        """Returns a score from 0-100 for fuzzy matching."""
-        if not query: return 0
-        query, target = query.lower(), target.lower()
-        if query == target: return 100
-        if target.startswith(query): return 90
-        if " " + query in target: return 85
-        
-        # Simple fuzzy jump match (e.g., 'vsc' matches 'Visual Studio Code')
-        # Check if all chars in query appear in target in order
-        it = iter(target)
-        if all(c in it for c in query):
-            # Acronym check (e.g. 'vsc')
-            words = target.split()
-            acronym = "".join(w[0] for w in words if w)
-            if acronym.startswith(query):
-                return 80
-            return 40
-        return 0
-
-    def get_results(self, query: str) -> List[Dict]:
+    def _register_providers(self):
+        """Declares every result source and the queries it can answer."""
+        reg = self.providers
+        reg.register(Provider("math", lambda r: self._match_math(r.query), pattern=r"\d", depends=("rates",)))
+        reg.register(Provider("registry", lambda r: self._match_registry(r.query, r.pinned_ids, r)))
+        reg.register(Provider("apps", lambda r: self._match_apps(r.query, r.pinned_ids, r)))
+        reg.register(Provider(
+            "files", self._provide_files, min_length=2, depends=("files",), budget=0.15,
+            # Path navigation lists the directory live; the index version doesn't cover it
+            ttl=lambda q: 2 if self._is_path_query(q) else None,
+        ))
+        reg.register(Provider("clipboard", self._provide_clipboard, pattern=r"^clip|^.{3,}", depends=("clipboard",)))
+        reg.register(Provider("terminal", lambda r: self._match_terminal(r.query, r), prefixes=("t:",), exclusive=True, ttl=2, budget=0.2))
+        reg.register(Provider("processes", lambda r: self._match_processes(r.query, r), prefixes=("kill ",), exclusive=True, ttl=2, budget=0.3))
+        reg.register(Provider("ports", lambda r: self._match_ports(r.query, r), pattern=r"^port\s*\d*$", exclusive=True, ttl=2, budget=0.3))
+        reg.register(Provider(
+            "dev_tools", lambda r: self._match_dev_tools(r.query),
+            # '#' only claims the query when it is a whole hex color, not '#tag' snippets or files
+            pattern=r"^(uuid|hash |b64 |timer:|t:|#(?:[0-9a-f]{3}){1,2}$|rgb\()", exclusive=True, ttl=0,
+        ))
+        reg.register(Provider("vault", self._provide_vault, prefixes=("env:",), exclusive=True))
+        reg.register(Provider("snippets", self._provide_snippets))
+        reg.register(Provider("workflows", self._provide_workflows))
+        reg.register(Provider(
+            "workflow_browser", self._provide_workflow_browser,
+            prefixes=("wf:", "workflow:"), exclusive=True, final=True,
+        ))
+        reg.register(Provider("plugins", lambda r: self.bite.plugins.get_plugin_results(r.query, r.check), min_length=1, ttl=10, budget=0.15))
+        reg.register(Provider("aliases", self._provide_aliases, min_length=1))
+
+    def _sync_index(self):
+        """Cheap identity/length check per collection; only changed collections are re-posted."""
+        self.index.sync("registry", self.bite.base_registry)
+        self.index.sync("shortcuts", self.bite.snapshot.shortcuts)
+        self.index.sync("apps", self.bite.installed_apps)
+        self.index.sync("workflows", self.bite.workflows)
+        self.index.sync("snippets", self.bite.snapshot.snippets)
+
+    def _session_for(self, session_id):
+        if not session_id:
+            return None
+        session = self.sessions.pop(session_id, None) or SearchSession(session_id)
+        self.sessions[session_id] = session  # Most recently used last
+        while len(self.sessions) > 8:
+            self.sessions.popitem(last=False)
+        return session
+
+    def _candidates(self, request, source, query):
+        """Index candidates for `source`, narrowed from the session's previous keystroke when possible."""
+        base = request.base if request else None
+        prior = base.candidates.get(source) if base else None
+        if not query:
+            found = self.index.lookup(source, query)
+        elif prior is None:
+            found = self.index.lookup(source, query)
+        elif base.query == query:
+            found = prior
+        else:
+            found = self.index.narrow(source, prior, query)
+        if request and request.step and query:
+            request.step.candidates[source] = found
+        return found
+
+    def _fuzzy_candidates(self, request, source, query, substring):
+        """
+        Subsequence-only matches of item names ('vsc' -> 'Visual Studio Code'),
+        scored in one batch. Narrowed per keystroke like _candidates: every
+        subsequence match of 'vsco' is one of 'vsc'.
+        """
+        if len(query) < 2:
+            return []
+        key = source + ":fuzzy"
+        base = request.base if request else None
+        prior = base.candidates.get(key) if base else None
+        pool = prior if prior is not None else self.index.lookup_chars(source, query)
+
+        skip = {id(e) for e in substring}
+        rest = [e for e in pool if id(e) not in skip]
+        hits = [(e, m) for e, m in zip(rest, fuzzy.match_batch(query, [e.fuzzy for e in rest])) if m]
+        if request and request.step:
+            # Substring hits stay in the pool: 'vsx c' may stop being one at 'vsxc'
+            request.step.candidates[key] = [e for e, _ in hits] + list(substring)
+        return [(e, m) for e, m in hits if m[0] >= self.MIN_FUZZY_SCORE]
+
+    def _indexed_files(self, request, query):
+        """File index hits; a complete previous hit list is narrowed instead of re-querying SQLite."""
+        base = request.base if request else None
+        # A multi-token query also gets FTS word hits ("docker de" = docker AND de*) that
+        # no substring filter reproduces; only single-token queries can be narrowed
+        if base and base.files is not None and (base.query == query or query.isalnum()):
+            if base.query == query:
+                rows = base.files
+            else:
+                rows = [
+                    r for r in base.files
+                    if query in r["name"].lower() or query in (r.get("tags") or "").lower()
+                ]
+        else:
+            rows, complete = self.bite.indexer.search_rows(query, check=request.check if request else None)
+            if not complete:
+                return rows
+        if request and request.step:
+            request.step.files = rows
+        return rows
+
+    def get_stats(self) -> Dict:
+        """Counters for sizing the result cache, plus per-stage latency."""
+        return {
+            "cache": self.cache.stats(),
+            "diagnostics": self.last_diagnostics,
+            "latency": self.bite.metrics.snapshot(),
+        }
+
+    def _cache_key(self, query, route):
+        """Normalized query + every version stamp the answer depends on."""
+        versions = self.bite.versions
+        domains = {"user_data", "brain", "recents"}
+        for provider in route:
+            domains.update(provider.depends)
+        return (
+            query,
+            self.index.version,
+            tuple((d, versions.get(d, 0)) for d in sorted(domains)),
+            tuple(self.bite.brain._get_active_features()),
+        )
+
+    def _cache_ttl(self, route, query):
+        ttls = [t for t in (p.ttl_for(query) for p in route) if t is not None]
+        return min(ttls) if ttls else None
+
+    def _begin(self, request):
+        """Stamps `request` with the next generation and cancels the one still in flight."""
+        with self._generation_lock:
+            self.generation += 1
+            request.generation = self.generation
+            if self._inflight is not None:
+                self._inflight.cancel()
+            self._inflight = request
+
+    def get_results(self, query: str, session_id: str = None, generation=None) -> List[Dict]:
+        """
+        Ranked results for `query`. When the frontend passes a `generation`, only
+        the fast tier is computed inline; slower providers are streamed afterwards
+        as 'search_results' events tagged with that generation.
+        A newer call cancels this one; a cancelled call returns [] and emits nothing.
+        """
+        request = SearchRequest(query, self.bite.snapshot.pins)
+        start = request.started
+        self._begin(request)
+
         query = query.lower().strip()
         # --- Universal Alias Expansion ---
         query = self.bite.resolve_aliases(query)
-        
-        pinned_ids = self.bite.user_data.get("pins", [])
+        self._sync_index()
+
+        route = self.providers.route(query)
+        cache_key = self._cache_key(query, route)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self.bite.metrics.record("cache_hit", (time.perf_counter() - start) * 1000)
+            return cached
+
+        request.query = query
+        stream = (generation, cache_key) if generation is not None else None
+        try:
+            results = self._compute_results(request, route, session_id, stream)
+        except SearchCancelled:
+            return []
+        self.bite.metrics.record_query(query, (time.perf_counter() - start) * 1000, request.timings)
+        self._record_diagnostics(request)
+        # Partial answers (a provider missed its deadline) are never cached;
+        # streamed queries are cached once their last tier lands
+        if request.complete and not (stream and any(p.budget is not None for p in route)):
+            self.cache.put(cache_key, results, ttl=self._cache_ttl(route, query))
+        return results
+
+    def _record_diagnostics(self, request):
+        """Settings > Diagnostics: providers that missed their budget or raised, last query."""
+        self.last_diagnostics = {
+            "query": request.query,
+            "timed_out": list(request.diagnostics["timed_out"]),
+            "failed": list(request.diagnostics["failed"]),
+            "time": time.time(),
+        }
+
+    def _compute_results(self, request, route, session_id=None, stream=None) -> List[Dict]:
+        query = request.query
+        pinned_ids = request.pinned_ids
 
         # 0. The "Ghost" Intent (Proactive suggestions for empty query)
         if query == "":
             brain_preds = self.bite.brain.predict()
             ghost_results = []
             
-            # Pool all possible items to find matches for predicted IDs
-            # We look in shortcuts, installed apps, base registry, and workflows
-            all_pool = (self.bite.user_data.get("shortcuts", []) + 
-                        self.bite.installed_apps + 
-                        self.bite.base_registry + 
-                        self.bite.workflows)
-            pool_map = {it["id"]: it for it in all_pool}
-            
+            # Resolve predicted IDs through the index (workflows win over registry,
+            # registry over apps, apps over shortcuts)
             for pred in brain_preds:
-                iid = pred["id"]
-                if iid in pool_map:
-                    it = pool_map[iid].copy()
+                entry = None
+                for source in ("workflows", "registry", "apps", "shortcuts"):
+                    entry = self.index.get(source, pred["id"])
+                    if entry:
+                        break
+                if entry:
+                    it = entry.item.copy()
                     # High activation score for empty state
                     it["score"] = 1000 + int(pred["score"]) 
                     it["cat"] = f"★ {it.get('cat', 'Suggested')}"
@@ -101,176 +319,148 @@ class Searcher:
             if ghost_results:
                 return ghost_results[:5]
 
-        # 1. Registry & Shortcuts
-        registry_matches = self._match_registry(query, pinned_ids)
-        for r in registry_matches:
-            if query:
-                fuzz = self._fuzzy_match(query, r["name"])
-                r["score"] = max(r.get("score", 0), fuzz)
-
-        # 2. Apps
-        app_matches = self._match_apps(
-            query, pinned_ids, [r["name"] for r in registry_matches]
-        )
-        for a in app_matches:
-            if query:
-                fuzz = self._fuzzy_match(query, a["name"])
-                a["score"] = max(a.get("score", 0), fuzz)
-
-        # 3. Files
-        file_matches = self._search_files(query) if query else []
-        for f in file_matches:
-            f_tags = f.get("tags") or ""
-            if query and query in f["name"].lower():
-                f["score"] = 60 if f["name"].lower().startswith(query) else 20
-            elif query and any(t.strip() == query for t in f_tags.split(",")):
-                # Boost for exact tag match (e.g. searching 'green' find green images)
-                f["score"] = 95
-                f["learned"] = True # Highlight it
-                f["cat"] = "Semantic Search"
-            else:
-                f["score"] = 10
+        # 1. Prefix-routed dispatch: only providers that can match this query run
+        session = self._session_for(session_id)
+        if session and query:
+            # File rows are narrowed too: index changes (crawl, watcher) invalidate the session
+            version = (self.index.version, self.bite.versions.get("files", 0))
+            request.base = session.base_for(query, version)
+            request.step = SessionStep(query, version)
+        for provider in route:
+            if provider.final:
+                # Custom prefixes (e.g. 'wf:') bypass ranking entirely
+                return provider.func(request)
+
+        if stream is not None:
+            # Streaming: only the fast (inline) tier blocks the first paint
+            fast = [p for p in route if p.budget is None]
+            slow = [p for p in route if p.budget is not None]
+            by_provider = self.providers.dispatch(request, fast)
+        else:
+            slow = []
+            by_provider = self.providers.dispatch(request, route)
+        # Superseded while the providers ran: skip ranking and keep the session clean
+        request.check()
+        if request.step:
+            session.push(request.step)
+
+        for name, items in by_provider.items():
+            self._score_batch(request, name, items)
+        rank_start = time.perf_counter()
+        # With tiers still streaming, the web fallback waits for the last batch:
+        # Enter must not hit it before the real results arrive
+        results = self._rank(request, route, by_provider, fallback=not slow)
+        self.bite.metrics.record("rank", (time.perf_counter() - rank_start) * 1000)
+        if slow:
+            self._stream_tiers(request, route, by_provider, slow, stream)
+        return results
 
-        # Semantic Intent Boosting
-        if query:
+    def _score_batch(self, request, name, items):
+        """Per-provider scoring, applied exactly once when a batch arrives."""
+        query = request.query
+        if not query:
+            return
+        if name == "registry":
+            # Semantic Intent Boosting
             for action_id, phrases in self.SEMANTIC_MAP.items():
                 if any(p in query for p in phrases):
                     # Boost matching registry items
-                    for item in registry_matches:
+                    for item in items:
                         if item.get("id") == action_id or action_id in item.get("action", ""):
                             item["score"] = item.get("score", 0) + 200
                             item["learned"] = True
                             item["desc"] = f"Intent Match: '{query}'"
 
-        # 4. Clipboard History (Searchable & Persistent)
-        clip_matches = []
-        is_clip_search = query.startswith("clip")
-        
-        if is_clip_search or (len(query) > 2):
-            search_body = query[4:].strip() if is_clip_search else query
-            for c in self.bite.clipboard_history:
-                content = c.get("content", "")
-                if not search_body or search_body.lower() in content.lower():
-                    clip_matches.append({
-                        "id": f"clip_{hash(content)}",
-                        "name": f"Clip: {content[:50].strip()}...",
-                        "desc": f"Copied at {c.get('time', 'Unknown')} on {c.get('date', 'Today')}",
-                        "content": content,
-                        "cat": "Clipboard",
-                        "icon": "clipboard",
-                        "action": "paste",
-                        "score": 90 if search_body and search_body.lower() in content.lower() else 40
-                    })
-        
-        # 5. Calculator
-        math_results = self._match_math(query)
-
-        # 6. Terminal Commands
-        term_matches = self._match_terminal(query)
-
-        # 6b. Process Manager
-        proc_matches = self._match_processes(query)
-
-        # 6c. Port Manager
-        port_matches = self._match_ports(query)
-
-        # 6d. Developer Tools (Hash, Base64, UUID)
-        dev_matches = self._match_dev_tools(query)
-
-        # 7. Secure Env Vault (Security & DX)
-        vault_matches = []
-        if query.startswith("env:"):
-            target = query[4:].strip()
-            vault = self.bite.user_data.get("env_vault", {})
-            if not target:
-                vault_matches.append({
-                    "id": "vault_hint", "name": "Secure Env Vault", "desc": "Type 'env: [key]' to copy secret (e.g. env: OPENAI_API_KEY)",
-                    "cat": "Security", "icon": "lock", "score": 100
+    def _stream_tiers(self, request, route, by_provider, slow, stream):
+        """
+        Runs the slow tier (file index, plugins, psutil) in the background and
+        pushes the re-ranked list through app.emit as each provider finishes.
+        Every push carries the frontend's generation id so stale batches are dropped.
+        """
+        generation, cache_key = stream
+        lock = threading.Lock()
+        state = {"pending": {p.name for p in slow}, "batch": 0}
+
+        def on_done(provider, items):
+            with lock:
+                if request.cancelled:
+                    return  # A newer query owns the list now
+                self._score_batch(request, provider.name, items)
+                by_provider[provider.name] = items
+                state["pending"].discard(provider.name)
+                done = not state["pending"]
+                if not items and not done:
+                    return  # Nothing new to paint
+                state["batch"] += 1
+                results = self._rank(request, route, by_provider, fallback=done)
+                self.bite.app.emit("search_results", {
+                    "generation": generation,
+                    "query": request.query,
+                    "batch": state["batch"],
+                    "done": done,
+                    "results": results,
                 })
-            else:
-                for k, v in vault.items():
-                    if target.lower() in k.lower():
-                        vault_matches.append({
-                            "id": f"vault_{k}", "name": f"Copy {k}", "content": v,
-                            "desc": "•••••••• (Secure storage)", "cat": "Security",
-                            "icon": "shield-check", "action": "paste", "score": 100
-                        })
-
-        # 8. Snippets
-        snippet_matches = []
-        for snip in self.bite.user_data.get("snippets", []):
-            name = snip.get("name") or ""
-            content = snip.get("content") or ""
-            if (
-                not query
-                or query in name.lower()
-                or query in content.lower()
+                if done:
+                    elapsed = (time.perf_counter() - request.started) * 1000
+                    self.bite.metrics.record_query(request.query, elapsed, request.timings, stage="streamed")
+                    self._record_diagnostics(request)
+                if done and request.complete:
+                    self.cache.put(cache_key, results, ttl=self._cache_ttl(route, request.query))
+
+        # Same budgets as the blocking path: a tier past its budget lands as empty
+        self.providers.stream(request, slow, on_done)
+
+    def _boost(self, item, learned, preds, ctx_proc, pinned=False):
+        """
+        Applies mnemonic, brain and context boosts. Returns a boosted copy (or the
+        item itself when nothing applies) so re-ranking never double-counts.
+        """
+        rid = item.get("id")
+        it = item
+        # Mnemonic Boosting (Quicksilver style)
+        if rid in learned:
+            it = dict(it)
+            # Boost significantly based on selection count
+            it["score"] = it.get("score", 0) + 500 + (learned[rid] * 10)
+            it["learned"] = True
+        if pinned:
+            return it
+
+        # Neural Contextual Boosting (The "Bite Brain")
+        if rid in preds:
+            it = dict(it) if it is item else it
+            # Boost by the brain's confidence score
+            it["score"] = it.get("score", 0) + 150 + int(preds[rid])
+            it["desc"] = f"★ Pattern Match: {it.get('desc')}"
+            it["learned"] = True
+
+        # Manual Static Fallbacks (For new users)
+        if ctx_proc:
+            if (("chrome" in ctx_proc or "firefox" in ctx_proc) and it.get("cat") == "Search") or (
+                "code" in ctx_proc and it.get("cat") in ["Workflows", "Tools"]
             ):
-                it = snip.copy()
-                it.update({"cat": "Snippets", "icon": "scissors", "action": "paste"})
-                it["score"] = 90 if query and query in name.lower() else 40
-                snippet_matches.append(it)
+                it = dict(it) if it is item else it
+                it["score"] = it.get("score", 0) + 50
+        return it
 
-        # 7. Workflows
-        workflow_matches = []
-        for wf in self.bite.workflows:
-            name = wf.get("name") or "Unknown Workflow"
-            name_lower = name.lower()
-            if not query:
-                workflow_matches.append(wf)
-                continue
-            if query in name_lower:
-                it = wf.copy()
-                it["score"] = 85 if name_lower.startswith(query) else 45
-                workflow_matches.append(it)
-
-        # 8. Plugins
-        plugin_results = self.bite.plugins.get_plugin_results(query) if query else []
-
-        # 9. Smart Alias Suggestions (Dynamic & Static)
-        alias_matches = []
-        if query:
-            # Combine both alias stores
-            all_aliases = self.bite.user_data.get("aliases", {}).copy()
-            path_aliases = self.bite.user_data.get("path_aliases", {})
-            all_aliases.update(path_aliases)
-            
-            clean_q = query.lstrip("@")
-            for alias_name, target_path in all_aliases.items():
-                clean_name = alias_name.lstrip("@")
-                if clean_name.lower().startswith(clean_q.lower()):
-                    display_name = f"@{clean_name}"
-                    alias_matches.append({
-                        "id": f"alias_hint_{clean_name}",
-                        "name": display_name,
-                        "desc": f"Smart Alias for {target_path}",
-                        "cat": "Aliases",
-                        "icon": "folder",
-                        "type": "term_autofill",
-                        "new_query": f"{display_name}\\",
-                        "score": 100,
-                        "learned": True
-                    })
+    def _rank(self, request, route, by_provider, fallback: bool = True) -> List[Dict]:
+        query = request.query
+        pinned_ids = request.pinned_ids
 
-        all_res = (
-            math_results
-            + registry_matches
-            + app_matches
-            + file_matches
-            + clip_matches[:5]
-            + term_matches
-            + proc_matches
-            + port_matches
-            + dev_matches
-            + snippet_matches
-            + workflow_matches
-            + plugin_results
-            + alias_matches
-        )
+        registry_matches = by_provider.get("registry", [])
+        # Apps already exposed through the registry are not listed twice
+        registry_names = {r["name"] for r in registry_matches}
+
+        all_res = []
+        for provider in route:
+            items = by_provider.get(provider.name, [])
+            if provider.name == "apps":
+                items = [a for a in items if a["name"] not in registry_names]
+            all_res += items
 
         # Web Fallback
         has_exact = any(item.get("score", 0) >= 90 for item in all_res)
-        if query and not has_exact and len(query) > 1:
+        if fallback and query and not has_exact and len(query) > 1:
             is_search_cmd = any(
                 item.get("type") == "search" and query.startswith(item["id"])
                 for item in registry_matches
@@ -288,134 +478,218 @@ class Searcher:
                     }
                 )
 
-        pinned = [r for r in all_res if r.get("pinned")]
-        others = [r for r in all_res if not r.get("pinned")]
+        # One pass: pinned/other split plus an id -> first item map for recents
+        pinned, others, by_id = [], [], {}
+        for r in all_res:
+            (pinned if r.get("pinned") else others).append(r)
+            by_id.setdefault(r.get("id"), r)
 
         if not query:
             recents = []
             for rid in self.bite.recent_ids:
                 if rid in pinned_ids:
                     continue
-                match = next((x for x in all_res if x["id"] == rid), None)
+                match = by_id.get(rid)
                 if match:
                     it = match.copy()
                     it["cat"] = "Recents"
                     recents.append(it)
             others = recents + others
 
-        # Custom Prefixes
-        is_wf_search = query.lower().startswith("wf:") or query.lower().startswith("workflow:")
-        if is_wf_search:
-            # Strip prefix
-            prefix = "wf:" if query.lower().startswith("wf:") else "workflow:"
-            wf_query = query[len(prefix):].strip().lower()
-            
-            wf_matches = []
-            for wf in self.bite.workflows:
-                if not wf_query or wf_query in wf["name"].lower():
-                    it = wf.copy()
-                    it["score"] = 100 if wf_query and wf["name"].lower().startswith(wf_query) else 50
-                    wf_matches.append(it)
-            return sorted(wf_matches, key=lambda x: -x["score"])
-
-        # Mnemonic Boosting (Quicksilver style)
-        q_clean = query.lower().strip()
-        learned = self.bite.user_data.get("mnemonics", {}).get(q_clean, {})
-        if learned:
-            for res in all_res:
-                rid = res.get("id")
-                if rid in learned:
-                    # Boost significantly based on selection count
-                    res["score"] = res.get("score", 0) + 500 + (learned[rid] * 10)
-                    res["learned"] = True
-
-        # 9. Neural Contextual Boosting (The "Bite Brain")
-        predictions = self.bite.brain.predict()
-        if predictions:
-            pred_ids = {p["id"]: p["score"] for p in predictions}
-            for item in others:
-                iid = item.get("id")
-                if iid in pred_ids:
-                    # Boost by the brain's confidence score
-                    item["score"] = item.get("score", 0) + 150 + int(pred_ids[iid])
-                    item["desc"] = f"★ Pattern Match: {item.get('desc')}"
-                    item["learned"] = True
-        
-        # 10. Manual Static Fallbacks (For new users)
+        learned = self.bite.snapshot.mnemonics.get(query, {})
+        if request.predictions is None:
+            request.predictions = {p["id"]: p["score"] for p in self.bite.brain.predict(query)}
         active_ctx = self.bite.active_context
-        if active_ctx:
-            ctx_title = active_ctx.get("title", "").lower()
-            ctx_proc = active_ctx.get("process", "").lower()
-            for item in others:
-                if ("chrome" in ctx_proc or "firefox" in ctx_proc) and item.get("cat") == "Search":
-                    item["score"] = item.get("score", 0) + 50
-                elif ("code" in ctx_proc) and item.get("cat") in ["Workflows", "Tools"]:
-                    item["score"] = item.get("score", 0) + 50
-
-        cat_map = {
-            "Aliases": -100,
-            "Pinned Favorites": -90,
-            "Recents": -80,    # Recents should be high priority
-            "Workflows": -10,
-            "Files": 0,        # Files should be ABOVE generic apps/tools when searching paths
-            "Productivity": 5,
-            "Calc": 6,
-            "Apps": 10,
-            "System": 20,
-            "Custom": 25,
-            "Tools": 30,
-            "Search": 40,
-            "Web": 45,
-            "Fallback": 100,   # Google Fallback always at the bottom
-            "Help": 200,
-            "Clipboard": 210,
-        }
-        others.sort(
-            key=lambda x: (
-                not x.get("learned", False),  # Learned items ALWAYS first
-                cat_map.get(x.get("cat"), 50),
-                -x.get("score", 0),
-                x.get("name", "").lower(),
-            )
+        ctx_proc = (active_ctx.get("process") or "").lower() if active_ctx else ""
+
+        pinned = [self._boost(r, learned, request.predictions, ctx_proc, pinned=True) for r in pinned]
+        others = [self._boost(r, learned, request.predictions, ctx_proc) for r in others]
+
+        # Heap top-k on the composite key: O(n log k) instead of sorting every candidate
+        # (nsmallest is stable, so ties keep provider order exactly as a full sort would)
+        return pinned + heapq.nsmallest(self.MAX_RESULTS, others, key=self._rank_key)
+
+    def _rank_key(self, x):
+        return (
+            not x.get("learned", False),  # Learned items ALWAYS first
+            self.CAT_ORDER.get(x.get("cat"), 50),
+            -x.get("score", 0),
+            x.get("name", "").lower(),
         )
 
-        return pinned + others[:40]
+    def _provide_files(self, request):
+        query = request.query
+        file_matches = self._search_files(query, request)
+        for f in file_matches:
+            f_tags = f.get("tags") or ""
+            if query in f["name"].lower():
+                f["score"] = 60 if f["name"].lower().startswith(query) else 20
+            elif any(t.strip() == query for t in f_tags.split(",")):
+                # Boost for exact tag match (e.g. searching 'green' find green images)
+                f["score"] = 95
+                f["learned"] = True # Highlight it
+                f["cat"] = "Semantic Search"
+            else:
+                f["score"] = 10
+        return file_matches
 
-    def _match_registry(self, query, pinned_ids):
+    def _provide_clipboard(self, request):
+        """Clipboard History (Searchable & Persistent)"""
+        query = request.query
+        is_clip_search = query.startswith("clip")
+        search_body = query[4:].strip() if is_clip_search else query
+        if search_body:
+            # Indexed: cost does not grow with the history or the size of the entries
+            entries, score = self.bite.store.search_clipboard(search_body, limit=5), 90
+        else:
+            entries, score = self.bite.snapshot.clipboard[:5], 40
+        clip_matches = []
+        for c in entries:
+            content = c.get("content", "")
+            desc = f"Copied at {c.get('time', 'Unknown')} on {c.get('date', 'Today')}"
+            it = {
+                "id": f"clip_{c['hash'][:16]}",
+                "name": f"Clip: {content[:50].strip()}...",
+                "desc": desc,
+                "content": content,
+                "cat": "Clipboard",
+                "icon": "clipboard",
+                "action": "paste",
+                "score": score
+            }
+            if c.get("blob"):
+                # Only the preview travels; the executor loads the full text on paste
+                it["blob"] = c["hash"]
+                it["desc"] = f"{desc} · {c.get('size', 0) / 1024:.0f} KB"
+            clip_matches.append(it)
+        return clip_matches
+
+    def _provide_vault(self, request):
+        """Secure Env Vault (Security & DX)"""
+        target = request.query[4:].strip()
+        vault = self.bite.snapshot.vault
+        if not target:
+            return [{
+                "id": "vault_hint", "name": "Secure Env Vault", "desc": "Type 'env: [key]' to copy secret (e.g. env: OPENAI_API_KEY)",
+                "cat": "Security", "icon": "lock", "score": 100
+            }]
+        vault_matches = []
+        for k, v in vault.items():
+            if target.lower() in k.lower():
+                vault_matches.append({
+                    "id": f"vault_{k}", "name": f"Copy {k}", "content": v,
+                    "desc": "•••••••• (Secure storage)", "cat": "Security",
+                    "icon": "shield-check", "action": "paste", "score": 100
+                })
+        return vault_matches
+
+    def _provide_snippets(self, request):
+        query = request.query
+        snippet_matches = []
+        for e in self._candidates(request, "snippets", query):
+            it = e.item.copy()
+            it.update({"cat": "Snippets", "icon": "scissors", "action": "paste"})
+            it["score"] = 90 if query and query in e.name else 40
+            snippet_matches.append(it)
+        return snippet_matches
+
+    def _provide_workflows(self, request):
+        query = request.query
+        workflow_matches = []
+        for e in self._candidates(request, "workflows", query):
+            it = e.item.copy()
+            if query:
+                it["score"] = 85 if e.name.startswith(query) else 45
+            workflow_matches.append(it)
+        return workflow_matches
+
+    def _provide_workflow_browser(self, request):
+        """Custom 'wf:' / 'workflow:' prefix: lists workflows only."""
+        query = request.query
+        prefix = "wf:" if query.startswith("wf:") else "workflow:"
+        wf_query = query[len(prefix):].strip().lower()
+
+        wf_matches = []
+        for e in self.index.lookup("workflows", wf_query):
+            it = e.item.copy()
+            it["score"] = 100 if wf_query and e.name.startswith(wf_query) else 50
+            wf_matches.append(it)
+        return sorted(wf_matches, key=lambda x: -x["score"])
+
+    def _provide_aliases(self, request):
+        """Smart Alias Suggestions (Dynamic & Static)"""
+        # Both alias stores, merged when the snapshot was published
+        all_aliases = self.bite.snapshot.aliases
+
+        alias_matches = []
+        clean_q = request.query.lstrip("@")
+        for alias_name, target_path in all_aliases.items():
+            clean_name = alias_name.lstrip("@")
+            if clean_name.lower().startswith(clean_q.lower()):
+                display_name = f"@{clean_name}"
+                alias_matches.append({
+                    "id": f"alias_hint_{clean_name}",
+                    "name": display_name,
+                    "desc": f"Smart Alias for {target_path}",
+                    "cat": "Aliases",
+                    "icon": "folder",
+                    "type": "term_autofill",
+                    "new_query": f"{display_name}\\",
+                    "score": 100,
+                    "learned": True
+                })
+        return alias_matches
+
+    def _match_registry(self, query, pinned_ids, request=None):
         matches = []
-        full_registry = self.bite.base_registry + self.bite.user_data.get(
-            "shortcuts", []
-        )
-        for item in full_registry:
-            it = item.copy()
-            it["pinned"] = it["id"] in pinned_ids
-            name = it.get("name") or it.get("id") or "Unknown"
-            kind_id = it.get("id") or "unknown"
-            name_lower = name.lower()
-            kid = kind_id.lower()
-
-            score = -1
-            if not query:
-                score = 0
-            elif query == kid or query == name_lower:
-                score = 100
-            elif name_lower.startswith(query):
-                score = 80
-            elif query.startswith(kid + " "):
-                score = 90
-            elif " " + query in name_lower or name_lower.startswith(query + " "):
-                score = 90
-            elif query in name_lower:
-                score = 50
-            elif query in it.get("desc", "").lower():
-                score = 30
-
-            if score >= 0:
+        for source in ("registry", "shortcuts"):
+            candidates = self._candidates(request, source, query)
+            fuzzy_hits = self._fuzzy_candidates(request, source, query, candidates) if query else []
+            if query:
+                # 'g my search' style triggers: the id prefixes the query
+                seen = {id(e) for e in candidates}
+                candidates = list(candidates)
+                for e in self.index.id_prefixes(source, query):
+                    if id(e) not in seen:
+                        candidates.append(e)
+            name_hits = fuzzy.match_batch(query, [e.fuzzy for e in candidates]) if query else []
+            for i, e in enumerate(candidates):
+                name_lower, kid = e.name, e.id
+
+                score = -1
+                if not query:
+                    score = 0
+                elif query == kid or query == name_lower:
+                    score = 100
+                elif name_lower.startswith(query):
+                    score = 80
+                elif query.startswith(kid + " "):
+                    score = 90
+                elif " " + query in name_lower or name_lower.startswith(query + " "):
+                    score = 90
+                elif query in name_lower:
+                    score = 50
+                elif query in e.desc:
+                    score = 30
+
+                if score >= 0:
+                    it = e.item.copy()
+                    it["pinned"] = it["id"] in pinned_ids
+                    it["score"] = score
+                    if query and name_hits[i]:
+                        it["score"] = max(score, name_hits[i][0])
+                        it["match_positions"] = name_hits[i][1]
+                    matches.append(it)
+
+            for e, (score, positions) in fuzzy_hits:
+                it = e.item.copy()
+                it["pinned"] = it["id"] in pinned_ids
                 it["score"] = score
+                it["match_positions"] = positions
                 matches.append(it)
         return matches
 
-    def _match_terminal(self, query):
+    def _match_terminal(self, query, request=None):
         if not query.startswith("t:"): return []
         cmd = query[2:].lstrip()
         
@@ -454,6 +728,7 @@ class Searcher:
                         count = 0
                         for entry in os.scandir(search_root):
                             if count > 15: break
+                            if request: request.check()
                             
                             # Ignore hidden items in directory listing
                             if entry.name.startswith("."):
@@ -484,6 +759,7 @@ class Searcher:
                         count = 0
                         for entry in os.scandir(search_root):
                             if count > 10: break
+                            if request: request.check()
                             
                             # Ignore hidden items unless searching for them
                             if entry.name.startswith(".") and not search_name.startswith("."):
@@ -505,13 +781,14 @@ class Searcher:
                                 })
                                 count += 1
                     except PermissionError: pass
+        except SearchCancelled: raise
         except Exception: pass
 
         return results
         
         return results
 
-    def _match_processes(self, query):
+    def _match_processes(self, query, request=None):
         if not query.startswith("kill "):
             return []
             
@@ -526,6 +803,8 @@ class Searcher:
         results = []
         try:
             for p in psutil.process_iter(['pid', 'name', 'memory_info']):
+                if request and request.cancelled:
+                    break
                 try:
                     name = p.info['name']
                     if name and term in name.lower():
@@ -544,10 +823,12 @@ class Searcher:
                     pass
         except:
             pass
+        if request:
+            request.check()
             
         return sorted(results, key=lambda x: -x["score"])[:15]
 
-    def _match_ports(self, query):
+    def _match_ports(self, query, request=None):
         if not query.startswith("port"):
             return []
             
@@ -559,6 +840,8 @@ class Searcher:
             results = []
             try:
                 for conn in psutil.net_connections(kind='inet'):
+                    if request and request.cancelled:
+                        break
                     if conn.status == psutil.CONN_LISTEN:
                         try:
                             p = psutil.Process(conn.pid)
@@ -571,6 +854,8 @@ class Searcher:
                             })
                         except: pass
             except: pass
+            if request:
+                request.check()
             return results or [{"id":"no_ports","name":"No Active Ports","desc":"Zero open listening ports found.","cat":"Security","icon":"shield-check","score":100}]
 
         if not term.isdigit():
@@ -697,25 +982,40 @@ class Searcher:
 
         return results
 
-    def _match_apps(self, query, pinned_ids, existing_names):
+    def _match_apps(self, query, pinned_ids, request=None):
         matches = []
-        for app in self.bite.installed_apps:
-            name_lower = app["name"].lower()
-            if not query:
-                if app["id"] in pinned_ids:
-                    it = app.copy()
+        if not query:
+            for pid in pinned_ids:
+                e = self.index.get("apps", pid)
+                if e:
+                    it = e.item.copy()
                     it.update({"pinned": True, "score": 0})
                     matches.append(it)
-                continue
-            if query in name_lower and app["name"] not in existing_names:
-                it = app.copy()
-                it["pinned"] = it["id"] in pinned_ids
-                it["score"] = (
-                    95
-                    if name_lower == query
-                    else (75 if name_lower.startswith(query) else 40)
-                )
-                matches.append(it)
+            return matches
+
+        candidates = self._candidates(request, "apps", query)
+        fuzzy_hits = self._fuzzy_candidates(request, "apps", query, candidates)
+        name_hits = fuzzy.match_batch(query, [e.fuzzy for e in candidates])
+        for e, hit in zip(candidates, name_hits):
+            name_lower = e.name
+            it = e.item.copy()
+            it["pinned"] = it["id"] in pinned_ids
+            it["score"] = (
+                95
+                if name_lower == query
+                else (75 if name_lower.startswith(query) else 40)
+            )
+            if hit:
+                it["score"] = max(it["score"], hit[0])
+                it["match_positions"] = hit[1]
+            matches.append(it)
+
+        for e, (score, positions) in fuzzy_hits:
+            it = e.item.copy()
+            it["pinned"] = it["id"] in pinned_ids
+            it["score"] = score
+            it["match_positions"] = positions
+            matches.append(it)
         return matches
 
     def _match_math(self, query):
@@ -825,19 +1125,20 @@ class Searcher:
         
         return None
 
-    def _search_files(self, query: str) -> List[Dict]:
+    @staticmethod
+    def _is_path_query(query: str) -> bool:
+        """'c:\\...', '/...', '\\...' and '@alias\\...' are answered from the file system."""
+        return query.startswith(("/", "\\", "@")) or (len(query) >= 2 and query[1] == ":")
+
+    def _search_files(self, query: str, request=None) -> List[Dict]:
         results = []
         if len(query) < 2:
             return []
 
         resolved_query = query
         if query.startswith("@"):
-            raw_aliases = self.bite.user_data.get("aliases", {}).copy()
-            path_aliases = self.bite.user_data.get("path_aliases", {})
-            raw_aliases.update(path_aliases)
-            
-            # Normalize keys to be lowercase and without @ prefix
-            aliases = { (k[1:] if k.startswith("@") else k).lower(): v for k, v in raw_aliases.items() }
+            # Keys normalized to lowercase without the @ prefix (precomputed per snapshot)
+            aliases = self.bite.snapshot.alias_targets
             
             parts = query.replace("/", "\\").split("\\", 1)
             alias_name = parts[0][1:].lower()
@@ -877,6 +1178,8 @@ class Searcher:
                 try:
                     with os.scandir(target_dir) as entries:
                         for entry in entries:
+                            if request and request.cancelled:
+                                break
                             name_lower = entry.name.lower()
                             partial_lower = partial.lower()
                             
@@ -899,6 +1202,8 @@ class Searcher:
                                     break
                 except:
                     pass
+                if request:
+                    request.check()
                 
                 # Internal sort for the path navigation part to ensure startswith wins immediately
                 target_entries.sort(key=lambda x: (-x["score"], x["name"].lower()))
@@ -907,8 +1212,10 @@ class Searcher:
 
         # Index Search
         try:
-            indexed_results = self.bite.indexer.search(query)
+            indexed_results = self._indexed_files(request, query)
             for item in indexed_results:
+                if request:
+                    request.check()  # Icon resolution per row is the slow part
                 # Mock an entry-like object for _create_file_result
                 class MockEntry:
                     def __init__(self, path, name, is_dir):
@@ -924,6 +1231,8 @@ class Searcher:
                         MockEntry(item["path"], item["name"], item["is_dir"]), "", tags=item.get("tags")
                     )
                 )
+        except SearchCancelled:
+            raise
         except Exception as e:
             print(f"Search index error: {e}")
 
@@ -0,0 +1,46 @@
+from typing import Dict, List, Optional
+
+
+class SessionStep:
+    """Candidate sets computed for one keystroke of a typing session."""
+
+    def __init__(self, query: str, version):
+        self.query = query
+        # (search index version, files version) the candidates were computed against
+        self.version = version
+        # source -> [IndexedItem] (substring candidates before scoring)
+        self.candidates: Dict[str, List] = {}
+        # Raw file index rows, only kept when they are the complete match set
+        self.files: Optional[List[Dict]] = None
+
+
+class SearchSession:
+    """
+    Keystroke-incremental search state for one frontend typing session.
+    'vis' -> 'visu' narrows the candidates cached for 'vis'; backspacing pops
+    back to the step that was already computed for the shorter query.
+    """
+
+    MAX_DEPTH = 64
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.steps: List[SessionStep] = []
+
+    def base_for(self, query: str, version) -> Optional[SessionStep]:
+        """Returns the deepest cached step whose query is a prefix of `query`."""
+        # Backspace / divergence: drop steps that no longer lead to this query
+        while self.steps and not query.startswith(self.steps[-1].query):
+            self.steps.pop()
+        if self.steps and self.steps[-1].version != version:
+            # The underlying collections changed; cached candidates are stale
+            self.steps.clear()
+        return self.steps[-1] if self.steps else None
+
+    def push(self, step: SessionStep):
+        if self.steps and self.steps[-1].query == step.query:
+            self.steps[-1] = step
+        else:
+            self.steps.append(step)
+            if len(self.steps) > self.MAX_DEPTH:
+                del self.steps[0]
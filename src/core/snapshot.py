@@ -0,0 +1,69 @@
+from types import MappingProxyType
+from typing import Dict, Iterable, Optional
+
+_EMPTY = MappingProxyType({})
+
+
+def _freeze_map(value) -> MappingProxyType:
+    return MappingProxyType(dict(value)) if value else _EMPTY
+
+
+class UserSnapshot:
+    """
+    Read-only, versioned view of user_data for the search path.
+
+    Writers (IPC handlers, the executor, the clipboard monitor) change user_data and
+    then publish a new snapshot through Bite._publish; only the changed keys are
+    rebuilt, the rest are shared with the previous snapshot. Readers take
+    `bite.snapshot` once per search and use it without locks or copies.
+    """
+
+    __slots__ = (
+        "version", "pins", "shortcuts", "snippets", "mnemonics", "clipboard",
+        "vault", "settings", "aliases", "alias_targets", "alias_order",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("UserSnapshot is immutable; publish a new one")
+
+    @classmethod
+    def build(cls, user_data: Dict, prev: Optional["UserSnapshot"] = None, keys: Optional[Iterable[str]] = None) -> "UserSnapshot":
+        """Snapshot of `user_data`; with `prev`, only `keys` are re-read from it."""
+        keys = set(keys) if prev is not None and keys is not None else None
+        fields = {name: getattr(prev, name) for name in cls.__slots__} if keys is not None else {}
+        fields["version"] = prev.version + 1 if prev is not None else 1
+
+        def changed(*names):
+            return keys is None or any(n in keys for n in names)
+
+        if changed("pins"):
+            fields["pins"] = tuple(user_data.get("pins", []))
+        if changed("shortcuts"):
+            fields["shortcuts"] = tuple(user_data.get("shortcuts", []))
+        if changed("snippets"):
+            fields["snippets"] = tuple(user_data.get("snippets", []))
+        if changed("mnemonics"):
+            fields["mnemonics"] = MappingProxyType({
+                q: _freeze_map(items) for q, items in user_data.get("mnemonics", {}).items()
+            })
+        if changed("clipboard_history"):
+            fields["clipboard"] = tuple(user_data.get("clipboard_history", []))
+        if changed("env_vault"):
+            fields["vault"] = _freeze_map(user_data.get("env_vault"))
+        if changed("settings"):
+            fields["settings"] = _freeze_map(user_data.get("settings"))
+        if changed("aliases", "path_aliases"):
+            merged = dict(user_data.get("aliases", {}))
+            merged.update(user_data.get("path_aliases", {}))
+            fields["aliases"] = _freeze_map(merged)
+            # '@Docs' / 'docs' -> target, for @path lookups
+            fields["alias_targets"] = _freeze_map({
+                (k[1:] if k.startswith("@") else k).lower(): v for k, v in merged.items()
+            })
+            # Longest first so '@downloads' is expanded before '@down'
+            fields["alias_order"] = tuple(sorted(merged, key=len, reverse=True))
+        return cls(**fields)
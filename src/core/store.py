@@ -0,0 +1,457 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+
+def clip_hash(content: str) -> str:
+    """Stable content id for a clipboard entry (dedup key and result id)."""
+    return hashlib.sha1(content.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class UserStore:
+    """
+    user_data in SQLite (user_data.db) instead of one config.json blob.
+    Top-level keys are rows of `kv` (JSON per key); mnemonics and the clipboard
+    history, the two collections that change on every selection/copy, get their
+    own tables so a change touches only its rows. The clipboard keeps long-term
+    history (see the clipboard_retention setting) behind a trigram FTS index;
+    only the most recent RECENT_CLIPS entries are loaded into memory. Entries over
+    INLINE_MAX characters live in the BlobStore; their row keeps a preview and
+    their full text is indexed in clipboard_blob_fts (contentless, so the text
+    is not stored twice).
+
+    Writers stage changes (serialized at call time, so later mutation cannot race
+    the writer) and a background thread commits them in one transaction after a
+    short debounce. close() flushes what is left.
+    """
+
+    # Seconds to coalesce bursts of changes (typing in the scratchpad, clipboard polls)
+    DEBOUNCE = 1.0
+    # Clipboard entries kept in user_data (UI list, empty 'clip' query)
+    RECENT_CLIPS = 50
+    # Larger captures are stored as compressed blobs; rows, IPC and search see a preview
+    INLINE_MAX = 4096
+    PREVIEW_CHARS = 1024
+
+    def __init__(self, bite_instance):
+        self.bite = bite_instance
+        self.db_path = self.bite.config_dir / "user_data.db"
+        self.legacy_path = self.bite.config_path  # config.json, migrated once
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._kv: Dict[str, Optional[str]] = {}
+        self._mnemonics: Dict[str, Dict[str, int]] = {}
+        self._clips: List = []  # ("add", entry, keep) / ("replace", entries)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._local = threading.local()  # One read connection per search thread
+        self.fts = True
+        self._init_db()
+
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS mnemonics (
+                query TEXT,
+                item_id TEXT,
+                count INTEGER,
+                PRIMARY KEY (query, item_id)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS clipboard (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                hash TEXT,
+                content TEXT,
+                time TEXT,
+                date TEXT,
+                size INTEGER,
+                blob INTEGER DEFAULT 0
+            )
+        """)
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        # Migration: content-hash ids (clipboard tables created before hashing)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(clipboard)")]
+        if "hash" not in columns:
+            conn.execute("ALTER TABLE clipboard ADD COLUMN hash TEXT")
+            conn.executemany(
+                "UPDATE clipboard SET hash = ? WHERE id = ?",
+                [(clip_hash(content or ""), i) for i, content in conn.execute("SELECT id, content FROM clipboard")],
+            )
+            # Keep the newest copy of duplicates
+            conn.execute("DELETE FROM clipboard WHERE id NOT IN (SELECT MAX(id) FROM clipboard GROUP BY hash)")
+        conn.execute("DROP INDEX IF EXISTS idx_clipboard_content")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_clipboard_hash ON clipboard(hash)")
+        # Migration: sizes and blob offloading (tables created before blobs)
+        if "size" not in columns:
+            conn.execute("ALTER TABLE clipboard ADD COLUMN size INTEGER")
+            conn.execute("ALTER TABLE clipboard ADD COLUMN blob INTEGER DEFAULT 0")
+            conn.execute("UPDATE clipboard SET size = length(content)")
+            large = conn.execute("SELECT id, hash, content FROM clipboard WHERE size > ?", (self.INLINE_MAX,)).fetchall()
+            for i, h, content in large:
+                if self.bite.blobs.put(h, content):
+                    conn.execute(
+                        "UPDATE clipboard SET content = ?, blob = 1 WHERE id = ?",
+                        (content[:self.PREVIEW_CHARS], i),
+                    )
+
+        # Trigram FTS over the content: substring search without scanning the history
+        try:
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'clipboard_fts'").fetchone()
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS clipboard_fts USING fts5(
+                    content,
+                    content='clipboard',
+                    content_rowid='id',
+                    tokenize='trigram'
+                )
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS clipboard_ai AFTER INSERT ON clipboard BEGIN
+                    INSERT INTO clipboard_fts(rowid, content) VALUES (new.id, new.content);
+                END;
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS clipboard_ad AFTER DELETE ON clipboard BEGIN
+                    INSERT INTO clipboard_fts(clipboard_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                END;
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS clipboard_au AFTER UPDATE OF content ON clipboard BEGIN
+                    INSERT INTO clipboard_fts(clipboard_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                    INSERT INTO clipboard_fts(rowid, content) VALUES (new.id, new.content);
+                END;
+            """)
+            if not exists:
+                conn.execute("INSERT INTO clipboard_fts(clipboard_fts) VALUES ('rebuild')")
+            # Full text of blob-backed entries, maintained by the writer (triggers only see the preview)
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'clipboard_blob_fts'").fetchone()
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS clipboard_blob_fts USING fts5(
+                    content,
+                    content='',
+                    tokenize='trigram'
+                )
+            """)
+            if not exists:
+                self._index_blobs(conn, conn.execute("SELECT id, hash FROM clipboard WHERE blob = 1").fetchall())
+        except sqlite3.OperationalError:
+            # SQLite without FTS5/trigram (< 3.34): search falls back to a bounded scan
+            self.fts = False
+        conn.commit()
+        # Row count for retention, so trimming never has to count or offset-scan the history
+        self._clip_count = conn.execute("SELECT COUNT(*) FROM clipboard").fetchone()[0]
+        conn.close()
+
+    # --- Loading ---
+
+    def load(self) -> Dict:
+        """Assembles user_data from the tables (importing config.json on first run)."""
+        data = {}
+        try:
+            conn = self._connect()
+            migrated = conn.execute("SELECT value FROM meta WHERE key = 'migrated'").fetchone()
+            if not migrated:
+                conn.close()
+                self._migrate_json()
+                conn = self._connect()
+            for key, value in conn.execute("SELECT key, value FROM kv"):
+                try:
+                    data[key] = json.loads(value)
+                except ValueError:
+                    pass
+            mnemonics = {}
+            for query, item_id, count in conn.execute("SELECT query, item_id, count FROM mnemonics"):
+                mnemonics.setdefault(query, {})[item_id] = count
+            data["mnemonics"] = mnemonics
+            data["clipboard_history"] = [
+                self._clip_entry(row) for row in conn.execute(
+                    f"SELECT {self._CLIP_COLUMNS} FROM clipboard ORDER BY id DESC LIMIT ?", (self.RECENT_CLIPS,)
+                )
+            ]
+            conn.close()
+        except Exception as e:
+            print(f"Bite: Failed to load user_data.db: {e}")
+            return {}
+        return data
+
+    def _migrate_json(self):
+        """One-time import of config.json; the file is kept as config.json.migrated."""
+        data = {}
+        if self.legacy_path.exists():
+            try:
+                data = json.loads(self.legacy_path.read_text())
+            except:
+                data = {}
+        for key, value in data.items():
+            self.put(key, value)
+        self.flush()
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated', '1')")
+            conn.close()
+            if data:
+                self.legacy_path.rename(self.legacy_path.with_suffix(".json.migrated"))
+                print(f"Bite: Migrated {len(data)} keys from config.json")
+        except Exception as e:
+            print(f"Bite: config.json migration incomplete: {e}")
+
+    # --- Staging ---
+
+    def put(self, key: str, value):
+        """Stages a whole top-level key (row collections are rewritten in full)."""
+        if key == "mnemonics":
+            with self._lock:
+                self._mnemonics.clear()
+                self._mnemonics[None] = {}  # Marker: drop every stored query first
+                for query, items in (value or {}).items():
+                    self._mnemonics[query] = dict(items)
+        elif key == "clipboard_history":
+            with self._lock:
+                self._clips = [("replace", [dict(c) for c in value or []])]
+        else:
+            encoded = json.dumps(value) if value is not None else None
+            with self._lock:
+                self._kv[key] = encoded
+        self._wake.set()
+
+    def put_mnemonic(self, query: str, items: Optional[Dict[str, int]]):
+        """Stages the learned counts of one query (None forgets it)."""
+        with self._lock:
+            self._mnemonics[query] = dict(items) if items else {}
+        self._wake.set()
+
+    # --- Clipboard entries ---
+
+    _CLIP_COLUMNS = "hash, content, time, date, size, blob"
+
+    @staticmethod
+    def _clip_entry(row) -> Dict:
+        h, content, t, d, size, blob = row
+        return {"hash": h, "content": content, "time": t, "date": d, "size": size, "blob": bool(blob)}
+
+    def make_clip(self, content: str, time: str, date: str) -> Dict:
+        """A history entry for `content`; large payloads are written to the blob store here."""
+        entry = {"hash": clip_hash(content), "content": content, "time": time, "date": date, "size": len(content), "blob": False}
+        if len(content) > self.INLINE_MAX and self.bite.blobs.put(entry["hash"], content):
+            entry["content"] = content[:self.PREVIEW_CHARS]
+            entry["blob"] = True
+        return entry
+
+    def load_clip(self, entry: Dict) -> Optional[str]:
+        """Full content of a history entry (lazy blob read for large ones); None if its blob is gone."""
+        if entry.get("blob"):
+            return self.bite.blobs.get(entry["hash"])
+        return entry.get("content") or ""
+
+    def add_clip(self, entry: Dict, keep: int):
+        """Stages one clipboard capture: dedup by content hash, insert, trim to `keep` newest."""
+        with self._lock:
+            self._clips.append(("add", dict(entry), keep))
+        self._wake.set()
+
+    # --- Writing ---
+
+    def flush(self):
+        # One writer at a time (background loop vs. close()/migration)
+        with self._write_lock:
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            kv, self._kv = self._kv, {}
+            mnemonics, self._mnemonics = self._mnemonics, {}
+            clips, self._clips = self._clips, []
+        if not (kv or mnemonics or clips):
+            return
+
+        clip_count = self._clip_count
+        orphans = set()  # Blob hashes whose rows are gone once this commits
+        try:
+            conn = self._connect()
+            with conn:
+                for key, value in kv.items():
+                    if value is None:
+                        conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+                    else:
+                        conn.execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, value))
+
+                if None in mnemonics:
+                    conn.execute("DELETE FROM mnemonics")
+                for query, items in mnemonics.items():
+                    if query is None:
+                        continue
+                    conn.execute("DELETE FROM mnemonics WHERE query = ?", (query,))
+                    conn.executemany(
+                        "INSERT INTO mnemonics (query, item_id, count) VALUES (?, ?, ?)",
+                        [(query, item_id, count) for item_id, count in items.items()],
+                    )
+
+                for op in clips:
+                    if op[0] == "replace":
+                        orphans.update(h for (h,) in conn.execute("SELECT hash FROM clipboard WHERE blob = 1"))
+                        conn.execute("DELETE FROM clipboard")
+                        if self.fts:
+                            conn.execute("INSERT INTO clipboard_blob_fts(clipboard_blob_fts) VALUES ('delete-all')")
+                        rows, seen = [], set()
+                        for c in op[1]:
+                            if "size" not in c:  # Imported (config.json) entries are not externalized yet
+                                c = self.make_clip(c.get("content") or "", c.get("time"), c.get("date"))
+                            if c["hash"] not in seen:
+                                seen.add(c["hash"])
+                                rows.append(self._clip_row(c))
+                        orphans.difference_update(seen)
+                        # Stored oldest first so id order is recency order
+                        conn.executemany(
+                            "INSERT INTO clipboard (hash, content, time, date, size, blob) VALUES (?, ?, ?, ?, ?, ?)",
+                            reversed(rows),
+                        )
+                        self._index_blobs(conn, conn.execute("SELECT id, hash FROM clipboard WHERE blob = 1").fetchall())
+                        clip_count = len(rows)
+                    else:
+                        _, entry, keep = op
+                        self._index_blobs(conn, conn.execute(
+                            "SELECT id, hash FROM clipboard WHERE hash = ? AND blob = 1", (entry["hash"],)
+                        ).fetchall(), delete=True)
+                        clip_count -= conn.execute("DELETE FROM clipboard WHERE hash = ?", (entry["hash"],)).rowcount
+                        cur = conn.execute(
+                            "INSERT INTO clipboard (hash, content, time, date, size, blob) VALUES (?, ?, ?, ?, ?, ?)",
+                            self._clip_row(entry),
+                        )
+                        if entry.get("blob"):
+                            self._index_blobs(conn, [(cur.lastrowid, entry["hash"])])
+                        orphans.discard(entry["hash"])
+                        clip_count += 1
+                        # Retention: drop the oldest rows beyond `keep`
+                        if clip_count > keep:
+                            oldest = "SELECT id FROM clipboard ORDER BY id LIMIT ?"
+                            expired = conn.execute(
+                                f"SELECT id, hash FROM clipboard WHERE blob = 1 AND id IN ({oldest})", (clip_count - keep,)
+                            ).fetchall()
+                            # Blob files are only removed after the commit, so their text is still readable
+                            self._index_blobs(conn, expired, delete=True)
+                            orphans.update(h for _, h in expired)
+                            conn.execute(f"DELETE FROM clipboard WHERE id IN ({oldest})", (clip_count - keep,))
+                            clip_count = keep
+            conn.close()
+            self._clip_count = clip_count
+            if orphans:
+                self.bite.blobs.delete(orphans)
+        except Exception as e:
+            print(f"Bite: user_data flush failed: {e}")
+            # Put the batch back underneath anything staged since (newer wins)
+            with self._lock:
+                for key, value in kv.items():
+                    self._kv.setdefault(key, value)
+                if None in self._mnemonics:
+                    mnemonics = {}
+                for query, items in mnemonics.items():
+                    self._mnemonics.setdefault(query, items)
+                if not any(op[0] == "replace" for op in self._clips):
+                    self._clips = clips + self._clips
+
+    def _index_blobs(self, conn, rows, delete: bool = False):
+        """Adds (or removes) the full text of blob-backed clips [(id, hash)] in clipboard_blob_fts."""
+        if not self.fts:
+            return
+        for clip_id, digest in rows:
+            text = self.bite.blobs.get(digest)
+            if text is None:
+                # Contentless deletes need the text; ids are never reused, so stale postings match no row
+                continue
+            if delete:
+                conn.execute(
+                    "INSERT INTO clipboard_blob_fts(clipboard_blob_fts, rowid, content) VALUES ('delete', ?, ?)",
+                    (clip_id, text),
+                )
+            else:
+                conn.execute("INSERT INTO clipboard_blob_fts(rowid, content) VALUES (?, ?)", (clip_id, text))
+
+    @staticmethod
+    def _clip_row(entry: Dict):
+        return (
+            entry["hash"], entry.get("content"), entry.get("time"), entry.get("date"),
+            entry.get("size", len(entry.get("content") or "")), 1 if entry.get("blob") else 0,
+        )
+
+    # --- Clipboard search ---
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def search_clipboard(self, text: str, limit: int = 5) -> List[Dict]:
+        """
+        Newest entries containing `text` (case-insensitive), at most `limit`.
+        Captures still waiting for the writer are matched in memory first.
+        Large entries match on their full text, except for queries under 3
+        characters, which only scan the previews of the recent window.
+        """
+        needle = text.lower()
+        with self._lock:
+            pending = [op[1] for op in reversed(self._clips) if op[0] == "add"]
+        results = [e for e in pending if needle in (self.load_clip(e) or "").lower()][:limit]
+        seen = {e.get("hash") for e in results}
+
+        try:
+            conn = self._reader()
+            if self.fts and len(needle) >= 3:
+                # A quoted trigram phrase is a substring match; FTS walks rowids newest first
+                phrase = '"' + text.replace('"', '""') + '"'
+                rows = conn.execute(f"""
+                    SELECT {self._CLIP_COLUMNS} FROM clipboard c
+                    WHERE c.id IN (
+                        SELECT rowid FROM clipboard_fts WHERE clipboard_fts MATCH ?
+                        ORDER BY rowid DESC LIMIT ?
+                    ) OR c.id IN (
+                        SELECT rowid FROM clipboard_blob_fts WHERE clipboard_blob_fts MATCH ?
+                        ORDER BY rowid DESC LIMIT ?
+                    )
+                    ORDER BY c.id DESC LIMIT ?
+                """, (phrase, limit + len(seen), phrase, limit + len(seen), limit + len(seen))).fetchall()
+            else:
+                # Too short for trigrams (or no FTS5): only the recent window is scanned
+                rows = conn.execute(f"""
+                    SELECT {self._CLIP_COLUMNS} FROM (
+                        SELECT * FROM clipboard ORDER BY id DESC LIMIT ?
+                    ) WHERE instr(lower(content), ?) > 0 LIMIT ?
+                """, (self.RECENT_CLIPS, needle, limit + len(seen))).fetchall()
+        except sqlite3.Error as e:
+            print(f"Bite: Clipboard search failed: {e}")
+            rows = []
+
+        for row in rows:
+            if len(results) >= limit:
+                break
+            if row[0] not in seen:
+                results.append(self._clip_entry(row))
+        return results
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            # Let the burst settle, then write it as one transaction
+            self._stop.wait(self.DEBOUNCE)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Stops the background writer and flushes what is left (app exit)."""
+        self._stop.set()
+        self._wake.set()
+        self.flush()
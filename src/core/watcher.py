@@ -0,0 +1,319 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import platform
+import select
+import struct
+import threading
+from typing import Dict, List
+
+
+class FileWatcher:
+    """
+    Real-time feed of file system changes into the index.
+
+    Backends: inotify (Linux, via ctypes), ReadDirectoryChangesW (Windows, pywin32)
+    and a directory-mtime poller everywhere else or when those fail. Every backend
+    reports the same three operations through `_emit`:
+
+        upsert  the path was created / renamed into place / written
+        delete  the path (and anything below it) is gone
+        scan    a directory appeared; index it and its contents
+
+    Events are coalesced per path and applied by Indexer.apply_changes in one
+    batch every BATCH_INTERVAL seconds, so a burst (an unzip, a git checkout)
+    becomes a single transaction.
+    """
+
+    BATCH_INTERVAL = 1.0
+    POLL_INTERVAL = 10.0
+    # Directories watched (inotify) or polled; the periodic crawl covers the rest
+    MAX_WATCHES = 8192
+
+    def __init__(self, bite_instance):
+        self.bite = bite_instance
+        self.backend = None
+        self.roots: List[str] = []
+        # Roots with every directory under them watched (none past MAX_WATCHES)
+        self.complete = set()
+        self._pending: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    @property
+    def live(self) -> bool:
+        return self.backend is not None and not self._stop.is_set()
+
+    def watched_roots(self) -> List[str]:
+        """Roots the watcher fully covers; the daily crawl can leave these to it."""
+        if not self.live:
+            return []
+        return [r for r in self.roots if r in self.complete]
+
+    def _uncovered(self, path: str):
+        """A directory under `path` could not be watched: its root needs the crawl again."""
+        for root in list(self.complete):
+            if path == root or path.startswith(os.path.join(root, "")):
+                self.complete.discard(root)
+
+    def start(self, roots: List[str]):
+        self.roots = [r for r in roots if os.path.isdir(r)]
+        if not self.roots:
+            return
+        system = platform.system()
+        backends = []
+        if system == "Linux":
+            backends.append(("inotify", self._run_inotify))
+        elif system == "Windows":
+            backends.append(("ReadDirectoryChangesW", self._run_windows))
+        backends.append(("polling", self._run_polling))
+
+        for name, run in backends:
+            try:
+                loop = run()
+            except Exception as e:
+                print(f"Bite Watcher: {name} unavailable ({e})")
+                continue
+            self.backend = name
+            threading.Thread(target=loop, daemon=True).start()
+            threading.Thread(target=self._flush_loop, daemon=True).start()
+            print(f"Bite Watcher: Watching {len(self.roots)} roots via {name}")
+            return
+
+    def stop(self):
+        self._stop.set()
+
+    # --- Batching ---
+
+    def _emit(self, op: str, path: str):
+        with self._lock:
+            # 'scan' implies 'upsert'; otherwise the latest operation wins
+            if not (op == "upsert" and self._pending.get(path) == "scan"):
+                self._pending[path] = op
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.BATCH_INTERVAL):
+            with self._lock:
+                changes, self._pending = self._pending, {}
+            if changes:
+                try:
+                    self.bite.indexer.apply_changes(changes)
+                except Exception as e:
+                    print(f"Bite Watcher: Failed to apply {len(changes)} changes: {e}")
+
+    def _walk_dirs(self, root: str):
+        """Directories under `root` the crawl would descend into (same exclusions)."""
+        excludes = self.bite.indexer.active_excludes()
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            yield current
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False) and not self.bite.indexer.is_excluded(entry.name, True, excludes):
+                            stack.append(entry.path)
+            except OSError:
+                continue
+
+    # --- inotify (Linux) ---
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_EXCL_UNLINK = 0x04000000
+    IN_ISDIR = 0x40000000
+    _EVENT = struct.Struct("iIII")
+
+    def _run_inotify(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = (self.IN_CLOSE_WRITE | self.IN_MOVED_FROM | self.IN_MOVED_TO | self.IN_CREATE
+                | self.IN_DELETE | self.IN_DELETE_SELF | self.IN_ONLYDIR | self.IN_EXCL_UNLINK)
+        watches: Dict[int, str] = {}
+        full = [False]
+        self.complete = set(self.roots)
+
+        def add_tree(root):
+            for d in self._walk_dirs(root):
+                if len(watches) >= self.MAX_WATCHES:
+                    full[0] = True
+                    self._uncovered(root)
+                    return
+                wd = libc.inotify_add_watch(fd, os.fsencode(d), mask)
+                if wd < 0:
+                    if ctypes.get_errno() == errno.ENOSPC:
+                        full[0] = True  # fs.inotify.max_user_watches reached
+                        self._uncovered(root)
+                        return
+                    continue
+                watches[wd] = d
+
+        for root in self.roots:
+            add_tree(root)
+        if full[0]:
+            print(f"Bite Watcher: Watch limit reached at {len(watches)} directories; the rest is left to the crawl")
+
+        def loop():
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], 1.0)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                offset = 0
+                while offset + self._EVENT.size <= len(data):
+                    wd, ev, _cookie, length = self._EVENT.unpack_from(data, offset)
+                    offset += self._EVENT.size
+                    name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                    offset += length
+
+                    if ev & self.IN_Q_OVERFLOW:
+                        # Events were dropped: re-scan what is watched
+                        for root in self.roots:
+                            self._emit("scan", root)
+                        continue
+                    if ev & self.IN_IGNORED:
+                        watches.pop(wd, None)
+                        continue
+                    parent = watches.get(wd)
+                    if parent is None or not name:
+                        continue
+                    path = os.path.join(parent, name)
+                    if ev & (self.IN_DELETE | self.IN_MOVED_FROM):
+                        self._emit("delete", path)
+                        if ev & self.IN_ISDIR:
+                            # Moved/deleted subtree: its watches now point at stale paths
+                            prefix = path + os.sep
+                            for stale in [w for w, p in watches.items() if p == path or p.startswith(prefix)]:
+                                libc.inotify_rm_watch(fd, stale)
+                                watches.pop(stale, None)
+                    elif ev & self.IN_ISDIR and ev & (self.IN_CREATE | self.IN_MOVED_TO):
+                        add_tree(path)
+                        self._emit("scan", path)
+                    else:
+                        self._emit("upsert", path)
+            os.close(fd)
+
+        return loop
+
+    # --- ReadDirectoryChangesW (Windows) ---
+
+    def _run_windows(self):
+        import win32con
+        import win32file
+
+        handles = []
+        for root in self.roots:
+            handles.append((root, win32file.CreateFile(
+                root,
+                0x0001,  # FILE_LIST_DIRECTORY
+                win32con.FILE_SHARE_READ | win32con.FILE_SHARE_WRITE | win32con.FILE_SHARE_DELETE,
+                None,
+                win32con.OPEN_EXISTING,
+                win32con.FILE_FLAG_BACKUP_SEMANTICS,
+                None,
+            )))
+        # Each handle watches its whole subtree; there is no per-directory limit
+        self.complete = set(self.roots)
+        flags = (win32con.FILE_NOTIFY_CHANGE_FILE_NAME | win32con.FILE_NOTIFY_CHANGE_DIR_NAME
+                 | win32con.FILE_NOTIFY_CHANGE_LAST_WRITE)
+
+        def watch(root, handle):
+            excludes = self.bite.indexer.active_excludes()
+            while not self._stop.is_set():
+                try:
+                    # Blocks until something under `root` changes (whole subtree)
+                    changes = win32file.ReadDirectoryChangesW(handle, 64 * 1024, True, flags, None, None)
+                except Exception as e:
+                    print(f"Bite Watcher: Lost {root} ({e})")
+                    self._uncovered(root)
+                    return
+                if not changes:
+                    # Buffer overflow: events were dropped
+                    self._emit("scan", root)
+                    continue
+                for action, rel in changes:
+                    parts = rel.split(os.sep)
+                    if any(self.bite.indexer.is_excluded(p, True, excludes) for p in parts[:-1]):
+                        continue
+                    path = os.path.join(root, rel)
+                    if action in (2, 4):  # REMOVED, RENAMED_OLD_NAME
+                        self._emit("delete", path)
+                    elif os.path.isdir(path):
+                        if action in (1, 5):  # ADDED, RENAMED_NEW_NAME
+                            self._emit("scan", path)
+                    else:
+                        self._emit("upsert", path)
+
+        def loop():
+            for root, handle in handles[1:]:
+                threading.Thread(target=watch, args=(root, handle), daemon=True).start()
+            watch(*handles[0])
+
+        return loop
+
+    # --- Polling fallback ---
+
+    def _run_polling(self):
+        """Directory mtimes change when entries are added, removed or renamed; only those are re-listed."""
+        state: Dict[str, tuple] = {}
+        self.complete = set(self.roots)
+
+        def listing(d):
+            with os.scandir(d) as entries:
+                return {e.name: e.is_dir(follow_symlinks=False) for e in entries}
+
+        def track(root):
+            for d in self._walk_dirs(root):
+                if len(state) >= self.MAX_WATCHES:
+                    self._uncovered(root)
+                    return
+                try:
+                    state[d] = (os.stat(d).st_mtime, listing(d))
+                except OSError:
+                    continue
+
+        for root in self.roots:
+            track(root)
+
+        def loop():
+            while not self._stop.wait(self.POLL_INTERVAL):
+                excludes = self.bite.indexer.active_excludes()
+                for d, (mtime, names) in list(state.items()):
+                    try:
+                        current = os.stat(d).st_mtime
+                    except OSError:
+                        state.pop(d, None)
+                        self._emit("delete", d)
+                        continue
+                    if current == mtime:
+                        continue
+                    try:
+                        now = listing(d)
+                    except OSError:
+                        continue
+                    state[d] = (current, now)
+                    for name in names.keys() - now.keys():
+                        self._emit("delete", os.path.join(d, name))
+                    for name in now.keys() - names.keys():
+                        path = os.path.join(d, name)
+                        if now[name]:
+                            if not self.bite.indexer.is_excluded(name, True, excludes):
+                                track(path)
+                                self._emit("scan", path)
+                        else:
+                            self._emit("upsert", path)
+
+        return loop
@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.fixture import HeadlessBite  # noqa: E402
+
+
+@pytest.fixture
+def bite(tmp_path):
+    """A HeadlessBite (real Searcher/Indexer/Brain/stores) over an empty config dir."""
+    b = HeadlessBite(tmp_path / "config", [], [])
+    yield b
+    b.shutdown()
@@ -0,0 +1,142 @@
+import random
+
+import pytest
+
+PROCESSES = ["code.exe", "chrome.exe", "explorer.exe", "slack.exe"]
+# Wide title / query vocabularies: far more features than any hashed layout has columns
+_rng = random.Random(1)
+WORDS = ["".join(_rng.choice("abcdefghijklmnop") for _ in range(5)) for _ in range(800)]
+TITLES = [" ".join(_rng.sample(WORDS, 4)) for _ in range(400)] + [""]
+QUERIES = [""] + [w[:3] for w in WORDS[:300]]
+
+
+def _teach(brain, bite, rng, events, items=300):
+    for _ in range(events):
+        bite.active_context = {"process": rng.choice(PROCESSES), "title": rng.choice(TITLES)}
+        brain.clock = lambda t=brain.epoch + rng.randrange(0, 30 * 86400): t
+        brain.record_event(f"item_{rng.randrange(items)}", rng.choice(QUERIES))
+
+
+def _contexts(brain, rng, n=40):
+    for _ in range(n):
+        yield (
+            {"process": rng.choice(PROCESSES), "title": rng.choice(TITLES)},
+            brain.epoch + 30 * 86400 + rng.randrange(0, 86400),
+            rng.choice(QUERIES),
+        )
+
+
+def test_numpy_and_python_scorers_agree(bite):
+    pytest.importorskip("numpy")
+    brain, rng = bite.brain, random.Random(7)
+    _teach(brain, bite, rng, 3000)
+
+    for rounds in range(2):  # Fresh matrix, then one kept up to date by record_event
+        for ctx, now, query in _contexts(brain, rng):
+            bite.active_context = ctx
+            brain.clock = lambda t=now: t
+            features = brain._get_active_features(query)
+            for k in (1, 8, 50):
+                expected = brain._top_k(features, k)
+                assert expected
+                assert brain._top_k_matrix(features, k) == expected
+        _teach(brain, bite, rng, 500)
+
+
+def _predictions(brain, bite, cases):
+    out = []
+    for ctx, now, query in cases:
+        bite.active_context = ctx
+        brain.clock = lambda t=now: t
+        out.append([(p["id"], pytest.approx(p["score"], rel=1e-9)) for p in brain.predict(query)])
+    return out
+
+
+def test_predictions_survive_rebase_and_reload(bite):
+    from src.core.brain import Brain
+
+    brain, rng = bite.brain, random.Random(3)
+    _teach(brain, bite, rng, 2000)
+    cases = list(_contexts(brain, rng))
+    before = _predictions(brain, bite, cases)
+    assert any(before)
+
+    brain._rebase(brain.epoch + 10 * 86400)
+    assert _predictions(brain, bite, cases) == before
+
+    brain.flush()
+    reloaded = Brain(bite)
+    assert _predictions(reloaded, bite, cases) == before
+
+
+def test_predict_cache_keeps_recent_contexts(bite):
+    brain, rng = bite.brain, random.Random(5)
+    _teach(brain, bite, rng, 500)
+    calls = []
+    for name in ("_top_k", "_top_k_matrix"):
+        scorer = getattr(brain, name)
+        setattr(brain, name, lambda *a, _s=scorer: calls.append(a) or _s(*a))
+
+    cases = list(_contexts(brain, rng, n=4))
+    first = _predictions(brain, bite, cases)
+    for _ in range(3):  # Switching back and forth between contexts and queries
+        assert _predictions(brain, bite, cases) == first
+    assert len(calls) == len(cases)
+
+    brain.record_event("item_1", "")  # New version: the cached rankings are stale
+    _predictions(brain, bite, cases[:1])
+    assert len(calls) == len(cases) + 1
+
+
+def test_benchmark_corpus_is_not_pruned(tmp_path):
+    from benchmarks.fixture import SIZES, HeadlessBite, write_corpus
+
+    sizes = dict(SIZES, apps=10, snippets=10, workflows=1, clipboard=1)
+    write_corpus(tmp_path, sizes)
+    b = HeadlessBite(tmp_path, [], [])
+    try:
+        assert len(b.brain.weights) == SIZES["brain"]
+    finally:
+        b.shutdown()
+
+
+def _stored(brain):
+    import sqlite3
+
+    conn = sqlite3.connect(brain.db_path)
+    rows = {}
+    for item_id, feature, weight in conn.execute("SELECT item_id, feature, weight FROM weights"):
+        rows.setdefault(item_id, {})[feature] = weight
+    conn.close()
+    return rows
+
+
+def test_weights_are_written_behind_and_kept_on_a_failed_flush(bite, monkeypatch):
+    import src.core.brain as brain_module
+    from src.core.brain import Brain
+
+    brain, rng = bite.brain, random.Random(11)
+    _teach(brain, bite, rng, 200, items=20)
+    assert _stored(brain) == {}  # Nothing written until the flush
+    brain.flush()
+    assert _stored(brain) == brain.weights
+
+    bite.active_context = {"process": "code.exe", "title": ""}
+    brain.record_event("item_3", "abc")
+    brain.record_event("fresh_item", "abc")
+    assert brain._dirty == {"item_3", "fresh_item"}
+
+    def unavailable(*args, **kwargs):
+        raise brain_module.sqlite3.OperationalError("database is locked")
+
+    with monkeypatch.context() as m:
+        m.setattr(brain_module.sqlite3, "connect", unavailable)
+        brain.flush()
+    # The failed write keeps its items for the next attempt
+    assert brain._dirty == {"item_3", "fresh_item"}
+    assert "fresh_item" not in _stored(brain)
+
+    brain.flush()
+    assert brain._dirty == set()
+    assert _stored(brain) == brain.weights
+    assert Brain(bite).weights == brain.weights
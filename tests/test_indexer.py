@@ -0,0 +1,287 @@
+import os
+import sqlite3
+import time
+
+import pytest
+
+import src.core.indexer as indexer_module
+from benchmarks.fixture import HeadlessBite
+from src.core.watcher import FileWatcher
+
+OLD = time.time() - 3600
+
+
+def _write(path, text="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _make_tree(root, width=3):
+    for a in range(width):
+        for b in range(width):
+            for c in range(width):
+                _write(os.path.join(root, f"dir_{a}", f"sub_{b}", f"file_{a}{b}{c}.txt"))
+    # Old mtimes everywhere: the directory cache may skip anything not changed afterwards
+    for current, dirs, files in os.walk(root):
+        for name in files + dirs:
+            os.utime(os.path.join(current, name), (OLD, OLD))
+    os.utime(root, (OLD, OLD))
+
+
+def _crawler(b, monkeypatch, docs, system):
+    """Points the crawl at `docs` (a watched user folder) and `system` (a drive)."""
+    monkeypatch.setattr(b.indexer, "priority_roots", lambda: [docs])
+    monkeypatch.setattr(indexer_module.platform, "system", lambda: "Windows")
+    monkeypatch.setattr(b, "_get_drives", lambda: [system])
+    return b.indexer
+
+
+def _age(ix, seconds=60):
+    """As if the last crawl ran `seconds` ago (back-to-back crawls would share its timestamps)."""
+    conn = sqlite3.connect(ix.db_path)
+    conn.execute("UPDATE files SET last_seen = last_seen - ?", (seconds,))
+    conn.execute("UPDATE dirs SET last_seen = last_seen - ?, listed = listed - ?", (seconds, seconds))
+    conn.commit()
+    conn.close()
+
+
+def _paths(ix):
+    conn = sqlite3.connect(ix.db_path)
+    paths = {p for (p,) in conn.execute("SELECT path FROM files")}
+    conn.close()
+    return paths
+
+
+@pytest.fixture
+def roots(tmp_path):
+    docs, system = str(tmp_path / "home" / "Documents"), str(tmp_path / "sys")
+    _make_tree(docs)
+    _make_tree(system)
+    return docs, system
+
+
+def test_daily_crawl_skips_only_fully_watched_roots(bite, monkeypatch, roots):
+    docs, system = roots
+    ix = _crawler(bite, monkeypatch, docs, system)
+    watched = []
+    monkeypatch.setattr(ix.watcher, "watched_roots", lambda: list(watched))
+
+    now = time.time()
+    assert ix._crawl_plan(now) == (["last_full_scan", "last_crawl"], [])
+    conn = sqlite3.connect(ix.db_path)
+    conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('last_full_scan', ?)", (str(now - 2 * 86400),))
+    conn.commit()
+    conn.close()
+    # Unwatched (or partly watched) roots keep the daily full crawl
+    assert ix._crawl_plan(now) == (["last_full_scan", "last_crawl"], [])
+    watched.append(docs)
+    assert ix._crawl_plan(now) == (["last_crawl"], [docs])
+    assert ix._crawl_plan(now + 4 * 86400) == (["last_crawl"], [docs])
+    # Watched roots are still reconciled in full once a week
+    assert ix._crawl_plan(now + 6 * 86400) == (["last_full_scan", "last_crawl"], [])
+
+    ix._run_indexing()
+    _age(ix)
+    gone_doc = os.path.join(docs, "dir_0", "sub_0", "file_000.txt")
+    os.remove(gone_doc)
+    _write(os.path.join(docs, "dir_1", "new_doc.txt"))
+    os.remove(os.path.join(system, "dir_0", "sub_0", "file_000.txt"))
+    _write(os.path.join(system, "dir_1", "sub_2", "new_sys.txt"))
+
+    ix._run_indexing(skip=[docs])
+    paths = _paths(ix)
+    assert os.path.join(system, "dir_1", "sub_2", "new_sys.txt") in paths
+    assert os.path.join(system, "dir_0", "sub_0", "file_000.txt") not in paths
+    # The watched tree is the watcher's: neither re-listed nor cleaned up
+    assert gone_doc in paths
+    assert os.path.join(docs, "dir_1", "new_doc.txt") not in paths
+    assert os.path.join(docs, "dir_2", "sub_2", "file_222.txt") in paths
+
+
+def test_watcher_reports_roots_past_the_watch_limit(bite, roots):
+    docs, system = roots
+    small = os.path.join(docs, "dir_0", "sub_0")
+    watcher = FileWatcher(bite)
+    watcher.MAX_WATCHES = 2
+    watcher.start([small, system])
+    try:
+        assert watcher.live
+        assert watcher.watched_roots() == [small]
+    finally:
+        watcher.stop()
+    assert watcher.watched_roots() == []
+
+
+def _rows(ix):
+    """`files` without the crawl timestamps."""
+    conn = sqlite3.connect(ix.db_path)
+    rows = sorted(conn.execute("SELECT path, name, mtime, is_dir, tags, parent FROM files"))
+    conn.close()
+    return rows
+
+
+def test_incremental_recrawl_matches_a_clean_crawl(bite, monkeypatch, roots, tmp_path):
+    docs, system = roots
+    ix = _crawler(bite, monkeypatch, docs, system)
+    ix._run_indexing()
+    _age(ix)
+
+    # Nested changes: the parents' mtimes change, every other directory stays cached
+    _write(os.path.join(system, "dir_1", "sub_1", "deep", "added.txt"))
+    os.remove(os.path.join(system, "dir_2", "sub_0", "file_200.txt"))
+    os.rename(os.path.join(system, "dir_0", "sub_2"), os.path.join(system, "dir_0", "renamed"))
+    os.rename(
+        os.path.join(docs, "dir_2", "sub_1", "file_210.txt"),
+        os.path.join(docs, "dir_2", "sub_1", "moved.txt"),
+    )
+    ix._run_indexing()
+
+    clean = HeadlessBite(tmp_path / "clean", [], [])
+    try:
+        _crawler(clean, monkeypatch, docs, system)._run_indexing()
+        expected = _rows(clean.indexer)
+    finally:
+        clean.shutdown()
+    assert _rows(ix) == expected
+    assert os.path.join(system, "dir_0", "renamed", "file_020.txt") in _paths(ix)
+    assert os.path.join(system, "dir_0", "sub_2", "file_020.txt") not in _paths(ix)
+
+
+def _fts_pages(ix):
+    conn = sqlite3.connect(ix.db_path)
+    pages = [conn.execute(f"SELECT id, block FROM {t}_data ORDER BY id").fetchall() for t in ("files_fts", "files_trgm")]
+    conn.close()
+    return pages
+
+
+def test_unchanged_recrawl_writes_nothing(bite, monkeypatch, roots):
+    docs, system = roots
+    ix = _crawler(bite, monkeypatch, docs, system)
+    ix._run_indexing()
+
+    # Every write to `files` (even a no-op UPDATE) is counted
+    conn = sqlite3.connect(ix.db_path)
+    conn.execute("CREATE TABLE churn (op TEXT, path TEXT)")
+    for op, row in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old")):
+        conn.execute(f"CREATE TRIGGER churn_{op.lower()} AFTER {op} ON files BEGIN INSERT INTO churn VALUES ('{op}', {row}.path); END")
+    conn.commit()
+    conn.close()
+
+    def churn():
+        conn = sqlite3.connect(ix.db_path)
+        ops = conn.execute("SELECT op, path FROM churn").fetchall()
+        conn.execute("DELETE FROM churn")
+        conn.commit()
+        conn.close()
+        return ops
+
+    files, pages = _rows(ix), _fts_pages(ix)
+    for relist in (False, True):
+        _age(ix)
+        if relist:  # Without the dirs cache every directory is listed again
+            conn = sqlite3.connect(ix.db_path)
+            conn.execute("DELETE FROM dirs")
+            conn.commit()
+            conn.close()
+        churn()  # Not the aging itself
+        ix._run_indexing()
+        assert churn() == []
+        assert _rows(ix) == files
+        assert _fts_pages(ix) == pages
+
+    _age(ix)
+    churn()
+    gone = os.path.join(system, "dir_1", "sub_1", "file_111.txt")
+    os.remove(gone)
+    ix._run_indexing()
+    assert gone not in _paths(ix)
+    assert ("DELETE", gone) in churn()
+    assert gone not in [r["path"] for r in ix.search("file_111")]
+
+
+def test_trigram_search_matches_like_past_many_candidates(bite, monkeypatch):
+    ix = bite.indexer
+    monkeypatch.setattr(indexer_module.os.path, "exists", lambda p: True)
+    # 3000 names with "port" inside a token (no FTS word hit); the best ranked come last
+    names = [f"{'x' * (5 + i % 7)}port{i}.txt" for i in range(3000)]
+    names += ["portable.txt", "aport.md", "export", "tagged.txt"]
+    conn = sqlite3.connect(ix.db_path)
+    conn.executemany(
+        "INSERT INTO files (path, name, mtime, is_dir, last_seen, tags, parent) VALUES (?, ?, 0, 0, 0, ?, '/data')",
+        [(f"/data/{n}", n, "report" if n == "tagged.txt" else "") for n in names],
+    )
+    conn.commit()
+    conn.close()
+
+    for query in ("port", "xport", "PORT1"):
+        for limit in (10, 40):
+            ix.trigram = True
+            trigram = ix.search_rows(query, limit)
+            ix.trigram = False
+            assert trigram == ix.search_rows(query, limit)
+    ix.trigram = True
+    # Starts with, then tag match, then the shortest names
+    assert [r["name"] for r in ix.search("port", 4)] == ["portable.txt", "tagged.txt", "export", "aport.md"]
+
+
+def _walk_rows(ix, roots):
+    """What a sequential os.walk with the crawler's exclusions would index."""
+    excludes, rows = ix.active_excludes(), []
+    for root in roots:
+        for current, dirs, files in os.walk(root):
+            dirs[:] = [d for d in dirs if not ix.is_excluded(d, True, excludes)]
+            for name in dirs:
+                path = os.path.join(current, name)
+                rows.append((path, name, os.stat(path).st_mtime, 1, current))
+            for name in files:
+                if not ix.is_excluded(name, False, excludes):
+                    path = os.path.join(current, name)
+                    rows.append((path, name, os.stat(path).st_mtime, 0, current))
+    return sorted(rows)
+
+
+def test_parallel_crawl_matches_os_walk(bite, monkeypatch, roots, tmp_path):
+    docs, system = roots
+    _write(os.path.join(system, "node_modules", "pkg", "index.js"))
+    _write(os.path.join(system, "dir_1", ".hidden"))
+    _write(os.path.join(system, "dir_1", "cache.pyc"))
+    _write(os.path.join(tmp_path, "elsewhere", "outside.txt"))
+    os.symlink(os.path.join(tmp_path, "elsewhere"), os.path.join(docs, "dir_2", "linked"))
+
+    ix = _crawler(bite, monkeypatch, docs, system)
+    monkeypatch.setattr(ix, "CRAWL_WORKERS", 4)
+    monkeypatch.setattr(ix, "CRAWL_INFLIGHT", 3)  # A frontier far smaller than the tree
+    ix._run_indexing()
+
+    conn = sqlite3.connect(ix.db_path)
+    crawled = sorted(conn.execute("SELECT path, name, mtime, is_dir, parent FROM files"))
+    conn.close()
+    assert crawled == _walk_rows(ix, [docs, system])
+    # The linked directory is listed, not followed
+    assert os.path.join(docs, "dir_2", "linked", "outside.txt") not in _paths(ix)
+
+
+def test_trigram_index_for_an_existing_database_is_built_off_the_startup_path(bite, monkeypatch):
+    monkeypatch.setattr(indexer_module.os.path, "exists", lambda p: True)
+    conn = sqlite3.connect(bite.indexer.db_path)
+    conn.executemany(
+        "INSERT INTO files (path, name, mtime, is_dir, last_seen, tags, parent) VALUES (?, ?, 0, 0, 0, '', '/data')",
+        [(f"/data/{n}", n) for n in (f"report_{i}.pdf" for i in range(500))],
+    )
+    # A database from before the trigram index
+    conn.execute("DROP TABLE files_trgm")
+    conn.execute("DELETE FROM metadata WHERE key = 'trgm_built'")
+    conn.commit()
+    conn.close()
+
+    ix = indexer_module.Indexer(bite)
+    assert ix.trigram is False and ix.trigram_pending
+    before = ix.search_rows("port_1", 40)  # LIKE scan meanwhile
+    assert len(before[0]) == 40
+
+    ix._build_trigram()
+    assert ix.trigram and not ix.trigram_pending
+    assert ix.search_rows("port_1", 40) == before
+    # Built once: a restart uses it straight away
+    assert indexer_module.Indexer(bite).trigram is True
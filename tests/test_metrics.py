@@ -0,0 +1,28 @@
+import threading
+
+from src.core.metrics import LatencyTracker
+
+
+def test_concurrent_record_and_snapshot_lose_nothing():
+    tracker = LatencyTracker(window=64)
+    errors = []
+
+    def record():
+        for i in range(5000):
+            tracker.record("files", float(i % 50))
+
+    def snapshot():
+        try:
+            for _ in range(300):
+                tracker.snapshot()
+        except Exception as e:  # deque mutated during iteration
+            errors.append(e)
+
+    threads = [threading.Thread(target=record) for _ in range(4)] + [threading.Thread(target=snapshot)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert tracker.snapshot()["stages"]["files"]["count"] == 4 * 5000
@@ -0,0 +1,35 @@
+import threading
+import time
+
+from src.core.providers import Provider, ProviderRegistry, SearchRequest
+
+
+def test_abandoned_slow_provider_does_not_starve_the_pool():
+    registry = ProviderRegistry(max_workers=4)
+    release = threading.Event()
+    slow_calls = []
+
+    def slow(request):
+        slow_calls.append(request.query)
+        release.wait(5)  # A plugin that ignores cancellation
+        return [{"id": "slow"}]
+
+    registry.register(Provider("plugin", slow, budget=0.05))
+    registry.register(Provider("files", lambda r: [{"id": r.query}], budget=0.5))
+    try:
+        for i in range(8):  # Consecutive keystrokes
+            request = SearchRequest(f"q{i}", [])
+            results = registry.dispatch(request)
+            assert results["files"] == [{"id": f"q{i}"}]
+            assert results["plugin"] == []
+            assert request.diagnostics["timed_out"] == ["plugin"]
+        assert len(slow_calls) == 1
+
+        release.set()
+        time.sleep(0.1)
+        request = SearchRequest("again", [])
+        registry.dispatch(request)
+        assert len(slow_calls) == 2  # Submitted again once the earlier call returned
+    finally:
+        release.set()
+        registry.pool.shutdown(wait=True)
@@ -0,0 +1,166 @@
+import threading
+import time
+
+from src.core import result_cache
+
+
+def _routed(bite, query):
+    return [p.name for p in bite.searcher.providers.route(query)]
+
+
+def test_hex_color_is_routed_to_dev_tools_only(bite):
+    assert _routed(bite, "#fff") == ["dev_tools"]
+    assert _routed(bite, "#1a2b3c") == ["dev_tools"]
+
+
+def test_hash_prefixed_text_reaches_every_provider(bite):
+    routed = _routed(bite, "#todo")
+    assert "dev_tools" not in routed
+    assert {"snippets", "files", "apps"} <= set(routed)
+
+
+
+def test_path_navigation_is_not_served_stale_from_the_cache(bite, tmp_path, monkeypatch):
+    folder = tmp_path / "navtest"
+    folder.mkdir()
+    (folder / "alpha.txt").write_text("a")
+    query = str(folder) + "/"
+
+    def names():
+        return {r.get("name") for r in bite.get_results(query)}
+
+    assert "alpha.txt" in names()
+    (folder / "beta.txt").write_text("b")
+
+    later = time.monotonic() + 5
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: later)
+    assert "beta.txt" in names()
+
+
+def test_indexed_file_results_stay_cached_until_the_index_changes(bite):
+    files = next(p for p in bite.searcher.providers.route("report") if p.name == "files")
+    assert files.ttl_for("report") is None
+    assert files.ttl_for("/tmp/") == 2
+
+
+def test_streamed_tiers_hold_the_web_fallback_and_respect_budgets(bite, monkeypatch):
+    from src.core.providers import Provider
+
+    release = threading.Event()
+    bite.searcher.providers.register(Provider(
+        "zz_slow", lambda r: release.wait(5) and [], prefixes=("zz ",), exclusive=True, budget=0.05,
+    ))
+    emitted = []
+    monkeypatch.setattr(bite.app, "emit", lambda event, payload=None: emitted.append(payload))
+    try:
+        first = bite.get_results("zz something", generation=1)
+        # Only the slow tier is routed: no "Search Web" to hit Enter on before it lands
+        assert all(r.get("id") != "web_search" for r in first)
+
+        deadline = time.time() + 2
+        while not emitted and time.time() < deadline:
+            time.sleep(0.01)
+        assert emitted, "the budget should settle the slow tier long before it returns"
+        last = emitted[-1]
+        assert last["done"] and last["generation"] == 1
+        assert any(r.get("id") == "web_search" for r in last["results"])
+        diagnostics = bite.searcher.last_diagnostics
+        assert diagnostics["query"] == "zz something" and diagnostics["timed_out"] == ["zz_slow"]
+    finally:
+        release.set()
+
+
+def test_fuzzy_batch_scores_match_the_scalar_scorer():
+    from src.core import fuzzy
+
+    names = ["Visual Studio Code", "Google Chrome", "notepad++", "my_report-2024.final.pdf", "İstanbul Guide", "Straße"]
+    targets = [fuzzy.FuzzyText(n) for n in names]
+    for query in ("vsc", "Code", "gc", "rep24", "ist", "İst", "guide", "zzz"):
+        batch = fuzzy.match_batch(query, targets)
+        assert batch == [fuzzy.match(fuzzy.fold(query), fuzzy.FuzzyText(n)) for n in names]
+        for name, hit in zip(names, batch):
+            if hit:  # Positions index the original text, whatever lowercasing did to it
+                assert max(hit[1]) < len(name)
+    assert fuzzy.match_batch("ist", targets)[4][1] == [0, 1, 2]
+
+
+def test_index_lookups_match_a_linear_scan():
+    from src.core.search_index import SearchIndex
+
+    words = ["code", "chrome", "note", "pad", "report", "final", "git", "hub", "docker", "deploy"]
+    items = [
+        {"id": f"{words[i % 10]}{i}", "name": f"{words[i % 10].title()} {words[(i * 7) % 10]}", "content": words[(i * 3) % 10]}
+        for i in range(200)
+    ]
+    index = SearchIndex()
+    index.add_source("snippets", fields=("name", "content"))
+
+    def scan(query):
+        return [it for it in items if query in it["name"].lower() or query in it["content"]]
+
+    def check():
+        index.sync("snippets", items)
+        for query in ("", "o", "de", "ote", "report", "e g", "docker d", "hub1", "zzz"):
+            assert [e.item for e in index.lookup("snippets", query)] == scan(query)
+        assert [e.item["id"] for e in index.id_prefixes("snippets", "git6 some args")] == ["git6"]
+
+    check()
+    # Added and removed items are re-posted; the rest keep their postings
+    items = items[5:] + [{"id": "newcomer", "name": "Fresh Report", "content": "deploy"}]
+    check()
+    assert index.get("snippets", "code0") is None
+
+
+def test_superseded_query_returns_nothing(bite, monkeypatch):
+    from src.core.providers import Provider
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow(r):
+        if r.query == "zz first":
+            started.set()
+            release.wait(5)
+        r.check()
+        return [{"id": f"hit_{r.query}", "name": r.query, "type": "app"}]
+
+    bite.searcher.providers.register(Provider("zz_wait", slow, prefixes=("zz ",), exclusive=True))
+    emitted = []
+    monkeypatch.setattr(bite.app, "emit", lambda event, payload=None: emitted.append(payload))
+    results = {}
+    worker = threading.Thread(target=lambda: results.setdefault("first", bite.get_results("zz first", generation=1)))
+    worker.start()
+    try:
+        assert started.wait(2)
+        second = bite.get_results("zz second", generation=2)
+    finally:
+        release.set()
+        worker.join(5)
+    assert any(r.get("id") == "hit_zz second" for r in second)
+    assert results["first"] == []
+    assert all(p["generation"] == 2 for p in emitted)
+    # Nothing of the cancelled query was cached
+    assert any(r.get("id") == "hit_zz first" for r in bite.get_results("zz first"))
+
+
+def test_top_k_ranking_matches_a_full_sort(bite):
+    import random
+
+    from src.core.providers import Provider, SearchRequest
+
+    rng = random.Random(3)
+    cats = ["Apps", "Files", "Snippets", "Tools", "Clipboard", None]
+    # Few distinct keys, so most of the ordering comes down to ties
+    items = [
+        {"id": f"item_{i}", "name": rng.choice(["alpha", "Beta", "gamma"]), "cat": rng.choice(cats),
+         "score": rng.choice([10, 20, 60]), "learned": rng.random() < 0.1, "type": "app"}
+        for i in range(500)
+    ]
+    items[7]["pinned"] = items[42]["pinned"] = True
+    route = [Provider("zz_many", lambda r: [])]
+    request = SearchRequest("zz", [])
+    ranked = bite.searcher._rank(request, route, {"zz_many": items}, fallback=False)
+
+    pinned = [it for it in items if it.get("pinned")]
+    others = sorted((it for it in items if not it.get("pinned")), key=bite.searcher._rank_key)
+    expected = pinned + others[:bite.searcher.MAX_RESULTS]
+    assert [r["id"] for r in ranked] == [r["id"] for r in expected]
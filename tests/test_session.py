@@ -0,0 +1,58 @@
+import sqlite3
+import time
+
+
+def _names(bite, query, session="s"):
+    bite.searcher.cache.clear()
+    return {r.get("name") for r in bite.get_results(query, session_id=session)}
+
+
+def _add_rows(bite, paths):
+    now = time.time()
+    with sqlite3.connect(bite.indexer.db_path) as conn:
+        conn.executemany(
+            "INSERT INTO files (path, name, mtime, is_dir, last_seen, tags, parent) VALUES (?, ?, 0, 0, ?, '', ?)",
+            [(str(p), p.name, now, str(p.parent)) for p in paths],
+        )
+
+
+def test_pruned_dead_rows_do_not_make_a_cut_hit_list_complete(bite, tmp_path):
+    # 40 dead rows fill the LIMIT (shorter names rank first); the live files come after
+    _add_rows(bite, [tmp_path / f"report_d{i:02}.txt" for i in range(40)])
+    live = []
+    for i in range(3):
+        p = tmp_path / f"xreport_live_{i}.txt"
+        p.write_text("x")
+        live.append(p)
+    _add_rows(bite, live)
+
+    _names(bite, "epor")
+    assert {p.name for p in live} <= _names(bite, "eport")
+
+
+def test_files_version_bump_invalidates_narrowed_hits(bite, tmp_path):
+    first = tmp_path / "alphazeta.txt"
+    first.write_text("x")
+    bite.indexer.apply_changes({str(first): "upsert"})
+    assert "alphazeta.txt" in _names(bite, "lph")
+
+    second = tmp_path / "alphabet.txt"
+    second.write_text("x")
+    bite.indexer.apply_changes({str(second): "upsert"})
+    assert {"alphazeta.txt", "alphabet.txt"} <= _names(bite, "lpha")
+
+
+def test_narrowed_multi_word_queries_match_sessionless_results(bite, tmp_path):
+    # FTS word matches ("docker" AND "de*") that are not substrings of the query
+    paths = []
+    for i, name in enumerate(["docker_deploy", "deploy_docker", "docker-desk", "visual_studio", "studio_visual", "note pad", "pad_note"]):
+        for ext in (".md", ".js"):
+            p = tmp_path / f"{name}_{i}{ext}"
+            p.write_text("x")
+            paths.append(p)
+    _add_rows(bite, paths)
+
+    for words in ("docker dep", "visual stu", "note pad"):
+        for n in range(3, len(words) + 1):
+            _names(bite, words[:n])  # Typing in the session
+        assert _names(bite, words) == _names(bite, words, session=None)
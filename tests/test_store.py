@@ -0,0 +1,158 @@
+import src.core.executor as executor_module
+from benchmarks.fixture import HeadlessBite
+
+
+def _large(marker: str) -> str:
+    # Well past INLINE_MAX, with the marker only after the preview
+    return "x" * 8000 + marker + "y" * 100
+
+
+def test_large_clip_is_searchable_past_the_preview(bite):
+    store = bite.store
+    content = _large("needle-tail")
+    bite.record_clipboard(content)
+    entry = bite.clipboard_history[0]
+    assert entry["blob"] and "needle-tail" not in entry["content"]
+
+    assert [e["hash"] for e in store.search_clipboard("needle-tail")] == [entry["hash"]]  # Still pending
+    store.flush()
+    assert [e["hash"] for e in store.search_clipboard("needle-tail")] == [entry["hash"]]
+
+    # Re-copying moves it to the top without a duplicate posting
+    bite.record_clipboard("small")
+    bite.record_clipboard(content)
+    store.flush()
+    assert [e["hash"] for e in store.search_clipboard("needle-tail")] == [entry["hash"]]
+
+    # Retention drops the row and its full-text postings
+    store.add_clip(store.make_clip("newer", "00:00:00", "2024-01-01"), keep=1)
+    store.flush()
+    assert store.search_clipboard("needle-tail") == []
+
+
+def test_large_clip_is_not_recorded_again_after_restart(tmp_path):
+    content = _large("restart")
+    b = HeadlessBite(tmp_path, [], [])
+    b.record_clipboard(content)
+    b.shutdown()
+
+    b = HeadlessBite(tmp_path, [], [])
+    try:
+        before = b.versions.get("clipboard", 0)
+        b.record_clipboard(content)
+        assert b.versions.get("clipboard", 0) == before
+    finally:
+        b.shutdown()
+
+
+def test_paste_with_missing_blob_is_an_error(bite, monkeypatch):
+    bite.record_clipboard(_large("gone"))
+    entry = bite.clipboard_history[0]
+    bite.blobs.delete([entry["hash"]])
+
+    copied = []
+    monkeypatch.setattr(executor_module.pyperclip, "copy", copied.append)
+    item = {"type": "system", "action": "paste", "content": entry["content"], "blob": entry["hash"]}
+    assert bite.execute(item) == "Clipboard entry is missing"
+    assert copied == []
+
+
+def test_selection_log_round_trip(bite, monkeypatch):
+    bite.active_context = {"process": "code.exe", "title": "main.py"}
+    bite.brain.clock = lambda: 1_700_000_000.0
+    bite.record_selection("code", "app_1")
+    assert not bite.events.path.exists()  # Opt-in
+
+    bite.update_settings({"log_events": True})
+    bite.record_selection("code", "app_1")
+    monkeypatch.setattr(bite.events, "MAX_BYTES", 0)  # Rotates before every later write
+    bite.record_selection("chr", "app_2")
+    with open(bite.events.path, "a", encoding="utf-8") as f:
+        f.write('{"query": "torn", "id"')
+    bite.record_selection("ter", "app_3")
+
+    events = list(bite.events.read())
+    assert [(e["query"], e["id"]) for e in events] == [("chr", "app_2"), ("ter", "app_3")]
+    assert events[0]["context"] == {"process": "code.exe", "title": "main.py"}
+    assert events[0]["features"] == bite.brain._get_active_features("chr")
+
+
+def test_staged_writes_land_in_one_transaction_on_close(tmp_path, monkeypatch):
+    from src.core.store import UserStore
+
+    monkeypatch.setattr(UserStore, "DEBOUNCE", 60)  # The background writer waits out the whole test
+    b = HeadlessBite(tmp_path, [], [])
+    store = b.store
+    connects = []
+    connect = store._connect
+    monkeypatch.setattr(store, "_connect", lambda: connects.append(1) or connect())
+
+    b.update_scratchpad("draft 1")
+    b.update_scratchpad("draft 2")
+    b.update_settings({"theme": "dark"})
+    b.record_selection("code", "app_1")
+    b.record_clipboard("copied text")
+    # Values are serialized when staged: later in-place edits are not written
+    b.user_data["settings"]["theme"] = "light"
+    assert connects == []
+    b.shutdown()
+    assert len(connects) == 1
+
+    b = HeadlessBite(tmp_path, [], [])
+    try:
+        assert b.user_data["scratchpad"] == "draft 2"
+        assert b.user_data["settings"]["theme"] == "dark"
+        assert b.user_data["mnemonics"]["code"] == {"app_1": 1}
+        assert b.clipboard_history[0]["content"] == "copied text"
+    finally:
+        b.shutdown()
+
+
+def test_published_snapshots_are_isolated_from_later_writes(bite):
+    import pytest
+
+    bite.user_data["pins"] = ["app_1"]
+    bite.user_data["mnemonics"] = {"co": {"app_1": 2}}
+    bite._save_config("pins", "mnemonics")
+    old = bite.snapshot
+
+    bite.user_data["pins"].append("app_2")
+    bite.user_data["mnemonics"]["co"]["app_2"] = 5
+    bite.record_selection("co", "app_1")
+    bite.update_settings({"log_events": True})
+    bite._save_config("pins")
+
+    # A search that took `old` keeps seeing the data as it was
+    assert old.pins == ("app_1",)
+    assert dict(old.mnemonics["co"]) == {"app_1": 2}
+    assert not old.settings.get("log_events")
+    new = bite.snapshot
+    assert new.version > old.version
+    assert new.pins == ("app_1", "app_2")
+    assert dict(new.mnemonics["co"]) == {"app_1": 3, "app_2": 5}
+    assert new.settings["log_events"]
+    # Keys nobody touched are shared, not copied
+    assert new.snippets is old.snippets and new.vault is old.vault
+    with pytest.raises(TypeError):
+        new.mnemonics["co"]["app_1"] = 0
+    with pytest.raises(AttributeError):
+        new.pins = ()
+
+
+def test_clipboard_search_matches_a_scan_of_the_whole_history(bite):
+    import random
+
+    store, rng = bite.store, random.Random(19)
+    words = ["Docker", "deploy", "invoice", "Budget", "token", "ssh-key", "meeting", "draft"]
+    contents = [f"{i}: " + " ".join(rng.sample(words, 3)) for i in range(300)]
+    contents[5] = _large("Invoice-Tail")  # Only the full text has it
+    for content in contents:
+        store.add_clip(store.make_clip(content, "00:00:00", "2024-01-01"), keep=1000)
+    store.flush()
+
+    newest_first = contents[::-1]
+    for query in ("docker", "DEPLOY inv", "oice", "ssh-key meet", "invoice-tail", "zzz"):
+        for limit in (5, 400):
+            expected = [c for c in newest_first if query.lower() in c.lower()][:limit]
+            found = [store.load_clip(e) for e in store.search_clipboard(query, limit)]
+            assert found == expected, (query, limit)